@@ -1,12 +1,16 @@
 import os
+import sys
 import json
 
 # Ruta a la carpeta donde están los .json y .mp3
 carpeta = os.getenv("AUDIOS_PATH", os.path.join(os.getcwd(), "AUDIOS", "pruebas"))
 
+# Nombres base a procesar (argumentos, con o sin .mp3); sin argumentos, toda la carpeta
+solo = {a[:-4] if a.lower().endswith(".mp3") else a for a in sys.argv[1:]}
+
 # Recorre todos los archivos en la carpeta
 for archivo in os.listdir(carpeta):
-    if archivo.endswith(".json"):
+    if archivo.endswith(".json") and (not solo or os.path.splitext(archivo)[0] in solo):
         ruta_json = os.path.join(carpeta, archivo)
 
         try:
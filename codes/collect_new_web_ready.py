@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import sys
 import shutil
 
 # 🗂️ Lista de carpetas de origen (puedes agregar más si quieres)
@@ -11,6 +12,9 @@ source_dirs = [
 dest_dir = os.getenv("AUDIOS_OUTPUT_PATH", os.path.join(os.getcwd(), "AUDIOS", "_new_web_ready"))
 os.makedirs(dest_dir, exist_ok=True)
 
+# Nombres base a copiar (argumentos, con o sin .mp3); sin argumentos, toda la carpeta
+solo = {a[:-4] if a.lower().endswith(".mp3") else a for a in sys.argv[1:]}
+
 def find_matching_mp3(src_dir, json_name):
     """
     Busca el archivo MP3 correspondiente al JSON,
@@ -31,6 +35,8 @@ for src in source_dirs:
     for fname in sorted(os.listdir(src)):
         if not fname.endswith("_new_web_ready.json"):
             continue
+        if solo and fname[:-len("_new_web_ready.json")] not in solo:
+            continue
 
         json_src = os.path.join(src, fname)
         mp3_src = find_matching_mp3(src, fname)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+🤝 Coordinación de workers sobre un sistema de archivos compartido (NFS, CIFS, disco local)
+Permite que varios hosts o procesos repartan unidades de trabajo (p. ej. archivos .mp3)
+sin más infraestructura que un directorio POSIX común:
+
+  arriendos/<unidad>.lease   creado con O_CREAT|O_EXCL (sólo un worker lo consigue);
+                             el dueño renueva su mtime (heartbeat) mientras trabaja
+  hechos/<unidad>.done       unidad terminada
+  fallidos/<unidad>.json     intentos fallidos y último error
+  workers/<worker>.json      estado de cada worker (reemplazo atómico)
+  estado.json                resumen agregado de todos los workers
+
+Un arriendo sin heartbeat durante COORD_TTL segundos se considera de un worker muerto:
+otro worker lo renombra (rename es atómico, sólo uno gana) y vuelve a tomar la unidad.
+
+Uso del resumen:  python coordinacion.py /ruta/compartida/.coordinacion
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import threading
+
+# Segundos sin heartbeat tras los cuales un arriendo se reclama, y período del heartbeat
+COORD_TTL = int(os.getenv("COORD_TTL", "120"))
+COORD_HEARTBEAT = int(os.getenv("COORD_HEARTBEAT", str(max(COORD_TTL // 4, 1))))
+# Intentos por unidad antes de darla por fallida
+COORD_MAX_INTENTOS = int(os.getenv("COORD_MAX_INTENTOS", "3"))
+
+
+def _escribir_json(ruta, datos):
+    """Escritura atómica: archivo temporal único + os.replace."""
+    tmp = f"{ruta}.{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, ruta)
+
+
+def _leer_json(ruta, defecto=None):
+    try:
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return defecto
+
+
+class Coordinador:
+    """Reparte unidades entre workers mediante archivos de arriendo con heartbeat."""
+
+    def __init__(self, directorio, worker=None, ttl=COORD_TTL, heartbeat=COORD_HEARTBEAT,
+                 max_intentos=COORD_MAX_INTENTOS):
+        self.directorio = directorio
+        self.worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self.max_intentos = max_intentos
+        self.arriendos = os.path.join(directorio, "arriendos")
+        self.hechos = os.path.join(directorio, "hechos")
+        self.fallidos = os.path.join(directorio, "fallidos")
+        self.workers = os.path.join(directorio, "workers")
+        for d in (self.arriendos, self.hechos, self.fallidos, self.workers):
+            os.makedirs(d, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._propios = set()
+        self._stats = {"hechos": 0, "fallidos": 0, "reclamados": 0}
+        self._parar = threading.Event()
+        self._hilo = None
+
+    # ---------- rutas ----------
+    def _lease(self, unidad):
+        return os.path.join(self.arriendos, f"{unidad}.lease")
+
+    def _hecho(self, unidad):
+        return os.path.join(self.hechos, f"{unidad}.done")
+
+    def _fallo(self, unidad):
+        return os.path.join(self.fallidos, f"{unidad}.json")
+
+    # ---------- estado de una unidad ----------
+    def terminada(self, unidad):
+        return os.path.exists(self._hecho(unidad))
+
+    def agotada(self, unidad):
+        """True si la unidad ya usó todos sus intentos."""
+        return _leer_json(self._fallo(unidad), {}).get("intentos", 0) >= self.max_intentos
+
+    def conserva(self, unidad):
+        """True si este worker sigue siendo dueño del arriendo (no fue reclamado)."""
+        datos = _leer_json(self._lease(unidad), {})
+        return datos.get("worker") == self.worker
+
+    # ---------- arriendos ----------
+    def _crear(self, unidad):
+        """Crea el arriendo con O_EXCL; False si otro worker ya lo tiene."""
+        try:
+            fd = os.open(self._lease(unidad), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"worker": self.worker, "desde": time.time()}, f)
+        with self._lock:
+            self._propios.add(unidad)
+        return True
+
+    def _reclamar(self, unidad):
+        """
+        Retira un arriendo vencido renombrándolo: si dos workers lo intentan a la vez,
+        sólo un rename encuentra el archivo. Si el dueño renovó justo antes, se restaura.
+        """
+        ruta = self._lease(unidad)
+        try:
+            if time.time() - os.stat(ruta).st_mtime < self.ttl:
+                return False
+            retirado = f"{ruta}.{self.worker}.stale"
+            os.rename(ruta, retirado)
+        except FileNotFoundError:
+            return False
+        try:
+            if time.time() - os.stat(retirado).st_mtime < self.ttl:
+                # El dueño hizo heartbeat entre stat y rename: devolverle su arriendo
+                try:
+                    os.link(retirado, ruta)
+                except FileExistsError:
+                    pass
+                return False
+        finally:
+            os.unlink(retirado)
+        with self._lock:
+            self._stats["reclamados"] += 1
+        return True
+
+    def tomar(self, unidades):
+        """
+        Arrienda la primera unidad libre (ni terminada, ni agotada, ni arrendada por
+        un worker vivo). Devuelve su nombre o None si no queda ninguna disponible.
+        """
+        for unidad in unidades:
+            if self.terminada(unidad) or self.agotada(unidad):
+                continue
+            if self._crear(unidad) or (self._reclamar(unidad) and self._crear(unidad)):
+                # Pudo terminarse entre la comprobación y el arriendo
+                if self.terminada(unidad):
+                    self.liberar(unidad)
+                    continue
+                return unidad
+        return None
+
+    def liberar(self, unidad):
+        """Suelta el arriendo si todavía es nuestro."""
+        with self._lock:
+            self._propios.discard(unidad)
+        if self.conserva(unidad):
+            try:
+                os.unlink(self._lease(unidad))
+            except FileNotFoundError:
+                pass
+
+    def terminar(self, unidad, info=None):
+        """Marca la unidad como hecha y suelta el arriendo."""
+        _escribir_json(self._hecho(unidad), {"worker": self.worker, "fin": time.time(), **(info or {})})
+        with self._lock:
+            self._stats["hechos"] += 1
+        self.liberar(unidad)
+
+    def fallar(self, unidad, error):
+        """Registra un intento fallido; la unidad vuelve a la cola hasta agotar intentos."""
+        previo = _leer_json(self._fallo(unidad), {})
+        _escribir_json(self._fallo(unidad), {
+            "intentos": previo.get("intentos", 0) + 1,
+            "error": str(error),
+            "worker": self.worker,
+            "fecha": time.time(),
+        })
+        with self._lock:
+            self._stats["fallidos"] += 1
+        self.liberar(unidad)
+
+    def pendientes(self, unidades):
+        """Unidades aún no terminadas ni agotadas (arrendadas o libres)."""
+        return [u for u in unidades if not self.terminada(u) and not self.agotada(u)]
+
+    # ---------- heartbeat y estado ----------
+    def _latir(self):
+        while not self._parar.wait(self.heartbeat):
+            with self._lock:
+                propios = list(self._propios)
+            for unidad in propios:
+                try:
+                    if self.conserva(unidad):
+                        os.utime(self._lease(unidad))
+                except FileNotFoundError:
+                    pass
+            self.publicar()
+
+    def iniciar(self):
+        """Arranca el hilo de heartbeat (renueva arriendos y publica el estado)."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._latir, name="coordinacion-heartbeat", daemon=True)
+            self._hilo.start()
+        self.publicar()
+        return self
+
+    def detener(self):
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+        with self._lock:
+            propios = list(self._propios)
+        for unidad in propios:
+            self.liberar(unidad)
+        self.publicar(activo=False)
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+    def publicar(self, activo=True, extra=None):
+        """Escribe workers/<worker>.json y reagrega estado.json."""
+        with self._lock:
+            datos = {
+                "worker": self.worker,
+                "activo": activo,
+                "actualizado": time.time(),
+                "en_curso": sorted(self._propios),
+                **self._stats,
+                **(extra or {}),
+            }
+        _escribir_json(os.path.join(self.workers, f"{self.worker}.json"), datos)
+        _escribir_json(os.path.join(self.directorio, "estado.json"), resumen(self.directorio, self.ttl))
+
+
+def resumen(directorio, ttl=COORD_TTL):
+    """Progreso agregado: unidades hechas/fallidas/en curso y estado de cada worker."""
+    ahora = time.time()
+
+    def contar(sub, sufijo):
+        try:
+            return sum(1 for n in os.listdir(os.path.join(directorio, sub)) if n.endswith(sufijo))
+        except FileNotFoundError:
+            return 0
+
+    workers = []
+    try:
+        nombres = sorted(os.listdir(os.path.join(directorio, "workers")))
+    except FileNotFoundError:
+        nombres = []
+    for nombre in nombres:
+        if nombre.endswith(".json"):
+            datos = _leer_json(os.path.join(directorio, "workers", nombre))
+            if datos:
+                datos["vivo"] = datos.get("activo", False) and ahora - datos.get("actualizado", 0) < ttl
+                workers.append(datos)
+    return {
+        "actualizado": ahora,
+        "hechos": contar("hechos", ".done"),
+        "fallidos": contar("fallidos", ".json"),
+        "en_curso": contar("arriendos", ".lease"),
+        "workers_vivos": sum(1 for w in workers if w["vivo"]),
+        "workers": workers,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Uso: python coordinacion.py DIRECTORIO_COMPARTIDO")
+    print(json.dumps(resumen(sys.argv[1]), ensure_ascii=False, indent=1))
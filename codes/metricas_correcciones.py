@@ -1,16 +1,25 @@
 #!/usr/bin/env python3
 import os
+import sys
 import glob
 import json
 import numpy as np
 
 # --- CONFIGURACIÓN ---
 INPUT_DIR = os.getenv("AUDIOS_PATH", os.path.join(os.getcwd(), "AUDIOS", "pruebas"))
-PERCENTILE_AVG = 90   # percentil global para marcar revisión de segmentos
-PERCENTILE_WORDS = 95 # percentil local por palabras
+# Percentiles de marcado (ajustables con: python manage.py corpus_analytics)
+PERCENTILE_AVG = int(os.getenv("PERCENTILE_AVG", 90))     # percentil global para marcar revisión de segmentos
+PERCENTILE_WORDS = int(os.getenv("PERCENTILE_WORDS", 95)) # percentil local por palabras
+
+# Nombres base a procesar (argumentos, con o sin .mp3); sin argumentos, toda la carpeta
+solo = {a[:-4] if a.lower().endswith(".mp3") else a for a in sys.argv[1:]}
 
 # Asegurarse de que existan archivos
-json_files = glob.glob(os.path.join(INPUT_DIR, "*_web_ready.json"))
+if solo:
+    json_files = [p for p in (os.path.join(INPUT_DIR, f"{b}_web_ready.json") for b in sorted(solo))
+                  if os.path.exists(p)]
+else:
+    json_files = glob.glob(os.path.join(INPUT_DIR, "*_web_ready.json"))
 if not json_files:
     print(f"[WARN] No se encontraron archivos *_web_ready.json en {INPUT_DIR}")
 else:
@@ -3,12 +3,17 @@
 🎧 Pipeline de procesamiento de audios para MemorIAnet
 Autor: Guillermo Peralta
 Flujo automatizado: JSON Whisper → web_ready → métricas → colecta final
+Uso: python3 pipeline_audio.py [archivo.mp3 ...]   (sin argumentos procesa toda la carpeta)
 """
 
 import os
+import sys
+import time
 import subprocess
 from datetime import datetime
 
+from tiempos import Tiempos
+
 # ======================================================
 # CONFIGURACIÓN PRINCIPAL
 # ======================================================
@@ -23,6 +28,9 @@ NEW_WEB_READY_DIR = os.getenv("AUDIOS_OUTPUT_PATH", os.path.join(BASE_DIR, "_new
 # 🧾 Log del pipeline (dentro de la carpeta pruebas)
 LOG_FILE = os.path.join(PRUEBAS_DIR, "pipeline.log")
 
+# 🎯 Archivos a procesar (argumentos); sin argumentos cada paso recorre toda la carpeta
+ARCHIVOS = sys.argv[1:]
+
 # ⚙️ Directorio donde están los scripts (este archivo)
 CODES_DIR = os.path.dirname(os.path.abspath(__file__))
 SCRIPTS = {
@@ -34,6 +42,10 @@ SCRIPTS = {
 # ======================================================
 # FUNCIONES AUXILIARES
 # ======================================================
+# ⏱️ Duración de cada paso (log y, con METRICS_TEXTFILE, métricas de Prometheus)
+tiempos = Tiempos("audio_pipeline")
+
+
 def log(msg):
     """Escribe mensaje en log y en consola."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -49,13 +61,16 @@ def run_step(name, script_path):
     if not os.path.exists(script_path):
         log(f"❌ ERROR: No se encontró el script {script_path}")
         return False
+    inicio = time.perf_counter()
     try:
-        subprocess.run(["python3", script_path], check=True)
-        log(f"✅ Paso completado: {name}")
+        subprocess.run(["python3", script_path, *ARCHIVOS], check=True)
+        log(f"✅ Paso completado: {name} ({time.perf_counter() - inicio:.1f} s)")
         return True
     except subprocess.CalledProcessError as e:
-        log(f"❌ Error en {name}: {e}")
+        log(f"❌ Error en {name} tras {time.perf_counter() - inicio:.1f} s: {e}")
         return False
+    finally:
+        tiempos.registrar(os.path.splitext(os.path.basename(script_path))[0], time.perf_counter() - inicio)
 
 
 def ensure_dir(path):
@@ -94,6 +109,11 @@ if __name__ == "__main__":
             log(f"⚠️ Pipeline detenido por error en: {name}")
             break
 
+    for linea in tiempos.resumen():
+        log(f"⏱️ {linea}")
+    if tiempos.escribir_prometheus():
+        log(f"📈 Métricas escritas en: {os.getenv('METRICS_TEXTFILE')}")
+
     log("🎯 Pipeline completado.")
     log(f"📦 Archivos finales en: {NEW_WEB_READY_DIR}")
     print("\n✅ Proceso finalizado. Revisa el log en:")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+⏱️ Medición de tiempos por paso para los scripts de codes/
+Sin dependencias: acumula duraciones por paso, las resume en el log y,
+si se define METRICS_TEXTFILE, las escribe en formato de texto de Prometheus
+(apto para el textfile collector de node_exporter).
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+# Archivo .prom de salida (opcional)
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")
+
+
+class Tiempos:
+    """Acumula (cantidad, suma, máximo) de segundos por paso; seguro entre hilos."""
+
+    def __init__(self, prefijo):
+        self.prefijo = prefijo
+        self.pasos = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, paso, segundos):
+        with self._lock:
+            n, total, maximo = self.pasos.get(paso, (0, 0.0, 0.0))
+            self.pasos[paso] = (n + 1, total + segundos, max(maximo, segundos))
+
+    @contextmanager
+    def medir(self, paso):
+        """Mide el bloque y lo suma al paso indicado."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(paso, time.perf_counter() - inicio)
+
+    def resumen(self):
+        """Líneas legibles: paso, veces, total y promedio."""
+        with self._lock:
+            pasos = sorted(self.pasos.items(), key=lambda kv: -kv[1][1])
+        return [
+            f"{paso}: {n}× total={total:.1f}s prom={total / n:.2f}s max={maximo:.2f}s"
+            for paso, (n, total, maximo) in pasos
+        ]
+
+    def escribir_prometheus(self, ruta=None):
+        """Escribe las duraciones como summary de Prometheus (reemplazo atómico)."""
+        ruta = ruta or METRICS_TEXTFILE
+        if not ruta:
+            return None
+        nombre = f"{self.prefijo}_step_seconds"
+        lineas = [
+            f"# HELP {nombre} Duración por paso (segundos)",
+            f"# TYPE {nombre} summary",
+        ]
+        with self._lock:
+            for paso, (n, total, maximo) in sorted(self.pasos.items()):
+                lineas.append(f'{nombre}_count{{step="{paso}"}} {n}')
+                lineas.append(f'{nombre}_sum{{step="{paso}"}} {total:.6f}')
+                lineas.append(f'{self.prefijo}_step_max_seconds{{step="{paso}"}} {maximo:.6f}')
+        lineas.append(f"{self.prefijo}_last_run_timestamp_seconds {time.time():.0f}")
+        tmp = f"{ruta}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lineas) + "\n")
+        os.replace(tmp, ruta)
+        return ruta
@@ -4,7 +4,8 @@
 """
 Transcriptor por lotes con Whisper (chunked) — versión uv + ffmpeg embebido
 ---------------------------------------------------------------------------
-Lee todos los .mp3 desde AUDIOS_PATH, genera JSON, TXT y CSV con timestamps.
+Lee todos los .mp3 desde AUDIOS_PATH (o sólo los indicados como argumentos),
+genera JSON, TXT y CSV con timestamps.
 No requiere ffmpeg del sistema: usa imageio-ffmpeg embebido (sin sudo).
 
 Variables de entorno útiles:
@@ -12,12 +13,16 @@ Variables de entorno útiles:
 WHISPER_MODEL_NAME=large-v3
 CUDA_VISIBLE_DEVICES=2         # 0 o 2 → RTX 6000 Ada, 1 → Blackwell
 MAX_WORKERS=2                  # Número de hilos simultáneos
+METRICS_TEXTFILE=/ruta/transcribir.prom  # Tiempos por paso en formato Prometheus (opcional)
+COORD_PATH=/nfs/audios/.coordinacion     # Modo multi-host: reparte los .mp3 entre workers (opcional)
+COORD_TTL=120                  # Segundos sin heartbeat para reclamar el archivo de un worker caído
 """
 
 import os
 import gc
 import csv
 import json
+import time
 import logging
 import threading
 import tempfile
@@ -29,6 +34,9 @@ import torch
 import whisper
 import imageio_ffmpeg
 
+from tiempos import Tiempos
+from coordinacion import Coordinador
+
 
 # ======================================================
 # 1️⃣ CONFIGURACIÓN GENERAL (variables de entorno)
@@ -64,6 +72,8 @@ AUDIO_INPUT_DIR = os.getenv("AUDIOS_PATH", os.path.join(os.getcwd(), "pruebas"))
 MODEL_DIR       = os.getenv("WHISPER_PATH", os.path.join(os.getcwd(), "large-v3"))
 MODEL_NAME      = os.getenv("WHISPER_MODEL_NAME", "large-v3")
 MAX_WORKERS     = int(os.getenv("MAX_WORKERS", "2"))
+COORD_PATH      = os.getenv("COORD_PATH", "")
+COORD_ESPERA    = float(os.getenv("COORD_ESPERA", "10"))
 
 # Torch config
 torch.set_float32_matmul_precision("high")
@@ -87,14 +97,22 @@ def load_whisper_model():
     return model.to(device).float()
 
 
-model = load_whisper_model()
+# ⏱️ Duración por paso: carga, espera del lock, inferencia por chunk y escritura
+tiempos = Tiempos("transcribir")
+
+with tiempos.medir("cargar_modelo"):
+    model = load_whisper_model()
 transcribe_lock = threading.Lock()
 
 
 # ======================================================
 # 3️⃣ TRANSCRIPCIÓN DE UN ARCHIVO
 # ======================================================
-def transcribe_file(filename: str) -> str:
+class ArriendoPerdido(Exception):
+    """Otro worker reclamó el archivo mientras se transcribía: el resultado se descarta."""
+
+
+def transcribe_file(filename: str, conserva=None) -> str:
     """
     Transcribe un .mp3 en chunks (~30s) y genera:
       - .json (texto + segments)
@@ -102,6 +120,9 @@ def transcribe_file(filename: str) -> str:
       - .txt (texto limpio)
       - _timestamps.csv (métricas por segmento)
       - _timestamps_distribution-word.csv (palabra, probabilidad)
+
+    'conserva' (modo coordinado) se consulta antes de escribir las salidas:
+    si devuelve False, lanza ArriendoPerdido sin tocar los archivos.
     """
     base = os.path.splitext(filename)[0]
 
@@ -115,9 +136,12 @@ def transcribe_file(filename: str) -> str:
     if all(os.path.exists(p) for p in [json_path, ts_txt_path, text_path, seg_csv_path, words_csv_path]):
         return f"{filename} → ya procesado."
 
+    inicio_archivo = time.perf_counter()
+
     # Cargar audio
     audio_path = os.path.join(AUDIO_INPUT_DIR, filename)
-    audio      = whisper.load_audio(audio_path)
+    with tiempos.medir("decodificar_audio"):
+        audio = whisper.load_audio(audio_path)
 
     chunk_sz   = int(30 * whisper.audio.SAMPLE_RATE)
     all_segs   = []
@@ -125,7 +149,10 @@ def transcribe_file(filename: str) -> str:
 
     for start in range(0, audio.shape[0], chunk_sz):
         chunk = whisper.pad_or_trim(audio[start:start + chunk_sz])
+        espera = time.perf_counter()
         with transcribe_lock:
+            tiempos.registrar("espera_lock", time.perf_counter() - espera)
+            inferencia = time.perf_counter()
             res = model.transcribe(
                 chunk,
                 task="transcribe",
@@ -134,6 +161,7 @@ def transcribe_file(filename: str) -> str:
                 temperature=0.0,
                 length_penalty=1.0
             )
+            tiempos.registrar("inferencia_chunk", time.perf_counter() - inferencia)
         if not res or "segments" not in res:
             raise RuntimeError(f"Transcribe devolvió None/segments ausente en {filename}")
 
@@ -149,8 +177,11 @@ def transcribe_file(filename: str) -> str:
             torch.cuda.empty_cache()
         gc.collect()
 
-    # Generar salida
+    # Generar salida (sólo si el archivo sigue siendo nuestro)
+    if conserva is not None and not conserva():
+        raise ArriendoPerdido(filename)
     output = {"text": " ".join(full_text).strip(), "segments": all_segs}
+    escritura = time.perf_counter()
 
     # JSON
     with open(json_path, "w", encoding="utf-8") as f_json:
@@ -201,14 +232,66 @@ def transcribe_file(filename: str) -> str:
                     w.get("probability"),
                 ])
 
-    return f"{filename} → completado."
+    tiempos.registrar("escribir_salidas", time.perf_counter() - escritura)
+    duracion = time.perf_counter() - inicio_archivo
+    tiempos.registrar("archivo", duracion)
+    segundos_audio = audio.shape[0] / whisper.audio.SAMPLE_RATE
+    return f"{filename} → completado en {duracion:.1f} s ({segundos_audio / max(duracion, 1e-9):.1f}× tiempo real)."
+
+
+# ======================================================
+# 4️⃣ MODO COORDINADO (varios hosts sobre un directorio compartido)
+# ======================================================
+def ejecutar_coordinado(mp3_files):
+    """
+    Cada hilo arrienda un .mp3 libre en COORD_PATH, lo transcribe y lo marca hecho.
+    Sin unidades libres espera COORD_ESPERA segundos: así reclama las de workers caídos.
+    Termina cuando no queda ningún archivo pendiente en ningún worker.
+    """
+    with Coordinador(COORD_PATH) as coord:
+        logging.info(f"Modo coordinado: {COORD_PATH} | worker {coord.worker}")
+
+        def bucle():
+            while True:
+                fn = coord.tomar(mp3_files)
+                if fn is None:
+                    if not coord.pendientes(mp3_files):
+                        return
+                    time.sleep(COORD_ESPERA)
+                    continue
+                try:
+                    result = transcribe_file(fn, conserva=lambda: coord.conserva(fn))
+                    # Reclamado mientras se escribían las salidas: lo termina el nuevo dueño
+                    if not coord.conserva(fn):
+                        raise ArriendoPerdido(fn)
+                    coord.terminar(fn)
+                    print(f"[{coord.worker}] {result}")
+                    logging.info(result)
+                except ArriendoPerdido:
+                    msg = f"{fn}: reclamado por otro worker, se descarta este resultado."
+                    coord.liberar(fn)
+                    print(f"⚠️ [{coord.worker}] {msg}")
+                    logging.warning(msg)
+                except Exception as e:
+                    err = f"Error en {fn}: {type(e).__name__}: {e}"
+                    coord.fallar(fn, err)
+                    print(f"⚠️ [{coord.worker}] {err}")
+                    logging.error(err, exc_info=True)
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            for fut in [executor.submit(bucle) for _ in range(MAX_WORKERS)]:
+                fut.result()
 
 
 # ======================================================
-# 4️⃣ MAIN
+# 5️⃣ MAIN
 # ======================================================
 if __name__ == "__main__":
     mp3_files = sorted(f for f in os.listdir(AUDIO_INPUT_DIR) if f.lower().endswith(".mp3"))
+    # Archivos indicados como argumentos (con o sin .mp3): sólo esos
+    solo = {a if a.lower().endswith(".mp3") else f"{a}.mp3" for a in sys.argv[1:]}
+    if solo:
+        mp3_files = [f for f in mp3_files if f in solo]
     total = len(mp3_files)
 
     logging.basicConfig(
@@ -232,16 +315,25 @@ if __name__ == "__main__":
         raise SystemExit(0)
 
     completados = 0
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(transcribe_file, fn): fn for fn in mp3_files}
-        for fut in as_completed(futures):
-            fn = futures[fut]
-            completados += 1
-            try:
-                result = fut.result()
-                print(f"[{completados}/{total}] {result}")
-                logging.info(f"[{completados}/{total}] {result}")
-            except Exception as e:
-                err = f"Error en {fn}: {type(e).__name__}: {e}"
-                print(f"⚠️ [{completados}/{total}] {err}")
-                logging.error(err, exc_info=True)
\ No newline at end of file
+    if COORD_PATH:
+        ejecutar_coordinado(mp3_files)
+    else:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(transcribe_file, fn): fn for fn in mp3_files}
+            for fut in as_completed(futures):
+                fn = futures[fut]
+                completados += 1
+                try:
+                    result = fut.result()
+                    print(f"[{completados}/{total}] {result}")
+                    logging.info(f"[{completados}/{total}] {result}")
+                except Exception as e:
+                    err = f"Error en {fn}: {type(e).__name__}: {e}"
+                    print(f"⚠️ [{completados}/{total}] {err}")
+                    logging.error(err, exc_info=True)
+
+    # Resumen de tiempos por paso
+    for linea in tiempos.resumen():
+        print(f"⏱️ {linea}")
+        logging.info(f"Tiempos: {linea}")
+    tiempos.escribir_prometheus()
\ No newline at end of file
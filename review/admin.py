@@ -1,23 +1,98 @@
 from django.contrib import admin
-from .models import Audio, Segment
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import F
+from django.urls import reverse
+from django.utils.html import format_html
 
-class SegmentInline(admin.TabularInline):
+from .models import Audio, AudioVersion, Segment, SegmentRevision, VersionJob
+from .services import corrections, ingest, queue
+from .services.jobs import enqueue_version
+
+@admin.action(description="Regenerar versiones (en segundo plano)")
+def enqueue_versions(modeladmin, request, queryset):
     """
-    Inline display of Segments within the Audio admin page.
+    Encola la materialización de los audios seleccionados (o de los audios de los segmentos).
     """
-    model = Segment
-    extra = 0
-    fields = ('start', 'end', 'revisado', 'version', 'locked_by', 'locked_at')
-    readonly_fields = ('locked_by', 'locked_at')
+    field = 'pk' if queryset.model is Audio else 'audio_id'
+    audio_ids = list(queryset.order_by().values_list(field, flat=True).distinct())
+    for audio_id in audio_ids:
+        enqueue_version(audio_id)
+    modeladmin.message_user(request, f"Versiones encoladas para {len(audio_ids)} audio(s).")
+
+class LeaseFilter(admin.SimpleListFilter):
+    """
+    Filtra segmentos por estado de su arriendo.
+    """
+    title = 'arriendo'
+    parameter_name = 'lease'
+
+    def lookups(self, request, model_admin):
+        return (('free', 'Libre'), ('active', 'Activo'), ('expired', 'Vencido'))
+
+    def queryset(self, request, queryset):
+        cutoff = queue.lease_cutoff()
+        if self.value() == 'free':
+            return queryset.filter(locked_by__isnull=True)
+        if self.value() == 'active':
+            return queryset.filter(locked_by__isnull=False, locked_at__gte=cutoff)
+        if self.value() == 'expired':
+            return queryset.filter(locked_by__isnull=False, locked_at__lt=cutoff)
+        return queryset
+
+class SegmentChangeList(ChangeList):
+    """
+    Listado de segmentos sin las columnas pesadas (palabras y vector de búsqueda).
+    """
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).defer(
+            'words', 'words_packed', 'search_vector', 'fills', 'free_text', 'corrected_text',
+        )
 
 @admin.register(Audio)
 class AudioAdmin(admin.ModelAdmin):
     """
     Admin configuration for Audio model.
+    Los segmentos se listan paginados en su propio admin (un audio puede tener miles);
+    los conteos vienen del resumen AudioProgress en la misma query.
     """
-    list_display = ('title', 'created_at', 'updated_at')
+    list_display = ('title', 'n_segments', 'n_reviewed', 'n_remaining', 'created_at', 'updated_at')
     search_fields = ('title',)
-    inlines = [SegmentInline]
+    readonly_fields = ('segment_list',)
+    actions = [enqueue_versions, 'reimport']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            n_segments=F('progress__segments'),
+            n_reviewed=F('progress__reviewed'),
+            n_remaining=F('progress__flagged_words_remaining'),
+        )
+
+    @admin.display(description='Segmentos', ordering='n_segments')
+    def n_segments(self, obj):
+        return obj.n_segments
+
+    @admin.display(description='Revisados', ordering='n_reviewed')
+    def n_reviewed(self, obj):
+        return obj.n_reviewed
+
+    @admin.display(description='Palabras por revisar', ordering='n_remaining')
+    def n_remaining(self, obj):
+        return obj.n_remaining
+
+    @admin.display(description='Segmentos')
+    def segment_list(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:review_segment_changelist') + f'?audio__id__exact={obj.pk}'
+        return format_html('<a href="{}">Ver {} segmento(s), {} revisado(s)</a>',
+                           url, obj.n_segments or 0, obj.n_reviewed or 0)
+
+    @admin.action(description="Reimportar desde la carpeta de ingesta")
+    def reimport(self, request, queryset):
+        count, running, missing = ingest.requeue_import(queryset)
+        self.message_user(request, f"Reimportación encolada para {count} audio(s)."
+                          + (f" {running} con la ingesta en curso (sin cambios)." if running else '')
+                          + (f" {missing} sin trabajo de ingesta (usar import_media)." if missing else ''))
 
 @admin.register(Segment)
 class SegmentAdmin(admin.ModelAdmin):
@@ -25,6 +100,62 @@ class SegmentAdmin(admin.ModelAdmin):
     Admin configuration for Segment model.
     """
     list_display = ('audio', 'start', 'end', 'revisado', 'version', 'locked_by', 'locked_at')
-    list_filter = ('revisado', 'version', 'locked_by')
+    list_filter = ('revisado', LeaseFilter, 'locked_by')
+    list_select_related = ('audio', 'locked_by')
+    list_per_page = 100
+    # Evita el COUNT(*) de toda la tabla en cada página
+    show_full_result_count = False
     search_fields = ('audio__title',)
+    raw_id_fields = ('audio',)
     readonly_fields = ('locked_by', 'locked_at')
+    actions = ['mark_reviewed', 'mark_unreviewed', 'release_expired_leases', enqueue_versions]
+
+    def get_changelist(self, request, **kwargs):
+        return SegmentChangeList
+
+    @admin.action(description="Marcar como revisados")
+    def mark_reviewed(self, request, queryset):
+        count = corrections.mark_reviewed(queryset, request.user)
+        self.message_user(request, f"{count} segmento(s) marcados como revisados.")
+
+    @admin.action(description="Marcar como no revisados")
+    def mark_unreviewed(self, request, queryset):
+        count = corrections.mark_reviewed(queryset, request.user, revisado=False)
+        self.message_user(request, f"{count} segmento(s) marcados como no revisados.")
+
+    @admin.action(description="Liberar arriendos vencidos")
+    def release_expired_leases(self, request, queryset):
+        count = queue.reclaim_expired(queryset)
+        self.message_user(request, f"{count} arriendo(s) liberados.")
+
+@admin.register(SegmentRevision)
+class SegmentRevisionAdmin(admin.ModelAdmin):
+    """
+    Admin de sólo lectura para el registro de revisiones.
+    """
+    list_display = ('segment', 'version', 'editor', 'created_at', 'materialized')
+    list_filter = ('materialized', 'editor')
+    list_select_related = ('segment__audio', 'editor')
+    raw_id_fields = ('segment',)
+    readonly_fields = ('segment', 'editor', 'version', 'changes', 'materialized', 'created_at')
+
+@admin.register(VersionJob)
+class VersionJobAdmin(admin.ModelAdmin):
+    """
+    Admin para la cola de materialización de versiones.
+    """
+    list_display = ('audio', 'status', 'run_after', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    list_select_related = ('audio',)
+    raw_id_fields = ('audio',)
+    readonly_fields = ('error', 'created_at', 'started_at', 'finished_at')
+
+@admin.register(AudioVersion)
+class AudioVersionAdmin(admin.ModelAdmin):
+    """
+    Admin de sólo lectura para el almacén de versiones.
+    """
+    list_display = ('audio', 'created_at', 'segments', 'size', 'chain')
+    list_select_related = ('audio',)
+    search_fields = ('audio__title',)
+    readonly_fields = ('audio', 'digest', 'object_key', 'base', 'chain', 'segments', 'size', 'created_at')
@@ -0,0 +1,151 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import DatabaseError, transaction
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from review.services import progress, queue
+from review.services.corrections import apply_correction
+from review.services.search import search_segments
+from .models import Segment
+from .serializers import AudioProgressSerializer, CorrectionSerializer, SearchHitSerializer, SegmentBundleSerializer
+
+
+@api_view(['GET'])
+def segments_next(request):
+    """
+    Asigna al revisor los siguientes ?n= segmentos pendientes y los devuelve
+    completos (palabras, correcciones y URL del clip) en una sola respuesta.
+    """
+    try:
+        n = int(request.query_params.get('n', settings.REVIEW_QUEUE_BATCH))
+    except ValueError:
+        return Response({'error': 'n debe ser un entero.'}, status=status.HTTP_400_BAD_REQUEST)
+    n = min(max(n, 1), settings.REVIEW_API_MAX_BATCH)
+    segments = queue.claim_segments(request.user, n)
+    return Response({
+        'lease_ttl': settings.REVIEW_LEASE_TTL,
+        'segments': SegmentBundleSerializer(segments, many=True, context={'request': request}).data,
+    })
+
+
+def _apply_item(item, segment, user):
+    """
+    Aplica una corrección y devuelve su resultado individual.
+    """
+    if segment is None:
+        return {'id': item['id'], 'status': 'not_found'}
+    if 'version' in item and item['version'] != segment.version:
+        return {'id': segment.pk, 'status': 'conflict', 'version': segment.version}
+    if item.get('fills'):
+        unknown = sorted(set(map(int, item['fills'])) - segment.word_array.flagged_indices())
+        if unknown:
+            return {'id': segment.pk, 'status': 'invalid',
+                    'errors': {'fills': [f'{i} no es el índice de una palabra marcada.' for i in unknown]}}
+    if not queue.acquire(segment.pk, user):
+        return {'id': segment.pk, 'status': 'locked'}
+
+    values = {k: item[k] for k in ('start', 'end', 'fills', 'free_text', 'revisado') if k in item}
+    # Mismo criterio que el formulario: texto libre y correcciones por palabra son excluyentes
+    if values.get('free_text'):
+        values.setdefault('fills', None)
+    elif values.get('fills'):
+        values.setdefault('free_text', '')
+    revision = apply_correction(segment, user, **values)
+    return {'id': segment.pk, 'status': 'ok' if revision else 'unchanged', 'version': segment.version}
+
+
+@api_view(['POST'])
+def segments_batch(request):
+    """
+    Aplica un lote de correcciones. Cada una corre en su propio savepoint:
+    un ítem inválido o en conflicto no impide aplicar los demás.
+    Cuerpo: lista de correcciones o {"items": [...]}; respuesta: resultado por ítem.
+    """
+    items = request.data.get('items') if isinstance(request.data, dict) else request.data
+    if not isinstance(items, list):
+        return Response({'error': 'Se esperaba una lista de correcciones.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.REVIEW_API_MAX_BATCH:
+        return Response({'error': f'Máximo {settings.REVIEW_API_MAX_BATCH} correcciones por lote.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    parsed = []
+    for raw in items:
+        ser = CorrectionSerializer(data=raw)
+        valid = ser.is_valid()
+        parsed.append((raw, ser.validated_data if valid else None, ser.errors))
+
+    # Un solo query para todos los segmentos del lote
+    segments = Segment.objects.defer('words', 'search_vector').in_bulk(
+        [data['id'] for _, data, _ in parsed if data]
+    )
+
+    results = []
+    with transaction.atomic():
+        for raw, data, errors in parsed:
+            if data is None:
+                results.append({
+                    'id': raw.get('id') if isinstance(raw, dict) else None,
+                    'status': 'invalid',
+                    'errors': errors,
+                })
+                continue
+            try:
+                with transaction.atomic():
+                    results.append(_apply_item(data, segments.get(data['id']), request.user))
+            except ValueError as e:
+                results.append({'id': data['id'], 'status': 'invalid', 'errors': str(e)})
+            except DatabaseError as e:
+                # p. ej. IntegrityError por unique_together (audio, start, end): el savepoint
+                # ya se revirtió y el resto del lote sigue
+                results.append({'id': data['id'], 'status': 'error', 'errors': str(e)})
+                # La instancia quedó con los valores revertidos: releerla para los ítems siguientes
+                if data['id'] in segments:
+                    segments[data['id']].refresh_from_db()
+
+    return Response({'results': results})
+
+
+@api_view(['GET'])
+def segments_search(request):
+    """
+    Búsqueda de texto completo: ?q= (sintaxis web) y opcionalmente ?audio=<id>.
+    """
+    q = request.query_params.get('q', '').strip()
+    if not q:
+        return Response({'error': 'Falta el parámetro q.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        audio_id = int(request.query_params['audio']) if 'audio' in request.query_params else None
+    except ValueError:
+        return Response({'error': 'audio debe ser un entero.'}, status=status.HTTP_400_BAD_REQUEST)
+    hits = search_segments(q, audio_id=audio_id, limit=settings.REVIEW_SEARCH_LIMIT)
+    return Response({'q': q, 'results': SearchHitSerializer(hits, many=True).data})
+
+
+@api_view(['GET'])
+def progress_summary(request):
+    """
+    Avance de revisión: totales, audios paginados (?page=) y revisores (?days=, por defecto 7).
+    """
+    try:
+        days = min(max(int(request.query_params.get('days', 7)), 1), 366)
+    except ValueError:
+        return Response({'error': 'days debe ser un entero.'}, status=status.HTTP_400_BAD_REQUEST)
+    page = Paginator(progress.audios_by_remaining(), settings.REVIEW_API_MAX_BATCH).get_page(
+        request.query_params.get('page'))
+    return Response({
+        'totals': progress.totals(),
+        'audios': AudioProgressSerializer(page.object_list, many=True).data,
+        'page': page.number,
+        'pages': page.paginator.num_pages,
+        'reviewers': [
+            {
+                'user': r['user__username'],
+                'corrections': r['total_corrections'],
+                'segments_reviewed': r['total_segments'],
+                'seconds_reviewed': r['total_seconds'],
+            }
+            for r in progress.reviewer_throughput(days)
+        ],
+    })
@@ -0,0 +1,92 @@
+"""
+Vistas asíncronas para el modo ASGI (REVIEW_ASYNC_VIEWS=True).
+
+Versiones de sólo lectura de la entrega de audio y de los endpoints de consulta:
+comparten la lógica de review/services/endpoints.py con views.py, usan el ORM
+asíncrono y hacen todo acceso a disco (stat, índices, picos) fuera del event loop,
+de modo que pocos procesos atienden muchas descargas por rangos simultáneas.
+"""
+import asyncio
+import subprocess
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseBadRequest
+
+from review.services import clips, endpoints
+from review.services.media import serve_file
+from .models import Audio, Segment
+
+
+async def _aget_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"{queryset.model._meta.verbose_name} no encontrado")
+
+
+async def _serve_file(request, path, **kwargs):
+    # serve_file hace stat() y open() del archivo: en un hilo
+    return await asyncio.to_thread(serve_file, request, path, asynchronous=True, **kwargs)
+
+
+async def stream_audio(request, filename):
+    """
+    Versión asíncrona de views.stream_audio.
+    """
+    path = await asyncio.to_thread(endpoints.media_file, filename)
+    return await _serve_file(request, path)
+
+
+@login_required(login_url='/accounts/login/')
+async def segment_clip(request, pk):
+    """
+    Versión asíncrona de views.segment_clip: ffmpeg corre en un hilo aparte.
+    """
+    segment = await _aget_or_404(Segment.objects.select_related('audio'), pk=pk)
+    try:
+        path = await asyncio.to_thread(clips.ensure_clip, segment)
+    except (OSError, subprocess.CalledProcessError):
+        raise Http404("No se pudo generar el clip")
+    return await _serve_file(request, path, content_type='audio/mpeg')
+
+
+@login_required(login_url='/accounts/login/')
+async def audio_range(request, pk):
+    """
+    Versión asíncrona de views.audio_range.
+    """
+    audio = await _aget_or_404(Audio.objects.all(), pk=pk)
+    try:
+        start, end = endpoints.parse_range_params(request.GET)
+    except ValueError:
+        return HttpResponseBadRequest(endpoints.RANGE_ERROR)
+    # stat del MP3, lectura del índice y su reconstrucción (ORM) en un hilo
+    path, data = await sync_to_async(endpoints.seek_data)(audio)
+    return await asyncio.to_thread(
+        endpoints.range_response, request, audio, path, data, start, end, asynchronous=True,
+    )
+
+
+@login_required(login_url='/accounts/login/')
+async def audio_peaks(request, pk):
+    """
+    Versión asíncrona de views.audio_peaks.
+    """
+    audio = await _aget_or_404(Audio.objects.all(), pk=pk)
+    try:
+        params = endpoints.parse_peaks_params(request.GET)
+    except ValueError:
+        return HttpResponseBadRequest(endpoints.PEAKS_ERROR)
+    tile = await asyncio.to_thread(endpoints.peaks_tile, audio, *params)
+    return endpoints.peaks_response(tile)
+
+
+@login_required(login_url='/accounts/login/')
+async def audio_versions(request, pk):
+    """
+    Versión asíncrona de views.audio_versions.
+    """
+    audio = await _aget_or_404(Audio.objects.all(), pk=pk)
+    versions = [endpoints.version_entry(audio, v) async for v in audio.versions.order_by('-created_at')]
+    return endpoints.versions_response(audio, versions)
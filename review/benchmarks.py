@@ -0,0 +1,183 @@
+"""
+Utilidades de la suite de rendimiento (review/test_benchmarks.py):
+corpus sintético, medición de latencias/queries y presupuestos.
+
+Tamaño del corpus y presupuestos configurables por entorno:
+BENCH_AUDIOS, BENCH_SEGMENTS, BENCH_WORDS, BENCH_ITERATIONS y BENCH_BUDGET_<NOMBRE>_MS.
+"""
+import os
+import json
+import random
+import shutil
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+
+import imageio_ffmpeg
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from review.models import Audio, Segment
+from review.services.progress import recompute_audio
+from review.services.search import refresh_vectors
+from review.services.wordpack import pack
+
+AUDIOS = int(os.getenv("BENCH_AUDIOS", 20))
+SEGMENTS = int(os.getenv("BENCH_SEGMENTS", 200))
+WORDS = int(os.getenv("BENCH_WORDS", 12))
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", 30))
+
+# p95 máximo (ms) por operación; holgado para CI, ajustable por entorno
+DEFAULT_BUDGETS_MS = {
+    'pending_list': 250,
+    'segment_edit_get': 150,
+    'segment_edit_post': 400,
+    'stream_audio_range': 50,
+    'import_media': 30000,
+    'version_audio': 5000,
+}
+
+# Máximo de queries SQL por llamada (deben ser constantes respecto del tamaño del corpus)
+QUERY_BUDGETS = {
+    'pending_list': 8,
+    'segment_edit_get': 8,
+    'segment_edit_post': 20,
+    'stream_audio_range': 3,
+    'version_audio': 15,
+}
+# import_media: queries por audio importado (los segmentos van en un INSERT por lote,
+# así que no deben depender del número de segmentos)
+IMPORT_QUERIES_PER_AUDIO = 30
+
+VOCABULARY = (
+    'el la de que y en un una los las por con para como pero más sus le ya o este sí porque esta '
+    'entre cuando muy sin sobre también me hasta hay donde quien desde todo nos durante todos uno '
+    'memoria archivo testimonio familia barrio escuela trabajo ciudad campo guerra radio música'
+).split()
+
+
+def budget_ms(name):
+    return float(os.getenv(f"BENCH_BUDGET_{name.upper()}_MS", DEFAULT_BUDGETS_MS[name]))
+
+
+def make_mp3(path, seconds=60):
+    """
+    MP3 sintético (tono de 440 Hz) con el ffmpeg embebido.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    subprocess.run([
+        imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+        '-ac', '1', '-b:a', '64k', path,
+    ], check=True, capture_output=True)
+    return path
+
+
+def make_words(rng, k, start, end, flag_ratio=0.15):
+    """
+    Lista de K palabras con timestamps, probabilidad y flag de revisión.
+    Al menos una palabra queda marcada para que el segmento entre en la cola.
+    """
+    step = (end - start) / k
+    words = []
+    for i in range(k):
+        prob = rng.random()
+        words.append({
+            'word': rng.choice(VOCABULARY),
+            'start': round(start + i * step, 3),
+            'end': round(start + (i + 1) * step, 3),
+            'probability': round(prob, 3),
+            'review': prob < flag_ratio,
+        })
+    words[rng.randrange(k)]['review'] = True
+    return words
+
+
+def segment_rows(rng, m, k, seg_seconds=2.0):
+    """
+    M segmentos consecutivos (dicts estilo *_new_web_ready.json).
+    """
+    rows = []
+    for j in range(m):
+        start, end = j * seg_seconds, (j + 1) * seg_seconds
+        words = make_words(rng, k, start, end)
+        rows.append({
+            'start': start,
+            'end': end,
+            'text': ' '.join(w['word'] for w in words),
+            'words': words,
+        })
+    return rows
+
+
+def build_corpus(n=AUDIOS, m=SEGMENTS, k=WORDS, mp3_name='bench.mp3', seed=0, offset=0):
+    """
+    Crea N audios × M segmentos × K palabras con bulk_create, todos apuntando al mismo MP3.
+    Devuelve la lista de audios creados.
+    """
+    rng = random.Random(seed + offset)
+    audios = Audio.objects.bulk_create([
+        Audio(title=f'bench_{offset + i:05d}', file=f'audios/{mp3_name}') for i in range(n)
+    ])
+    segments = []
+    for audio in audios:
+        # bulk_create no pasa por Segment.save(): las palabras se empaquetan aquí
+        segments += [Segment(audio=audio, words_packed=pack(row['words']), **row)
+                     for row in segment_rows(rng, m, k)]
+    Segment.objects.bulk_create(segments, batch_size=2000)
+
+    for audio in audios:
+        if connection.vendor == 'postgresql':
+            refresh_vectors(Segment.objects.filter(audio=audio))
+        recompute_audio(audio.pk)
+    return audios
+
+
+def write_import_folder(folder, title, mp3_src, m=SEGMENTS, k=WORDS, seed=0):
+    """
+    Carpeta de entrada para import_media: <title>.mp3 y <title>_new_web_ready.json.
+    """
+    os.makedirs(folder, exist_ok=True)
+    shutil.copy(mp3_src, os.path.join(folder, f'{title}.mp3'))
+    with open(os.path.join(folder, f'{title}_new_web_ready.json'), 'w', encoding='utf-8') as f:
+        json.dump({'segments': segment_rows(random.Random(seed), m, k)}, f)
+    return folder
+
+
+@dataclass
+class Result:
+    name: str
+    timings: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+
+    @property
+    def p50(self):
+        return statistics.median(self.timings) * 1000
+
+    @property
+    def p95(self):
+        ordered = sorted(self.timings)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))] * 1000
+
+    @property
+    def max_queries(self):
+        return max(self.queries) if self.queries else 0
+
+    def row(self):
+        return (f"{self.name:<22} n={len(self.timings):<4} p50={self.p50:8.1f} ms  "
+                f"p95={self.p95:8.1f} ms  queries≤{self.max_queries}")
+
+
+def measure(name, func, iterations=ITERATIONS):
+    """
+    Ejecuta func(i) 'iterations' veces; registra duración y queries de cada llamada.
+    """
+    result = Result(name)
+    for i in range(iterations):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func(i)
+            result.timings.append(time.perf_counter() - start)
+        result.queries.append(len(ctx.captured_queries))
+    return result
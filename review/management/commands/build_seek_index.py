@@ -0,0 +1,31 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from review.models import Audio
+from review.services.seek_index import index_audio
+
+
+class Command(BaseCommand):
+    help = 'Construye el índice tiempo→byte de los MP3 ya importados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Reconstruye también los audios que ya tienen índice')
+        parser.add_argument('--resolution', type=float, default=1.0, help='Segundos entre entradas del índice')
+
+    def handle(self, *args, **opts):
+        audios = Audio.objects.all()
+        if not opts['all']:
+            audios = audios.filter(seek_index__isnull=True)
+
+        count = 0
+        for audio in audios.iterator():
+            path = os.path.join(settings.MEDIA_ROOT, audio.file.name)
+            try:
+                index_audio(audio, opts['resolution'])
+            except (OSError, ValueError) as e:
+                self.stdout.write(self.style.ERROR(f'  {audio.title}: {e} ({path})'))
+                continue
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Índices construidos: {count}'))
@@ -0,0 +1,27 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from review.models import Audio
+from review.services.peaks import compute_peaks, peaks_path
+
+
+class Command(BaseCommand):
+    help = 'Calcula la forma de onda multirresolución (picos min/max) de los audios importados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recalcula también los audios que ya tienen picos')
+
+    def handle(self, *args, **opts):
+        count = 0
+        for audio in Audio.objects.all().iterator():
+            if not opts['all'] and os.path.exists(peaks_path(audio)):
+                continue
+            try:
+                compute_peaks(audio)
+            except OSError as e:
+                self.stdout.write(self.style.ERROR(f'  {audio.title}: {e}'))
+                continue
+            count += 1
+            self.stdout.write(f'  Forma de onda: {audio.title}')
+        self.stdout.write(self.style.SUCCESS(f'Audios procesados: {count}'))
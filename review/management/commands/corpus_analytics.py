@@ -0,0 +1,76 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from review.services import analytics
+
+
+def _pct(value):
+    return '-' if value is None else f'{100 * value:.1f}%'
+
+
+class Command(BaseCommand):
+    help = ('Precisión de las marcas de revisión, corrección por confianza de Whisper y WER por audio, '
+            'con percentiles sugeridos para codes/metricas_correcciones.py')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--audio', type=int, action='append', help='Sólo estos audios (repetible)')
+        parser.add_argument('--buckets', type=int, default=10, help='Tramos de probabilidad')
+        parser.add_argument('--beta', type=float, default=2.0,
+                            help='Peso del recall frente a la precisión al sugerir percentiles (F-beta)')
+        parser.add_argument('--top', type=int, default=20, help='Audios con mayor WER a listar')
+        parser.add_argument('--output', help='Guarda el reporte completo en JSON')
+
+    def handle(self, *args, **opts):
+        t0 = time.monotonic()
+        corpus = analytics.load_corpus(opts['audio'])
+        t1 = time.monotonic()
+        data = analytics.report(corpus, buckets=opts['buckets'], beta=opts['beta'], top=opts['top'])
+        t2 = time.monotonic()
+
+        self.stdout.write(
+            f"{data['words']} palabras en {data['segments']} segmentos de {data['audios']} audios "
+            f"(carga {t1 - t0:.1f}s, cálculo {t2 - t1:.1f}s)")
+        self.stdout.write(
+            f"Revisados: {data['reviewed_segments']} segmentos ({data['free_text_segments']} con texto libre), "
+            f"{data['reviewed_words']} palabras | WER estimado {_pct(data['wer'])}")
+        if not data['reviewed_words']:
+            self.stdout.write(self.style.WARNING('Aún no hay segmentos revisados: no hay correcciones que medir.'))
+            return
+
+        flags = data['flags']
+        auc = flags['auc_probability']
+        self.stdout.write(self.style.MIGRATE_HEADING('\nMarcas de revisión'))
+        self.stdout.write(
+            f"  marcadas {flags['flagged']} | corregidas {flags['corrected']} | "
+            f"precisión {_pct(flags['precision'])} | recall (texto libre) {_pct(flags['recall_free_text'])} | "
+            f"AUC de la probabilidad {'-' if auc is None else f'{auc:.3f}'}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nCorrección por confianza'))
+        for row in data['by_confidence']:
+            if row['words']:
+                self.stdout.write(f"  {row['range']}  {row['words']:>9} palabras  marcadas {row['flagged']:>9}  "
+                                  f"corregidas {_pct(row['correction_rate']):>6}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nAudios con mayor WER'))
+        corr = data['probability_wer_correlation']
+        if corr is not None:
+            self.stdout.write(f'  correlación probabilidad media / WER: {corr:+.2f}')
+        for a in data['worst_audios']:
+            self.stdout.write(f"  {_pct(a['wer']):>6}  p̄={a['mean_probability']:.2f}  "
+                              f"precisión {_pct(a['precision']):>6}  {a['title']} (#{a['id']})")
+
+        for key, name in (('percentile_words', 'PERCENTILE_WORDS'), ('percentile_avg', 'PERCENTILE_AVG')):
+            sweep = data[key]
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{name} (actual {sweep["current"]})'))
+            for c in sweep['candidates']:
+                mark = ' ←' if c['percentile'] == sweep['suggested'] else ''
+                self.stdout.write(f"  {c['percentile']:>3}  marca {_pct(c['flag_rate']):>6}  "
+                                  f"precisión {_pct(c['precision']):>6}  recall {_pct(c['recall']):>6}{mark}")
+            self.stdout.write(self.style.SUCCESS(f'  Sugerido: {name} = {sweep["suggested"]}'))
+
+        if opts['output']:
+            with open(opts['output'], 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"\nReporte guardado en {opts['output']}")
@@ -0,0 +1,45 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from review.services.export import iter_export, parse_formats, start_run
+
+
+class Command(BaseCommand):
+    help = 'Exporta las transcripciones finales de todo el corpus a un zip (TXT/JSON/CSV)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Ruta del zip (por defecto media/exports/corpus_<fecha>.zip)')
+        parser.add_argument('--incremental', action='store_true',
+                            help='Sólo audios modificados desde la última exportación completada')
+        parser.add_argument('--formats', default='txt,json,csv', help='Formatos separados por coma')
+        parser.add_argument('--workers', type=int, help='Audios procesados en paralelo')
+
+    def handle(self, *args, **opts):
+        try:
+            formats = parse_formats(opts['formats'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        output = opts['output'] or os.path.join(
+            settings.MEDIA_ROOT, 'exports', f"corpus_{timezone.now():%Y%m%d_%H%M%S}.zip")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+        run, audios = start_run(opts['incremental'], formats, destination=output)
+        if run.since:
+            self.stdout.write(f'Incremental desde {run.since:%Y-%m-%d %H:%M:%S}')
+
+        tmp = output + '.part'
+        try:
+            with open(tmp, 'wb') as f:
+                for chunk in iter_export(run, audios, opts['workers']):
+                    f.write(chunk)
+            os.replace(tmp, output)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Exportados {run.audios} audios ({run.segments} segmentos) en {output}'))
@@ -1,70 +1,37 @@
-
-
 import os
-import json
-import shutil
-from django.conf import settings
 from django.core.management.base import BaseCommand
-from review.models import Audio, Segment
+from review.models import Audio
+from review.services.importer import WEB_READY_SUFFIX, import_mp3, import_segments, title_for
 
 class Command(BaseCommand):
     help = 'Importa JSON *_new_web_ready.json y MP3 a Audio/Segment'
 
     def add_arguments(self, parser):
         parser.add_argument('path', type=str, help='Carpeta con JSON y MP3')
+        parser.add_argument('--peaks', action='store_true', help='Calcula también la forma de onda de cada MP3')
 
     def handle(self, *args, **opts):
         folder = opts['path']
-        # Preparar carpeta de destino en media/audios
-        dest_dir = os.path.join(settings.MEDIA_ROOT, 'audios')
-        os.makedirs(dest_dir, exist_ok=True)
 
         # Primero, procesa todos los MP3
         for fname in os.listdir(folder):
             if fname.endswith('.mp3'):
-                src_path = os.path.join(folder, fname)
-                dst_path = os.path.join(dest_dir, fname)
-                shutil.copy(src_path, dst_path)
-
-                title = os.path.splitext(fname)[0]
-                audio_obj, created = Audio.objects.get_or_create(
-                    title=title,
-                    defaults={'file': os.path.join('audios', fname)}
-                )
-                if not created:
-                    audio_obj.file = os.path.join('audios', fname)
-                    audio_obj.save()
-                else:
-                    self.stdout.write(f'Audio creado: {title}')
+                audio_obj, created, warnings = import_mp3(os.path.join(folder, fname), peaks=opts['peaks'])
+                if created:
+                    self.stdout.write(f'Audio creado: {audio_obj.title}')
+                for msg in warnings:
+                    self.stdout.write(self.style.WARNING(f'  {msg}'))
 
         # Luego procesa los JSON
         for fname in os.listdir(folder):
-            if fname.endswith('_new_web_ready.json'):
-                jpath = os.path.join(folder, fname)
-                title = fname.replace('_new_web_ready.json', '')
+            if fname.endswith(WEB_READY_SUFFIX):
                 try:
-                    audio_obj = Audio.objects.get(title=title)
+                    audio_obj = Audio.objects.get(title=title_for(fname))
                 except Audio.DoesNotExist:
                     self.stdout.write(self.style.ERROR(f'Audio no encontrado para JSON {fname}'))
                     continue
 
-                loaded = json.load(open(jpath, 'r', encoding='utf-8'))
-                if isinstance(loaded, list):
-                    segments = loaded
-                else:
-                    segments = loaded.get('segments', [])
-
-                for seg in segments:
-                    seg_obj, created = Segment.objects.update_or_create(
-                        audio=audio_obj,
-                        start=seg.get('start', 0),
-                        end=seg.get('end', 0),
-                        defaults={
-                            'text': seg.get('text', ''),
-                            'words': seg.get('words', []),
-                        }
-                    )
-                    if created:
-                        self.stdout.write(f'  Segmento creado: {audio_obj.title} [{seg_obj.start}-{seg_obj.end}]')
+                for seg_obj in import_segments(audio_obj, os.path.join(folder, fname)):
+                    self.stdout.write(f'  Segmento creado: {audio_obj.title} [{seg_obj.start}-{seg_obj.end}]')
 
-        self.stdout.write(self.style.SUCCESS('Importación completada.'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('Importación completada.'))
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from review.models import IngestJob
+from review.services import ingest
+from review.services.watcher import watch
+
+
+class Command(BaseCommand):
+    help = ('Vigila AUDIOS_PATH y lleva cada MP3 nuevo por transcripción, métricas e importación '
+            '(trabajos IngestJob)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll', action='store_true',
+                            help='Sondeo en vez de inotify (necesario si otros hosts escriben por NFS)')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Segundos entre sondeos y de espera con la cola vacía')
+        parser.add_argument('--transcribe-workers', type=int, default=1,
+                            help='Procesos de transcripción simultáneos (uno por GPU)')
+        parser.add_argument('--transcribe-batch', type=int, default=4,
+                            help='MP3 por invocación de transcribir.py (el modelo se carga una vez por lote)')
+        parser.add_argument('--pipeline-workers', type=int, default=2, help='Pipelines de métricas simultáneos')
+        parser.add_argument('--import-workers', type=int, default=2, help='Importaciones simultáneas')
+        parser.add_argument('--stuck-timeout', type=int, default=6 * 3600,
+                            help='Segundos tras los cuales un trabajo en ejecución se considera abandonado')
+        parser.add_argument('--once', action='store_true',
+                            help='Ingresa lo que ya está en la carpeta y termina al vaciarse la cola')
+        parser.add_argument('--stats', action='store_true', help='Muestra los trabajos por etapa y estado y termina')
+
+    def report(self):
+        st = ingest.queue_stats()
+        for stage, label in IngestJob.STAGE_CHOICES:
+            counts = [f'{status}: {st[(stage, status)]}' for status, _ in IngestJob.STATUS_CHOICES
+                      if st.get((stage, status))]
+            if counts:
+                self.stdout.write(f'{label}: ' + ' | '.join(counts))
+
+    def stage_loop(self, stage, batch, interval, stop):
+        """
+        Toma y procesa trabajos de una etapa hasta que se pida parar.
+        """
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                jobs = ingest.claim(stage, batch)
+                if not jobs:
+                    stop.wait(interval)
+                    continue
+                t0 = time.monotonic()
+                ok = ingest.RUNNERS[stage](jobs)
+                names = ', '.join(job.filename for job in jobs)
+                msg = f'[{stage}] {ok}/{len(jobs)} en {time.monotonic() - t0:.1f}s: {names}'
+                self.stdout.write(self.style.SUCCESS(msg) if ok == len(jobs) else self.style.WARNING(msg))
+        finally:
+            # Cada hilo tiene su propia conexión
+            connection.close()
+
+    def handle(self, *args, **opts):
+        if opts['stats']:
+            self.report()
+            return
+
+        reclaimed = ingest.reclaim_stuck(opts['stuck_timeout'])
+        if reclaimed:
+            self.stdout.write(self.style.WARNING(f'Trabajos abandonados reencolados: {reclaimed}'))
+
+        # Límite de concurrencia por etapa: un hilo por worker
+        stop = threading.Event()
+        limits = [
+            (IngestJob.TRANSCRIBE, opts['transcribe_workers'], opts['transcribe_batch']),
+            (IngestJob.PIPELINE, opts['pipeline_workers'], 1),
+            (IngestJob.IMPORT, opts['import_workers'], 1),
+        ]
+        threads = []
+        for stage, workers, batch in limits:
+            for i in range(workers):
+                t = threading.Thread(target=self.stage_loop, name=f'ingest-{stage}-{i}',
+                                     args=(stage, batch, opts['interval'], stop), daemon=True)
+                t.start()
+                threads.append(t)
+
+        # Carpeta única (AUDIOS_PATH): las etapas leen y escriben ahí, los trabajos sólo guardan el nombre
+        folder = settings.REVIEW_INGEST_PATH
+        mode = 'sondeo' if opts['poll'] else 'inotify (o sondeo si no está disponible)'
+        self.stdout.write(f'Vigilando {folder} con {mode}')
+        try:
+            for names in watch(folder, poll=opts['poll'], interval=opts['interval']):
+                close_old_connections()
+                for name in names:
+                    if ingest.is_candidate(name) and ingest.register(folder, name):
+                        self.stdout.write(f'Nuevo: {name}')
+                if opts['once'] and ingest.idle():
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+        self.report()
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from review.models import Audio
+from review.services.versioning import materialize_audio, materialize_pending
+
+
+class Command(BaseCommand):
+    help = 'Genera versiones completas (JSON/TXT) a partir del registro de revisiones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--audio', type=str, help='Título del audio a materializar (aunque no tenga cambios)')
+
+    def handle(self, *args, **opts):
+        title = opts.get('audio')
+        if title:
+            try:
+                audio = Audio.objects.get(title=title)
+            except Audio.DoesNotExist:
+                raise CommandError(f'Audio no encontrado: {title}')
+            materialize_audio(audio)
+            self.stdout.write(self.style.SUCCESS(f'Versión generada: {title}'))
+            return
+
+        count = materialize_pending()
+        self.stdout.write(self.style.SUCCESS(f'Audios materializados: {count}'))
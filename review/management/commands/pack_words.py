@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from review.models import Segment
+from review.services.wordpack import WordArray, pack
+
+
+class Command(BaseCommand):
+    help = 'Empaqueta Segment.words en words_packed (segmentos importados antes del campo o con bulk_create)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Reempaqueta todos los segmentos, no sólo los pendientes')
+        parser.add_argument('--audio', type=int, help='Sólo el audio con este id')
+        parser.add_argument('--batch', type=int, default=1000, help='Segmentos por UPDATE')
+        parser.add_argument('--check', action='store_true',
+                            help='Sólo verifica que words_packed coincida con words y termina')
+
+    def handle(self, *args, **opts):
+        segments = Segment.objects.order_by('pk')
+        if opts['audio']:
+            segments = segments.filter(audio_id=opts['audio'])
+
+        if opts['check']:
+            rows = segments.exclude(words_packed__isnull=True).values_list('pk', 'words', 'words_packed')
+            bad = [pk for pk, words, data in rows.iterator(chunk_size=opts['batch'])
+                   if WordArray(data).to_list() != WordArray.from_list(words).to_list()]
+            pending = segments.filter(words_packed__isnull=True).count()
+            self.stdout.write(f'Sin empaquetar: {pending} | distintos del JSON: {len(bad)}')
+            if bad:
+                self.stdout.write(self.style.WARNING(f'Ejemplos: {bad[:20]} (reparar con --all)'))
+            return
+
+        if not opts['all']:
+            segments = segments.filter(words_packed__isnull=True)
+
+        total = 0
+        batch = []
+        for segment in segments.only('pk', 'words').iterator(chunk_size=opts['batch']):
+            segment.words_packed = pack(segment.words)
+            batch.append(segment)
+            if len(batch) >= opts['batch']:
+                Segment.objects.bulk_update(batch, ['words_packed'])
+                total += len(batch)
+                batch = []
+                self.stdout.write(f'  {total} segmentos')
+        if batch:
+            Segment.objects.bulk_update(batch, ['words_packed'])
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Segmentos empaquetados: {total}'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from review.services.clips import ensure_clip
+from review.services.queue import pending_segments
+
+
+class Command(BaseCommand):
+    help = 'Genera por adelantado los clips de los próximos N segmentos de la cola'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--n', type=int, default=100, help='Cantidad de segmentos pendientes a procesar')
+
+    def handle(self, *args, **opts):
+        segs = (
+            pending_segments()
+            .select_related('audio')
+            .order_by('audio__title', 'start')[:opts['n']]
+        )
+        done = 0
+        for seg in segs:
+            try:
+                ensure_clip(seg)
+                done += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'  {seg}: {e}'))
+        self.stdout.write(self.style.SUCCESS(f'Clips listos: {done}'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from review.models import Audio
+from review.services.version_store import collect_garbage, prune_audio
+
+
+class Command(BaseCommand):
+    help = 'Aplica la política de retención al almacén de versiones y borra objetos huérfanos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--audio', type=str, help='Título de un audio concreto')
+        parser.add_argument('--dry-run', action='store_true', help='Sólo informa qué se eliminaría')
+
+    def handle(self, *args, **opts):
+        audios = Audio.objects.filter(versions__isnull=False).distinct()
+        if opts.get('audio'):
+            audios = audios.filter(title=opts['audio'])
+
+        total = 0
+        for audio in audios:
+            removed = prune_audio(audio, dry_run=opts['dry_run'])
+            if removed:
+                self.stdout.write(f'  {audio.title}: {removed} versiones')
+            total += removed
+
+        if opts['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Se eliminarían {total} versiones.'))
+            return
+
+        objects = collect_garbage()
+        self.stdout.write(self.style.SUCCESS(f'Versiones eliminadas: {total} | objetos borrados: {objects}'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from review.models import Audio
+from review.services.progress import rebuild_reviewer_stats, recompute_audio
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los resúmenes de avance por audio y, opcionalmente, por revisor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--audio', type=int, help='Sólo el audio con este id')
+        parser.add_argument('--reviewers', action='store_true',
+                            help='Reconstruye también las estadísticas diarias desde el historial de revisiones')
+
+    def handle(self, *args, **opts):
+        audios = Audio.objects.all()
+        if opts['audio']:
+            audios = audios.filter(pk=opts['audio'])
+
+        count = 0
+        for audio_id in audios.values_list('pk', flat=True).iterator():
+            recompute_audio(audio_id)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Audios recalculados: {count}'))
+
+        if opts['reviewers']:
+            rows = rebuild_reviewer_stats()
+            self.stdout.write(self.style.SUCCESS(f'Estadísticas de revisores: {rows} filas'))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from review.models import Audio, Segment
+from review.services.search import corrected_text, refresh_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recalcula corrected_text y el índice de búsqueda de texto completo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--audio', type=int, help='Sólo el audio con este id')
+
+    def handle(self, *args, **opts):
+        audios = Audio.objects.all()
+        if opts['audio']:
+            audios = audios.filter(pk=opts['audio'])
+
+        total = 0
+        for audio in audios.iterator():
+            with transaction.atomic():
+                # Sólo los segmentos con correcciones (o texto corregido previo) pueden cambiar
+                corrected = list(
+                    Segment.objects.filter(audio=audio)
+                    .filter(Q(fills__isnull=False) | Q(free_text__gt='') | ~Q(corrected_text=''))
+                    .only('pk', 'words_packed', 'fills', 'free_text', 'corrected_text')
+                )
+                changed = []
+                for segment in corrected:
+                    text = corrected_text(segment)
+                    if text != segment.corrected_text:
+                        segment.corrected_text = text
+                        changed.append(segment)
+                Segment.objects.bulk_update(changed, ['corrected_text'], batch_size=500)
+                total += refresh_vectors(Segment.objects.filter(audio=audio))
+            self.stdout.write(f'  {audio.title}: {len(changed)} corregidos')
+        self.stdout.write(self.style.SUCCESS(f'Segmentos indexados: {total}'))
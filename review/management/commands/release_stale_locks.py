@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from review.services.queue import reclaim_expired
+
+
+class Command(BaseCommand):
+    help = 'Libera en bloque los arriendos de segmentos vencidos (REVIEW_LEASE_TTL)'
+
+    def handle(self, *args, **opts):
+        liberados = reclaim_expired()
+        self.stdout.write(self.style.SUCCESS(f'Arriendos vencidos liberados: {liberados}'))
@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from review.services import retranscribe
+
+
+class Command(BaseCommand):
+    help = 'Worker que re-transcribe ventanas de segmentos con Whisper cargado en memoria'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models',
+                            help='Modelo a precargar (repetible); por defecto REVIEW_RETRANSCRIBE_MODEL')
+        parser.add_argument('--once', action='store_true', help='Procesa los trabajos pendientes y termina')
+        parser.add_argument('--batch', type=int, default=1, help='Trabajos tomados por iteración')
+        parser.add_argument('--interval', type=float, default=1.0, help='Segundos de espera con la cola vacía')
+        parser.add_argument('--stuck-timeout', type=int, default=300,
+                            help='Segundos tras los cuales un trabajo en ejecución se considera abandonado')
+        parser.add_argument('--stats', action='store_true', help='Muestra los trabajos por estado y termina')
+
+    def report(self):
+        st = retranscribe.queue_stats()
+        self.stdout.write(' | '.join(f'{status}: {n}' for status, n in st.items()))
+
+    def handle(self, *args, **opts):
+        if opts['stats']:
+            self.report()
+            return
+
+        # Cargar los modelos antes de atender la cola: cada trabajo sólo paga su ventana
+        transcriber = retranscribe.Transcriber()
+        for name in opts['models'] or [settings.REVIEW_RETRANSCRIBE_MODEL]:
+            t0 = time.monotonic()
+            transcriber.model(name)
+            self.stdout.write(f'Modelo {name} cargado en {time.monotonic() - t0:.1f}s')
+
+        reclaimed = retranscribe.reclaim_stuck(opts['stuck_timeout'])
+        if reclaimed:
+            self.stdout.write(self.style.WARNING(f'Trabajos abandonados recuperados: {reclaimed}'))
+
+        while True:
+            close_old_connections()
+            claimed = retranscribe.claim(opts['batch'])
+            for job in claimed:
+                t0 = time.monotonic()
+                ok = retranscribe.run(job, transcriber)
+                msg = (f'Segmento {job.segment_id} ({job.end - job.start:.1f}s de audio, {job.model_name}): '
+                       f'{time.monotonic() - t0:.2f}s')
+                self.stdout.write(self.style.SUCCESS(msg) if ok else self.style.ERROR(f'{msg} | {job.error}'))
+            if not claimed:
+                if opts['once']:
+                    break
+                time.sleep(opts['interval'])
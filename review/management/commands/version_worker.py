@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from review.services import jobs
+
+
+class Command(BaseCommand):
+    help = 'Worker que materializa versiones de audios desde la tabla VersionJob'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Procesa los trabajos vencidos y termina')
+        parser.add_argument('--batch', type=int, default=5, help='Trabajos tomados por iteración')
+        parser.add_argument('--interval', type=float, default=5.0, help='Segundos de espera con la cola vacía')
+        parser.add_argument('--stuck-timeout', type=int, default=600,
+                            help='Segundos tras los cuales un trabajo en ejecución se considera abandonado')
+        parser.add_argument('--stats', action='store_true', help='Muestra profundidad y retraso de la cola y termina')
+
+    def report(self):
+        st = jobs.queue_stats()
+        self.stdout.write(
+            f"Cola: {st['depth']} pendientes | {st['running']} en ejecución | "
+            f"{st['failed']} fallidos | retraso {st['lag']:.1f}s"
+        )
+
+    def handle(self, *args, **opts):
+        if opts['stats']:
+            self.report()
+            return
+
+        reclaimed = jobs.reclaim_stuck(opts['stuck_timeout'])
+        if reclaimed:
+            self.stdout.write(self.style.WARNING(f'Trabajos abandonados reencolados: {reclaimed}'))
+
+        while True:
+            close_old_connections()
+            claimed = jobs.claim_jobs(opts['batch'])
+            for job in claimed:
+                t0 = time.monotonic()
+                ok = jobs.run_job(job)
+                msg = f'Audio {job.audio_id}: {time.monotonic() - t0:.2f}s'
+                self.stdout.write(self.style.SUCCESS(msg) if ok else self.style.ERROR(f'{msg} | {job.error}'))
+            if claimed:
+                self.report()
+            elif opts['once']:
+                break
+            else:
+                time.sleep(opts['interval'])
@@ -0,0 +1,74 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.utils.decorators import sync_and_async_middleware
+
+from review.services import metrics
+
+logger = logging.getLogger('review.slow')
+
+
+class QueryRecorder:
+    """
+    execute_wrapper que anota (sql, segundos) de cada query de la petición.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+
+def _record(request, response, elapsed, recorder=None):
+    view = _view_name(request)
+    metrics.REQUEST_SECONDS.observe(elapsed, view=view, method=request.method, status=response.status_code)
+    length = response.get('Content-Length')
+    if length and length.isdigit():
+        metrics.RESPONSE_BYTES.inc(int(length), view=view)
+    if recorder is not None:
+        metrics.REQUEST_QUERIES.observe(len(recorder.queries), view=view)
+
+    threshold = settings.REVIEW_SLOW_REQUEST_MS
+    if threshold and elapsed * 1000 >= threshold:
+        lines = [f'{request.method} {request.get_full_path()} [{view}] {elapsed * 1000:.0f} ms']
+        if recorder is not None:
+            lines.append(f'{len(recorder.queries)} queries, '
+                         f'{sum(t for _, t in recorder.queries) * 1000:.0f} ms en SQL')
+            lines += [f'  {t * 1000:7.1f} ms  {sql}' for sql, t in recorder.queries]
+        logger.warning('\n'.join(lines))
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Latencia por vista, queries SQL por petición, bytes servidos y log de peticiones lentas.
+    En vistas asíncronas las queries corren en otro hilo y no se cuentan.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            start = time.perf_counter()
+            response = await get_response(request)
+            _record(request, response, time.perf_counter() - start)
+            return response
+    else:
+        def middleware(request):
+            recorder = QueryRecorder()
+            start = time.perf_counter()
+            with connection.execute_wrapper(recorder):
+                response = get_response(request)
+            _record(request, response, time.perf_counter() - start, recorder)
+            return response
+    return middleware
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='segment',
+            index=models.Index(fields=['revisado', 'locked_at'], name='segment_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0002_segment_queue_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SegmentRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(help_text='Versión del segmento tras la edición')),
+                ('changes', models.JSONField(help_text='Campos modificados en formato {campo: [anterior, nuevo]}')),
+                ('materialized', models.BooleanField(default=False, help_text='Incluida ya en una versión completa del audio')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Fecha de la edición')),
+                ('editor', models.ForeignKey(blank=True, help_text='Usuario que realizó la edición', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='segment_revisions', to=settings.AUTH_USER_MODEL)),
+                ('segment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='review.segment')),
+            ],
+            options={
+                'ordering': ['segment', 'version'],
+                'indexes': [models.Index(condition=models.Q(('materialized', False)), fields=['segment'], name='revision_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0003_segmentrevision'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En ejecución'), ('done', 'Completado'), ('failed', 'Fallido')], default='pending', help_text='Estado del trabajo', max_length=10)),
+                ('run_after', models.DateTimeField(help_text='No ejecutar antes de este instante (ventana de coalescencia)')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Intentos realizados')),
+                ('error', models.TextField(blank=True, help_text='Último error registrado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Fecha de encolado')),
+                ('started_at', models.DateTimeField(blank=True, help_text='Inicio de la última ejecución', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Fin de la última ejecución', null=True)),
+                ('audio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='version_jobs', to='review.audio')),
+            ],
+            options={
+                'ordering': ['run_after'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='versionjob_due_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('audio',), name='versionjob_one_pending')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0004_versionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(help_text='SHA-256 del snapshot completo (JSON canónico)', max_length=64)),
+                ('object_key', models.CharField(help_text='SHA-256 del objeto almacenado (snapshot o delta)', max_length=64)),
+                ('chain', models.PositiveIntegerField(default=0, help_text='Deltas encadenados hasta la versión completa')),
+                ('segments', models.PositiveIntegerField(default=0, help_text='Número de segmentos del snapshot')),
+                ('size', models.PositiveIntegerField(default=0, help_text='Bytes comprimidos del objeto almacenado')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Fecha de la versión')),
+                ('audio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='review.audio')),
+                ('base', models.ForeignKey(blank=True, help_text='Versión sobre la que se aplica el delta (vacío si es completa)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='deltas', to='review.audioversion')),
+            ],
+            options={
+                'ordering': ['audio', '-created_at'],
+                'indexes': [models.Index(fields=['audio', '-created_at'], name='audioversion_recent_idx'), models.Index(fields=['object_key'], name='audioversion_object_idx')],
+            },
+        ),
+    ]
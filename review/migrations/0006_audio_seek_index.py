@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0005_audioversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioSeekIndex',
+            fields=[
+                ('audio', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seek_index', serialize=False, to='review.audio')),
+                ('data', models.BinaryField(help_text='Cabecera + offsets uint32 por intervalo de tiempo')),
+                ('file_size', models.PositiveBigIntegerField(help_text='Tamaño del MP3 indexado (para detectar cambios)')),
+                ('built_at', models.DateTimeField(auto_now=True, help_text='Fecha de construcción del índice')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='audio',
+            name='duration',
+            field=models.FloatField(blank=True, help_text='Duración del audio en segundos', null=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:27
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0006_audio_seek_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='segment',
+            name='corrected_text',
+            field=models.TextField(blank=True, default='', help_text='Texto con las correcciones aplicadas (fills o texto libre)'),
+        ),
+        migrations.AddField(
+            model_name='segment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, help_text='tsvector de text y corrected_text para búsqueda', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='segment',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='segment_search_idx'),
+        ),
+    ]
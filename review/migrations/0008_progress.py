@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0007_segment_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioProgress',
+            fields=[
+                ('audio', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='progress', serialize=False, to='review.audio')),
+                ('segments', models.PositiveIntegerField(default=0, help_text='Segmentos del audio')),
+                ('flagged', models.PositiveIntegerField(default=0, help_text='Segmentos con alguna palabra marcada para revisión')),
+                ('reviewed', models.PositiveIntegerField(default=0, help_text='Segmentos marcados como revisados')),
+                ('flagged_reviewed', models.PositiveIntegerField(default=0, help_text='Segmentos marcados ya revisados')),
+                ('flagged_words', models.PositiveIntegerField(default=0, help_text='Palabras marcadas en total')),
+                ('flagged_words_remaining', models.PositiveIntegerField(default=0, help_text='Palabras marcadas en segmentos sin revisar')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Fecha de la última actualización')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-flagged_words_remaining'], name='audioprogress_remaining_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewerDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(help_text='Día (zona horaria del proyecto)')),
+                ('corrections', models.PositiveIntegerField(default=0, help_text='Revisiones registradas')),
+                ('segments_reviewed', models.PositiveIntegerField(default=0, help_text='Segmentos marcados como revisados')),
+                ('seconds_reviewed', models.FloatField(default=0, help_text='Segundos de audio de los segmentos revisados')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-day', 'user'],
+                'indexes': [models.Index(fields=['day'], name='reviewerstats_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='reviewerdailystats_user_day')],
+            },
+        ),
+    ]
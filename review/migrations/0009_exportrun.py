@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0008_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('running', 'En curso'), ('done', 'Completada'), ('failed', 'Fallida')], default='running', max_length=10)),
+                ('incremental', models.BooleanField(default=False, help_text='Sólo audios modificados desde la exportación anterior')),
+                ('since', models.DateTimeField(blank=True, help_text='Inicio de la exportación anterior usada como corte', null=True)),
+                ('formats', models.CharField(default='txt,json,csv', help_text='Formatos incluidos en el zip', max_length=50)),
+                ('destination', models.CharField(blank=True, help_text='Archivo de salida (vacío si se descargó por HTTP)', max_length=500)),
+                ('audios', models.PositiveIntegerField(default=0, help_text='Audios exportados')),
+                ('segments', models.PositiveIntegerField(default=0, help_text='Segmentos exportados')),
+                ('error', models.TextField(blank=True, help_text='Error de la ejecución fallida')),
+                ('started_at', models.DateTimeField(auto_now_add=True, help_text='Inicio de la exportación')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Fin de la exportación', null=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='segmentrevision',
+            index=models.Index(fields=['created_at'], name='revision_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='exportrun',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_runs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
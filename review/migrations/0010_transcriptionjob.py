@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0009_exportrun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En ejecución'), ('done', 'Completado'), ('failed', 'Fallido')], default='pending', max_length=10)),
+                ('model_name', models.CharField(help_text='Modelo Whisper a usar', max_length=50)),
+                ('temperature', models.FloatField(default=0.0, help_text='Temperatura de decodificación')),
+                ('start', models.FloatField(help_text='Inicio de la ventana recortada (s, con relleno)')),
+                ('end', models.FloatField(help_text='Fin de la ventana recortada (s, con relleno)')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Intentos realizados')),
+                ('result', models.JSONField(blank=True, help_text="Sugerencia: {'text': ..., 'words': [...]}", null=True)),
+                ('error', models.TextField(blank=True, help_text='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transcription_jobs', to=settings.AUTH_USER_MODEL)),
+                ('segment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transcription_jobs', to='review.segment')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='transcriptionjob_due_idx')],
+            },
+        ),
+    ]
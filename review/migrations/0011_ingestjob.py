@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0010_transcriptionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(help_text='Nombre del MP3 en la carpeta vigilada', max_length=255, unique=True)),
+                ('size', models.BigIntegerField(default=0, help_text='Tamaño del archivo al registrarlo (bytes)')),
+                ('mtime', models.FloatField(default=0.0, help_text='mtime del archivo al registrarlo')),
+                ('stage', models.CharField(choices=[('transcribe', 'Transcripción'), ('pipeline', 'Métricas'), ('import', 'Importación'), ('complete', 'Completa')], default='transcribe', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En ejecución'), ('done', 'Completado'), ('failed', 'Fallido')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Intentos en la etapa actual')),
+                ('run_after', models.DateTimeField(help_text='No procesar antes de este instante')),
+                ('error', models.TextField(blank=True, help_text='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('audio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingest_jobs', to='review.audio')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['stage', 'status', 'run_after'], name='ingestjob_due_idx')],
+            },
+        ),
+    ]
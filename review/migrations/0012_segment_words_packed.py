@@ -0,0 +1,40 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:42
+
+from django.db import migrations, models
+
+from review.services.wordpack import pack
+
+BATCH = 1000
+
+
+def pack_existing(apps, schema_editor):
+    """
+    Empaqueta las palabras de los segmentos existentes por lotes
+    (lo mismo que 'manage.py pack_words', dentro de la migración).
+    """
+    Segment = apps.get_model('review', 'Segment')
+    batch = []
+    for segment in Segment.objects.filter(words_packed__isnull=True).only('pk', 'words').iterator(chunk_size=BATCH):
+        segment.words_packed = pack(segment.words)
+        batch.append(segment)
+        if len(batch) >= BATCH:
+            Segment.objects.bulk_update(batch, ['words_packed'])
+            batch = []
+    if batch:
+        Segment.objects.bulk_update(batch, ['words_packed'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0011_ingestjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='segment',
+            name='words_packed',
+            field=models.BinaryField(help_text='Las mismas palabras como arreglos paralelos (review.services.wordpack)', null=True),
+        ),
+        migrations.RunPython(pack_existing, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 
+from review.services.wordpack import WordArray, pack as pack_words
+
 class Audio(models.Model):
     """
     Representa un archivo de audio MP3.
@@ -9,6 +13,7 @@ class Audio(models.Model):
     title = models.CharField(max_length=255, help_text="Título descriptivo del audio")
     file = models.FileField(upload_to='audios/', help_text="Ruta al archivo MP3")
     metadata = models.JSONField(blank=True, null=True, help_text="Metadatos generales en formato JSON")
+    duration = models.FloatField(blank=True, null=True, help_text="Duración del audio en segundos")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Fecha de creación del registro")
     updated_at = models.DateTimeField(auto_now=True, help_text="Fecha de última actualización")
 
@@ -18,6 +23,19 @@ class Audio(models.Model):
     def __str__(self):
         return self.title
 
+class AudioSeekIndex(models.Model):
+    """
+    Índice compacto tiempo→byte del MP3 de un Audio (ver review/services/seek_index.py).
+    Vive en su propia tabla para no cargarlo con cada Audio.
+    """
+    audio = models.OneToOneField(Audio, on_delete=models.CASCADE, primary_key=True, related_name='seek_index')
+    data = models.BinaryField(help_text="Cabecera + offsets uint32 por intervalo de tiempo")
+    file_size = models.PositiveBigIntegerField(help_text="Tamaño del MP3 indexado (para detectar cambios)")
+    built_at = models.DateTimeField(auto_now=True, help_text="Fecha de construcción del índice")
+
+    def __str__(self):
+        return f"Índice {self.audio_id}"
+
 class Segment(models.Model):
     """
     Representa un segmento de un Audio para revisión.
@@ -27,6 +45,11 @@ class Segment(models.Model):
     end = models.FloatField(help_text="Tiempo de fin en segundos")
     text = models.TextField(blank=True, help_text="Texto original de la transcripción")
     words = models.JSONField(help_text="Lista de palabras con timestamps, probabilidad y flag de revisión")
+    words_packed = models.BinaryField(
+        null=True,
+        editable=False,
+        help_text="Las mismas palabras como arreglos paralelos (review.services.wordpack)",
+    )
     fills = models.JSONField(blank=True, null=True, help_text="Correcciones por palabra en formato JSON {index: palabra}")
     free_text = models.TextField(blank=True, null=True, help_text="Transcripción libre ingresada por el usuario")
     revisado = models.BooleanField(default=False, help_text="Marca si el segmento fue revisado")
@@ -40,14 +63,38 @@ class Segment(models.Model):
         help_text="Usuario que actualmente bloqueó el segmento"
     )
     locked_at = models.DateTimeField(blank=True, null=True, help_text="Fecha y hora del bloqueo")
+    corrected_text = models.TextField(blank=True, default='', help_text="Texto con las correcciones aplicadas (fills o texto libre)")
+    search_vector = SearchVectorField(null=True, editable=False, help_text="tsvector de text y corrected_text para búsqueda")
 
     class Meta:
         ordering = ['audio', 'start']
         unique_together = [('audio', 'start', 'end')]
+        indexes = [
+            # Cola de revisión: pendientes y arriendos vencidos
+            models.Index(fields=['revisado', 'locked_at'], name='segment_queue_idx'),
+            # Búsqueda de texto completo
+            GinIndex(fields=['search_vector'], name='segment_search_idx'),
+        ]
 
     def __str__(self):
         return f"{self.audio.title} [{self.start:.2f}-{self.end:.2f}]"
 
+    def save(self, *args, **kwargs):
+        """Mantiene words_packed al día cuando se guardan las palabras."""
+        update_fields = kwargs.get('update_fields')
+        if 'words' not in self.get_deferred_fields() and (update_fields is None or 'words' in update_fields):
+            self.words_packed = pack_words(self.words)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'words_packed'}
+        super().save(*args, **kwargs)
+
+    @property
+    def word_array(self):
+        """Palabras como WordArray; usa words_packed si está cargado y calculado."""
+        if 'words_packed' not in self.get_deferred_fields() and self.words_packed is not None:
+            return WordArray(self.words_packed)
+        return WordArray.from_list(self.words)
+
     def lock(self, user):
         """Bloquea el segmento para edición por un usuario."""
         self.locked_by = user
@@ -59,3 +106,299 @@ class Segment(models.Model):
         self.locked_by = None
         self.locked_at = None
         self.save(update_fields=['locked_by', 'locked_at'])
+
+class SegmentRevision(models.Model):
+    """
+    Registro append-only de las ediciones de un Segment.
+    Sólo guarda los campos que cambiaron, no una copia del audio completo.
+    """
+    segment = models.ForeignKey(Segment, on_delete=models.CASCADE, related_name='revisions')
+    editor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='segment_revisions',
+        help_text="Usuario que realizó la edición"
+    )
+    version = models.PositiveIntegerField(help_text="Versión del segmento tras la edición")
+    changes = models.JSONField(help_text="Campos modificados en formato {campo: [anterior, nuevo]}")
+    materialized = models.BooleanField(default=False, help_text="Incluida ya en una versión completa del audio")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Fecha de la edición")
+
+    class Meta:
+        ordering = ['segment', 'version']
+        indexes = [
+            # Revisiones aún no incluidas en un snapshot del audio
+            models.Index(
+                fields=['segment'],
+                condition=models.Q(materialized=False),
+                name='revision_pending_idx',
+            ),
+            # Exportación incremental: audios con ediciones desde una fecha
+            models.Index(fields=['created_at'], name='revision_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.segment} v{self.version}"
+
+class VersionJob(models.Model):
+    """
+    Trabajo en cola para materializar la versión completa de un Audio.
+    Todas las ediciones de un audio dentro de la ventana de coalescencia
+    comparten un único trabajo pendiente.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En ejecución'),
+        (DONE, 'Completado'),
+        (FAILED, 'Fallido'),
+    ]
+
+    audio = models.ForeignKey(Audio, on_delete=models.CASCADE, related_name='version_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, help_text="Estado del trabajo")
+    run_after = models.DateTimeField(help_text="No ejecutar antes de este instante (ventana de coalescencia)")
+    attempts = models.PositiveIntegerField(default=0, help_text="Intentos realizados")
+    error = models.TextField(blank=True, help_text="Último error registrado")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Fecha de encolado")
+    started_at = models.DateTimeField(blank=True, null=True, help_text="Inicio de la última ejecución")
+    finished_at = models.DateTimeField(blank=True, null=True, help_text="Fin de la última ejecución")
+
+    class Meta:
+        ordering = ['run_after']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='versionjob_due_idx'),
+        ]
+        constraints = [
+            # Un único trabajo pendiente por audio: las ediciones se coalescen en él
+            models.UniqueConstraint(
+                fields=['audio'],
+                condition=models.Q(status='pending'),
+                name='versionjob_one_pending',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.audio_id} [{self.status}]"
+
+class AudioVersion(models.Model):
+    """
+    Versión materializada de un Audio en el almacén de versiones.
+    El contenido vive comprimido y direccionado por hash en media/versiones/objects/,
+    completo o como delta respecto de la versión base.
+    """
+    audio = models.ForeignKey(Audio, on_delete=models.CASCADE, related_name='versions')
+    digest = models.CharField(max_length=64, help_text="SHA-256 del snapshot completo (JSON canónico)")
+    object_key = models.CharField(max_length=64, help_text="SHA-256 del objeto almacenado (snapshot o delta)")
+    base = models.ForeignKey(
+        'self',
+        on_delete=models.PROTECT,
+        blank=True,
+        null=True,
+        related_name='deltas',
+        help_text="Versión sobre la que se aplica el delta (vacío si es completa)"
+    )
+    chain = models.PositiveIntegerField(default=0, help_text="Deltas encadenados hasta la versión completa")
+    segments = models.PositiveIntegerField(default=0, help_text="Número de segmentos del snapshot")
+    size = models.PositiveIntegerField(default=0, help_text="Bytes comprimidos del objeto almacenado")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Fecha de la versión")
+
+    class Meta:
+        ordering = ['audio', '-created_at']
+        indexes = [
+            models.Index(fields=['audio', '-created_at'], name='audioversion_recent_idx'),
+            models.Index(fields=['object_key'], name='audioversion_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.audio.title} @ {self.created_at:%Y-%m-%d %H:%M:%S}"
+
+class AudioProgress(models.Model):
+    """
+    Resumen de avance de revisión de un Audio, mantenido de forma incremental
+    (ver review/services/progress.py) para no recorrer Segment en cada consulta.
+    """
+    audio = models.OneToOneField(Audio, on_delete=models.CASCADE, primary_key=True, related_name='progress')
+    segments = models.PositiveIntegerField(default=0, help_text="Segmentos del audio")
+    flagged = models.PositiveIntegerField(default=0, help_text="Segmentos con alguna palabra marcada para revisión")
+    reviewed = models.PositiveIntegerField(default=0, help_text="Segmentos marcados como revisados")
+    flagged_reviewed = models.PositiveIntegerField(default=0, help_text="Segmentos marcados ya revisados")
+    flagged_words = models.PositiveIntegerField(default=0, help_text="Palabras marcadas en total")
+    flagged_words_remaining = models.PositiveIntegerField(default=0, help_text="Palabras marcadas en segmentos sin revisar")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Fecha de la última actualización")
+
+    class Meta:
+        indexes = [
+            # Tablero: audios con más trabajo pendiente primero
+            models.Index(fields=['-flagged_words_remaining'], name='audioprogress_remaining_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.audio_id}: {self.flagged_reviewed}/{self.flagged}"
+
+class ReviewerDailyStats(models.Model):
+    """
+    Rendimiento diario de un revisor: correcciones, segmentos revisados y segundos de audio revisados.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='review_stats')
+    day = models.DateField(help_text="Día (zona horaria del proyecto)")
+    corrections = models.PositiveIntegerField(default=0, help_text="Revisiones registradas")
+    segments_reviewed = models.PositiveIntegerField(default=0, help_text="Segmentos marcados como revisados")
+    seconds_reviewed = models.FloatField(default=0, help_text="Segundos de audio de los segmentos revisados")
+
+    class Meta:
+        ordering = ['-day', 'user']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='reviewerdailystats_user_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='reviewerstats_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.day}: {self.segments_reviewed}"
+
+class ExportRun(models.Model):
+    """
+    Ejecución de la exportación del corpus (ver review/services/export.py).
+    La última completada define desde cuándo exporta el modo incremental.
+    """
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (RUNNING, 'En curso'),
+        (DONE, 'Completada'),
+        (FAILED, 'Fallida'),
+    ]
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=RUNNING)
+    incremental = models.BooleanField(default=False, help_text="Sólo audios modificados desde la exportación anterior")
+    since = models.DateTimeField(blank=True, null=True, help_text="Inicio de la exportación anterior usada como corte")
+    formats = models.CharField(max_length=50, default='txt,json,csv', help_text="Formatos incluidos en el zip")
+    destination = models.CharField(max_length=500, blank=True, help_text="Archivo de salida (vacío si se descargó por HTTP)")
+    audios = models.PositiveIntegerField(default=0, help_text="Audios exportados")
+    segments = models.PositiveIntegerField(default=0, help_text="Segmentos exportados")
+    error = models.TextField(blank=True, help_text="Error de la ejecución fallida")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='export_runs',
+    )
+    started_at = models.DateTimeField(auto_now_add=True, help_text="Inicio de la exportación")
+    finished_at = models.DateTimeField(blank=True, null=True, help_text="Fin de la exportación")
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Exportación {self.started_at:%Y-%m-%d %H:%M} [{self.status}]"
+
+class TranscriptionJob(models.Model):
+    """
+    Re-transcripción de la ventana [start, end] de un Segment, pedida desde la revisión.
+    La ejecuta el worker transcription_worker con el modelo ya cargado en memoria;
+    el resultado se muestra como sugerencia junto a las palabras actuales.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En ejecución'),
+        (DONE, 'Completado'),
+        (FAILED, 'Fallido'),
+    ]
+
+    segment = models.ForeignKey(Segment, on_delete=models.CASCADE, related_name='transcription_jobs')
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='transcription_jobs',
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    model_name = models.CharField(max_length=50, help_text="Modelo Whisper a usar")
+    temperature = models.FloatField(default=0.0, help_text="Temperatura de decodificación")
+    start = models.FloatField(help_text="Inicio de la ventana recortada (s, con relleno)")
+    end = models.FloatField(help_text="Fin de la ventana recortada (s, con relleno)")
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Intentos realizados")
+    result = models.JSONField(blank=True, null=True, help_text="Sugerencia: {'text': ..., 'words': [...]}")
+    error = models.TextField(blank=True, help_text="Último error")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Cola del worker: pendientes por antigüedad
+            models.Index(fields=['status', 'created_at'], name='transcriptionjob_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Segmento {self.segment_id} [{self.status}]"
+
+class IngestJob(models.Model):
+    """
+    Un MP3 nuevo en la carpeta vigilada, recorriendo las etapas de ingesta:
+    transcripción → pipeline de métricas → importación. Lo procesa el comando ingest_watch.
+    """
+    TRANSCRIBE = 'transcribe'
+    PIPELINE = 'pipeline'
+    IMPORT = 'import'
+    COMPLETE = 'complete'
+    STAGE_CHOICES = [
+        (TRANSCRIBE, 'Transcripción'),
+        (PIPELINE, 'Métricas'),
+        (IMPORT, 'Importación'),
+        (COMPLETE, 'Completa'),
+    ]
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En ejecución'),
+        (DONE, 'Completado'),
+        (FAILED, 'Fallido'),
+    ]
+
+    filename = models.CharField(max_length=255, unique=True, help_text="Nombre del MP3 en la carpeta vigilada")
+    size = models.BigIntegerField(default=0, help_text="Tamaño del archivo al registrarlo (bytes)")
+    mtime = models.FloatField(default=0.0, help_text="mtime del archivo al registrarlo")
+    stage = models.CharField(max_length=10, choices=STAGE_CHOICES, default=TRANSCRIBE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Intentos en la etapa actual")
+    run_after = models.DateTimeField(help_text="No procesar antes de este instante")
+    error = models.TextField(blank=True, help_text="Último error")
+    audio = models.ForeignKey(
+        Audio,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='ingest_jobs',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Cola de cada etapa: pendientes vencidos
+            models.Index(fields=['stage', 'status', 'run_after'], name='ingestjob_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} [{self.stage}/{self.status}]"
@@ -0,0 +1,102 @@
+import math
+
+from django.urls import reverse
+from rest_framework import serializers
+
+from review.services.progress import PROGRESS_FIELDS
+from review.services.search import highlight, jump_url
+from .models import AudioProgress, Segment
+
+
+class SegmentBundleSerializer(serializers.ModelSerializer):
+    """
+    Segmento asignado al revisor, con todo lo necesario para corregirlo sin más peticiones.
+    """
+    audio_title = serializers.CharField(source='audio.title', read_only=True)
+    clip_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Segment
+        fields = (
+            'id', 'audio', 'audio_title', 'start', 'end', 'text', 'words',
+            'fills', 'free_text', 'revisado', 'version', 'locked_at', 'clip_url',
+        )
+
+    def get_clip_url(self, obj):
+        url = reverse('review:segment_clip', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class CorrectionSerializer(serializers.Serializer):
+    """
+    Una corrección dentro de un lote. Sólo se aplican los campos presentes.
+    'version' (opcional) activa el control optimista de concurrencia.
+    """
+    id = serializers.IntegerField()
+    version = serializers.IntegerField(required=False)
+    start = serializers.FloatField(required=False, min_value=0)
+    end = serializers.FloatField(required=False, min_value=0)
+    fills = serializers.DictField(child=serializers.CharField(allow_blank=True, trim_whitespace=True),
+                                  required=False, allow_null=True)
+    free_text = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    revisado = serializers.BooleanField(required=False)
+
+    def validate_fills(self, value):
+        # final_text y la analítica leen las claves con int(k): deben ser índices de palabra
+        if value is None:
+            return value
+        fills = {}
+        for key, text in value.items():
+            try:
+                index = int(key)
+            except ValueError:
+                index = -1
+            if index < 0:
+                raise serializers.ValidationError(f"Clave inválida '{key}': se espera el índice de una palabra.")
+            fills[str(index)] = text
+        return fills
+
+    def validate(self, attrs):
+        # FloatField acepta NaN e infinito, y NaN pasa min_value: romperían clip_window
+        for field in ('start', 'end'):
+            if field in attrs and not math.isfinite(attrs[field]):
+                raise serializers.ValidationError({field: "Debe ser un número finito."})
+        if 'start' in attrs and 'end' in attrs and attrs['end'] < attrs['start']:
+            raise serializers.ValidationError("end debe ser mayor o igual que start.")
+        return attrs
+
+
+class SearchHitSerializer(serializers.ModelSerializer):
+    """
+    Resultado de búsqueda: fragmento resaltado y enlaces para saltar al instante del segmento.
+    """
+    audio_title = serializers.CharField(source='audio.title', read_only=True)
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.SerializerMethodField()
+    audio_url = serializers.SerializerMethodField()
+    edit_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Segment
+        fields = ('id', 'audio', 'audio_title', 'start', 'end', 'revisado', 'rank', 'headline', 'audio_url', 'edit_url')
+
+    def get_headline(self, obj):
+        return str(highlight(obj.headline))
+
+    def get_audio_url(self, obj):
+        return jump_url(obj)
+
+    def get_edit_url(self, obj):
+        return reverse('review:segment_edit', args=[obj.pk])
+
+
+class AudioProgressSerializer(serializers.ModelSerializer):
+    """
+    Resumen de avance de un audio.
+    """
+    audio_title = serializers.CharField(source='audio.title', read_only=True)
+
+    class Meta:
+        model = AudioProgress
+        fields = ('audio', 'audio_title', *PROGRESS_FIELDS, 'updated_at')
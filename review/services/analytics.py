@@ -0,0 +1,308 @@
+"""
+Analítica del corpus: qué tan útiles son las marcas de revisión de
+codes/metricas_correcciones.py y qué tan confiable es la probabilidad de Whisper.
+
+Las palabras y correcciones se cargan una sola vez en arreglos columnares de NumPy
+(una fila por palabra y una por segmento); las estadísticas se calculan sobre ellos.
+
+Una palabra cuenta como corregida si, en un segmento revisado:
+  - con fills: estaba marcada y su fill normalizado difiere de la palabra
+    (igual que final_text, un fill ausente la elimina);
+  - con texto libre: no quedó alineada tal cual con el texto libre (Levenshtein).
+Con fills sólo se pueden corregir palabras marcadas, así que el recall de las
+marcas sólo se estima con los segmentos de texto libre.
+"""
+import os
+import re
+from itertools import chain
+from typing import NamedTuple
+
+import numpy as np
+
+from review.models import Audio, Segment
+from review.services.metrics import timed
+from review.services.wordpack import WordArray
+
+# Percentiles actuales de codes/metricas_correcciones.py (mismas variables de entorno)
+PERCENTILE_AVG = int(os.getenv("PERCENTILE_AVG", 90))
+PERCENTILE_WORDS = int(os.getenv("PERCENTILE_WORDS", 95))
+CANDIDATE_PERCENTILES = tuple(range(5, 100, 5))
+
+_PUNCT = re.compile(r"[^\w\s']+")
+
+
+class Corpus(NamedTuple):
+    """
+    Arreglos paralelos por palabra (w_*) y por segmento (s_*).
+    """
+    w_segment: np.ndarray      # int64, índice del segmento en s_*
+    w_probability: np.ndarray  # float64 (1.0 si Whisper no la trae, como en el pipeline)
+    w_flagged: np.ndarray      # bool
+    w_corrected: np.ndarray    # bool (sólo significativo en segmentos revisados)
+    s_audio: np.ndarray        # int64, id del audio
+    s_reviewed: np.ndarray     # bool
+    s_free_text: np.ndarray    # bool
+    s_errors: np.ndarray       # int64, errores de palabra (sustituciones, borrados e inserciones)
+
+    @property
+    def w_reviewed(self):
+        return self.s_reviewed[self.w_segment]
+
+
+def normalize(text):
+    """
+    Minúsculas y sin puntuación, para comparar palabras.
+    """
+    return _PUNCT.sub('', (text or '').lower()).strip()
+
+
+def align(a, b):
+    """
+    Distancia de Levenshtein entre las listas de palabras a y b, y máscara de las
+    palabras de a que se conservan tal cual. Cada fila de la matriz se calcula
+    vectorizada (las inserciones con un mínimo acumulado).
+    """
+    n, m = len(a), len(b)
+    target = np.array(b, dtype=object)
+    cols = np.arange(m + 1)
+    dist = np.empty((n + 1, m + 1), np.int64)
+    dist[0] = cols
+    for i in range(1, n + 1):
+        row = dist[i - 1] + 1
+        row[1:] = np.minimum(row[1:], dist[i - 1, :-1] + (target != a[i - 1]))
+        dist[i] = np.minimum.accumulate(row - cols) + cols
+
+    kept = np.zeros(n, bool)
+    i, j = n, m
+    while i > 0 and j > 0:
+        if a[i - 1] == b[j - 1] and dist[i, j] == dist[i - 1, j - 1]:
+            kept[i - 1] = True
+            i, j = i - 1, j - 1
+        elif dist[i, j] == dist[i - 1, j - 1] + 1:
+            i, j = i - 1, j - 1
+        elif dist[i, j] == dist[i - 1, j] + 1:
+            i -= 1
+        else:
+            j -= 1
+    return int(dist[n, m]), kept
+
+
+def _corrections(words, review, fills, free_text):
+    """
+    (máscara de palabras corregidas, errores) de un segmento revisado.
+    """
+    original = [normalize(w) for w in words]
+    if free_text:
+        distance, kept = align(original, normalize(free_text).split())
+        return ~kept, distance
+    corrected = np.zeros(len(words), bool)
+    if fills:
+        fills = {int(k): v for k, v in fills.items()}
+        for i in np.flatnonzero(review).tolist():
+            corrected[i] = normalize(fills.get(i, '')) != original[i]
+    return corrected, int(corrected.sum())
+
+
+@timed('load_corpus')
+def load_corpus(audio_ids=None):
+    """
+    Carga el corpus en arreglos columnares con una pasada por Segment
+    (words_packed; el JSON sólo para segmentos aún sin empaquetar).
+    """
+    segments = Segment.objects.order_by()
+    if audio_ids:
+        segments = segments.filter(audio_id__in=audio_ids)
+    fields = ('audio_id', 'revisado', 'fills', 'free_text')
+    packed = segments.filter(words_packed__isnull=False).values_list(*fields, 'words_packed')
+    legacy = segments.filter(words_packed__isnull=True).values_list(*fields, 'words')
+    rows = chain(
+        ((*row[:4], WordArray(row[4])) for row in packed.iterator(chunk_size=2000)),
+        ((*row[:4], WordArray.from_list(row[4])) for row in legacy.iterator(chunk_size=2000)),
+    )
+
+    probs, flags, corrected, s_audio, s_reviewed, s_free, s_errors, s_len = [], [], [], [], [], [], [], []
+    for audio_id, revisado, fills, free_text, words in rows:
+        probs.append(words.probabilities)
+        flags.append(words.review)
+        if revisado:
+            mask, errors = _corrections(words.words, words.review, fills, free_text)
+        else:
+            mask, errors = np.zeros(len(words), bool), 0
+        corrected.append(mask)
+        s_audio.append(audio_id)
+        s_reviewed.append(revisado)
+        s_free.append(bool(revisado and free_text))
+        s_errors.append(errors)
+        s_len.append(len(words))
+
+    def cat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype)
+
+    probability = cat(probs, np.float64)
+    return Corpus(
+        w_segment=np.repeat(np.arange(len(s_len)), s_len),
+        w_probability=np.where(np.isnan(probability), 1.0, probability),
+        w_flagged=cat(flags, bool),
+        w_corrected=cat(corrected, bool),
+        s_audio=np.array(s_audio, np.int64),
+        s_reviewed=np.array(s_reviewed, bool),
+        s_free_text=np.array(s_free, bool),
+        s_errors=np.array(s_errors, np.int64),
+    )
+
+
+def _ratio(num, den):
+    return float(num) / float(den) if den else None
+
+
+def auc(scores, labels):
+    """
+    Área bajo la curva ROC (Mann-Whitney, con rangos promedio en empates).
+    """
+    pos = int(labels.sum())
+    neg = len(labels) - pos
+    if not pos or not neg:
+        return None
+    ranks = np.empty(len(scores))
+    ranks[scores.argsort(kind='mergesort')] = np.arange(1, len(scores) + 1)
+    _, inverse, counts = np.unique(scores, return_inverse=True, return_counts=True)
+    ranks = (np.bincount(inverse, weights=ranks) / counts)[inverse]
+    return float((ranks[labels].sum() - pos * (pos + 1) / 2) / (pos * neg))
+
+
+def grouped_percentile(values, groups, n_groups, p):
+    """
+    Percentil p (interpolación lineal, como np.percentile) de 'values' dentro de cada grupo.
+    """
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    pos = np.maximum(counts - 1, 0) * (p / 100.0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    result = np.full(n_groups, np.nan)
+    has = counts > 0
+    a = ordered[(starts + lo)[has]]
+    b = ordered[(starts + hi)[has]]
+    result[has] = a + (b - a) * (pos - lo)[has]
+    return result
+
+
+def _scores(flagged, actual, beta):
+    tp = int(np.count_nonzero(flagged & actual))
+    precision = _ratio(tp, np.count_nonzero(flagged))
+    recall = _ratio(tp, np.count_nonzero(actual))
+    f = None
+    if precision and recall:
+        f = (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall)
+    return {'flag_rate': _ratio(np.count_nonzero(flagged), len(flagged)),
+            'precision': precision, 'recall': recall, 'f': f}
+
+
+def _sweep(score, groups, n_groups, evaluate, actual, current, beta):
+    """
+    Simula el umbral 'score <= percentil p de su grupo' para cada p candidato.
+    """
+    candidates = []
+    for p in sorted({*CANDIDATE_PERCENTILES, current}):
+        flagged = score <= grouped_percentile(score, groups, n_groups, p)[groups]
+        candidates.append({'percentile': p, **_scores(flagged[evaluate], actual, beta)})
+    # Entre empates, el más cercano al actual
+    best = max(candidates, key=lambda c: (c['f'] or 0.0, -abs(c['percentile'] - current)))
+    return {'current': current, 'suggested': best['percentile'] if best['f'] else current,
+            'candidates': candidates}
+
+
+def report(corpus, buckets=10, beta=2.0, top=20):
+    """
+    Estadísticas del corpus como dict serializable a JSON.
+    beta > 1 pondera más el recall (errores sin marcar) que la precisión al sugerir percentiles.
+    """
+    c = corpus
+    reviewed = c.w_reviewed
+    flagged, corrected, prob = c.w_flagged[reviewed], c.w_corrected[reviewed], c.w_probability[reviewed]
+    free = c.s_free_text[c.w_segment][reviewed]
+
+    # Marcas de revisión
+    flags = {
+        'flagged': int(flagged.sum()),
+        'corrected': int(corrected.sum()),
+        'precision': _ratio(np.count_nonzero(flagged & corrected), np.count_nonzero(flagged)),
+        'recall_free_text': _ratio(np.count_nonzero(flagged & corrected & free),
+                                   np.count_nonzero(corrected & free)),
+        'auc_probability': auc(1.0 - prob, corrected),
+    }
+
+    # Tasa de corrección por tramo de confianza
+    edges = np.linspace(0.0, 1.0, buckets + 1)
+    bucket = np.clip(np.digitize(prob, edges[1:-1]), 0, buckets - 1)
+    words_b = np.bincount(bucket, minlength=buckets)
+    flagged_b = np.bincount(bucket, weights=flagged, minlength=buckets)
+    corrected_b = np.bincount(bucket, weights=corrected, minlength=buckets)
+    by_confidence = [
+        {'range': f'{edges[i]:.2f}-{edges[i + 1]:.2f}', 'words': int(words_b[i]),
+         'flagged': int(flagged_b[i]), 'corrected': int(corrected_b[i]),
+         'correction_rate': _ratio(corrected_b[i], words_b[i])}
+        for i in range(buckets)
+    ]
+
+    # Por audio: WER estimado (errores / palabras de segmentos revisados)
+    audio_ids, s_group = np.unique(c.s_audio, return_inverse=True)
+    w_group = s_group[c.w_segment][reviewed]
+    n_audios = len(audio_ids)
+    words_a = np.bincount(w_group, minlength=n_audios)
+    errors_a = np.bincount(s_group, weights=c.s_errors * c.s_reviewed, minlength=n_audios)
+    prob_a = np.bincount(w_group, weights=prob, minlength=n_audios)
+    flagged_a = np.bincount(w_group, weights=flagged, minlength=n_audios)
+    tp_a = np.bincount(w_group, weights=flagged & corrected, minlength=n_audios)
+    titles = dict(Audio.objects.filter(pk__in=audio_ids.tolist()).values_list('pk', 'title'))
+    # Palabras agrupadas por audio para el AUC de cada uno
+    order = np.argsort(w_group, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(words_a)))
+    per_audio = []
+    for i in np.flatnonzero(words_a).tolist():
+        in_audio = order[bounds[i]:bounds[i + 1]]
+        per_audio.append({
+            'id': int(audio_ids[i]),
+            'title': titles.get(int(audio_ids[i]), ''),
+            'words': int(words_a[i]),
+            'wer': float(errors_a[i] / words_a[i]),
+            'mean_probability': float(prob_a[i] / words_a[i]),
+            'precision': _ratio(tp_a[i], flagged_a[i]),
+            'auc_probability': auc(1.0 - prob[in_audio], corrected[in_audio]),
+        })
+    per_audio.sort(key=lambda a: a['wer'], reverse=True)
+    wer = np.array([a['wer'] for a in per_audio])
+    mean_prob = np.array([a['mean_probability'] for a in per_audio])
+    correlation = None
+    if len(per_audio) > 2 and wer.std() and mean_prob.std():
+        correlation = float(np.corrcoef(mean_prob, wer)[0, 1])
+
+    # Percentiles de metricas_correcciones.py simulados sobre el corpus:
+    # palabras con probabilidad <= percentil de su segmento; segmentos con
+    # log-probabilidad media (aprox. de avg_logprob) <= percentil de su audio
+    n_segments = len(c.s_audio)
+    words_sweep = _sweep(c.w_probability, c.w_segment, n_segments, reviewed, corrected,
+                         PERCENTILE_WORDS, beta)
+    log_prob = np.log(np.clip(c.w_probability, 1e-6, 1.0))
+    s_len = np.bincount(c.w_segment, minlength=n_segments)
+    s_score = np.bincount(c.w_segment, weights=log_prob, minlength=n_segments) / np.maximum(s_len, 1)
+    avg_sweep = _sweep(s_score, s_group, n_audios, c.s_reviewed, (c.s_errors > 0)[c.s_reviewed],
+                       PERCENTILE_AVG, beta)
+
+    return {
+        'words': len(c.w_segment),
+        'reviewed_words': int(reviewed.sum()),
+        'segments': n_segments,
+        'reviewed_segments': int(c.s_reviewed.sum()),
+        'free_text_segments': int(c.s_free_text.sum()),
+        'audios': n_audios,
+        'wer': _ratio(int(c.s_errors[c.s_reviewed].sum()), int(reviewed.sum())),
+        'flags': flags,
+        'by_confidence': by_confidence,
+        'probability_wer_correlation': correlation,
+        'worst_audios': per_audio[:top],
+        'percentile_words': words_sweep,
+        'percentile_avg': avg_sweep,
+    }
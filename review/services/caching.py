@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from review.models import Segment
+from review.services.queue import pending_segments
+
+# Nombre del bloque {% cache %} de segment_edit.html
+FRAGMENT_NAME = 'segment_body'
+PENDING_GEN_KEY = 'review:pending:gen'
+
+
+def _segment_key(pk):
+    return f'review:segment:{pk}'
+
+
+def fragment_key(pk, version):
+    """
+    Clave del fragmento renderizado del segmento (la misma que usa {% cache %}).
+    """
+    return make_template_fragment_key(FRAGMENT_NAME, [pk, version])
+
+
+def get_segment(pk):
+    """
+    Segmento con su audio (select_related), servido desde caché si está vigente.
+    Lanza Segment.DoesNotExist si no existe.
+    """
+    key = _segment_key(pk)
+    segment = cache.get(key)
+    if segment is None:
+        # Las palabras se leen de words_packed; el JSON no se carga
+        segment = Segment.objects.select_related('audio').defer('search_vector', 'words').get(pk=pk)
+        if segment.words_packed is not None:
+            # psycopg2 entrega memoryview, que no se puede guardar en la caché
+            segment.words_packed = bytes(segment.words_packed)
+        cache.set(key, segment, settings.REVIEW_CACHE_TTL)
+    return segment
+
+
+def invalidate_segments(segments):
+    """
+    Descarta de la caché los segmentos [(pk, version), ...] y sus fragmentos.
+    """
+    keys = []
+    for pk, version in segments:
+        keys += [_segment_key(pk), fragment_key(pk, version)]
+    if keys:
+        cache.delete_many(keys)
+
+
+def _pending_generation():
+    return cache.get_or_set(PENDING_GEN_KEY, 1, None)
+
+
+def bump_pending():
+    """
+    Invalida la lista de pendientes cacheada (nueva generación).
+    """
+    try:
+        cache.incr(PENDING_GEN_KEY)
+    except ValueError:
+        cache.set(PENDING_GEN_KEY, 1, None)
+
+
+def pending_ids():
+    """
+    PKs de los segmentos pendientes en orden de navegación (audio, inicio).
+    """
+    key = f'review:pending:{_pending_generation()}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(
+            pending_segments()
+            .order_by('audio__title', 'start')
+            .values_list('pk', flat=True)
+        )
+        cache.set(key, ids, settings.REVIEW_CACHE_TTL)
+    return ids
+
+
+def neighbours(pk):
+    """
+    (anterior, siguiente) del segmento dentro de los pendientes, o None.
+    """
+    ids = pending_ids()
+    try:
+        idx = ids.index(pk)
+    except ValueError:
+        return None, None
+    prev_pk = ids[idx - 1] if idx > 0 else None
+    next_pk = ids[idx + 1] if idx < len(ids) - 1 else None
+    return prev_pk, next_pk
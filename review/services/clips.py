@@ -0,0 +1,131 @@
+import os
+import glob
+import time
+import tempfile
+import subprocess
+
+import imageio_ffmpeg
+from django.conf import settings
+
+from review.services.metrics import timed
+
+
+def _clips_dir():
+    return os.path.join(settings.MEDIA_ROOT, 'clips')
+
+
+def clip_window(segment):
+    """
+    Ventana (inicio, fin) en segundos del clip: el segmento más el relleno.
+    """
+    pad = settings.REVIEW_CLIP_PADDING
+    return max(segment.start - pad, 0.0), segment.end + pad
+
+
+def clip_path(segment):
+    """
+    Ruta del clip en caché. La clave incluye start/end, así que cualquier
+    cambio de tiempos apunta a un clip nuevo.
+    """
+    t0, t1 = clip_window(segment)
+    name = f"{segment.pk}_{int(t0 * 1000)}_{int(t1 * 1000)}.mp3"
+    return os.path.join(_clips_dir(), name)
+
+
+def invalidate(segment_pk, keep=None):
+    """
+    Elimina los clips en caché de un segmento (salvo 'keep').
+    """
+    for path in glob.glob(os.path.join(_clips_dir(), f"{segment_pk}_*.mp3")):
+        if path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _last_used(st):
+    # atime lo renueva touch(); mtime cubre montajes donde el atime quedó atrás
+    return max(st.st_atime, st.st_mtime)
+
+
+def touch(path):
+    """
+    Marca el clip como usado renovando sólo su atime: el mtime (del que salen
+    ETag y Last-Modified) queda fijo y los 304 / If-Range siguen validando.
+    """
+    st = os.stat(path)
+    os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+
+
+def enforce_cache_limit():
+    """
+    Expulsa los clips menos usados (atime más antiguo) hasta respetar REVIEW_CLIP_CACHE_MB.
+    """
+    limit = settings.REVIEW_CLIP_CACHE_MB * 1024 * 1024
+    entries = []
+    total = 0
+    with os.scandir(_clips_dir()) as it:
+        for entry in it:
+            if entry.name.endswith('.mp3'):
+                st = entry.stat()
+                entries.append((_last_used(st), st.st_size, entry.path))
+                total += st.st_size
+    if total <= limit:
+        return 0
+    removed = 0
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+        if total <= limit:
+            break
+    return removed
+
+
+def _publish(tmp, path):
+    """
+    Mueve el clip terminado a su ruta definitiva de forma atómica.
+    mkstemp crea 0600; con REVIEW_MEDIA_OFFLOAD el servidor web también debe leerlo.
+    """
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+@timed('ensure_clip')
+def ensure_clip(segment):
+    """
+    Devuelve la ruta del clip del segmento, generándolo con ffmpeg embebido si no existe.
+    Cada acceso renueva el atime del clip (política LRU).
+    """
+    path = clip_path(segment)
+    try:
+        touch(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(_clips_dir(), exist_ok=True)
+    src = os.path.join(settings.MEDIA_ROOT, segment.audio.file.name)
+    t0, t1 = clip_window(segment)
+    fd, tmp = tempfile.mkstemp(dir=_clips_dir(), suffix='.part')
+    os.close(fd)
+    try:
+        subprocess.run([
+            imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-y',
+            '-ss', f"{t0:.3f}", '-t', f"{t1 - t0:.3f}", '-i', src,
+            '-vn', '-ac', '1', '-ar', '22050', '-b:a', settings.REVIEW_CLIP_BITRATE,
+            '-f', 'mp3', tmp,
+        ], check=True, capture_output=True)
+        _publish(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    # Los clips de tiempos anteriores del segmento ya no sirven
+    invalidate(segment.pk, keep=path)
+    enforce_cache_limit()
+    return path
@@ -0,0 +1,154 @@
+from django.db import transaction
+from django.db.models import F, Q
+
+from review.models import Segment, SegmentRevision
+from review.services import caching
+from review.services.clips import invalidate as invalidate_clips
+from review.services.jobs import enqueue_version
+from review.services.metrics import timed
+from review.services.progress import recompute_audio, record_correction
+from review.services.queue import lease_cutoff
+from review.services.search import corrected_text, refresh_vectors
+from review.services.version_store import load_snapshot
+
+# Campos que un revisor puede modificar en un segmento
+EDITABLE_FIELDS = ('start', 'end', 'revisado', 'fills', 'free_text')
+
+
+def normalize_fills(fills):
+    """
+    Claves de fills como strings, igual que quedan al guardarse en JSON.
+    """
+    if fills is None:
+        return None
+    return {str(k): v for k, v in fills.items()}
+
+
+@timed('apply_correction')
+def apply_correction(segment, user, **values):
+    """
+    Aplica una corrección al segmento y la registra como SegmentRevision.
+
+    Sólo se escriben los campos que cambiaron (más version y el arriendo),
+    por lo que el costo es independiente del tamaño del audio.
+    Devuelve la revisión creada, o None si no hubo cambios.
+    """
+    if 'fills' in values:
+        values['fills'] = normalize_fills(values['fills'])
+
+    changes = {}
+    for field, value in values.items():
+        if field not in EDITABLE_FIELDS:
+            raise ValueError(f"Campo no editable: {field}")
+        old = getattr(segment, field)
+        if old != value:
+            changes[field] = [old, value]
+            setattr(segment, field, value)
+
+    # La edición libera el arriendo del revisor
+    segment.locked_by = None
+    segment.locked_at = None
+    update_fields = ['locked_by', 'locked_at']
+
+    with transaction.atomic():
+        revision = None
+        if changes:
+            segment.version += 1
+            update_fields += list(changes) + ['version']
+            text = corrected_text(segment)
+            if text != segment.corrected_text:
+                segment.corrected_text = text
+                update_fields.append('corrected_text')
+            revision = SegmentRevision.objects.create(
+                segment=segment,
+                editor=user,
+                version=segment.version,
+                changes=changes,
+            )
+        segment.save(update_fields=update_fields)
+        if 'corrected_text' in update_fields:
+            refresh_vectors(Segment.objects.filter(pk=segment.pk))
+        if changes:
+            # Resúmenes de avance (audio y revisor) con incrementos F()
+            record_correction(segment, user, changes)
+            # La versión completa la genera el worker en segundo plano
+            enqueue_version(segment.audio_id)
+        if 'start' in changes or 'end' in changes:
+            pk = segment.pk
+            transaction.on_commit(lambda: invalidate_clips(pk))
+    return revision
+
+
+@timed('restore_version')
+def restore_version(version, user):
+    """
+    Restaura los segmentos del audio al estado de una AudioVersion.
+    Cada segmento restaurado queda registrado como una revisión más.
+
+    Sólo se escriben los segmentos que difieren de la versión; los que otro
+    revisor tiene arrendados (arriendo vigente) no se tocan.
+    Devuelve (segmentos restaurados, segmentos omitidos por arriendo ajeno).
+    """
+    snapshot = load_snapshot(version)
+    segments = Segment.objects.defer('words', 'search_vector').in_bulk(
+        [seg['id'] for seg in snapshot['segments'] if seg and 'id' in seg]
+    )
+    cutoff = lease_cutoff()
+    restored = skipped = 0
+    with transaction.atomic():
+        for seg in snapshot['segments']:
+            segment = segments.get(seg.get('id')) if seg else None
+            if segment is None or segment.audio_id != version.audio_id:
+                continue
+            values = {field: seg.get(field) for field in EDITABLE_FIELDS}
+            values['fills'] = normalize_fills(values['fills'])
+            if all(getattr(segment, field) == value for field, value in values.items()):
+                continue
+            if (segment.locked_by_id not in (None, user.pk)
+                    and segment.locked_at and segment.locked_at >= cutoff):
+                skipped += 1
+                continue
+            if apply_correction(segment, user, **values) is not None:
+                restored += 1
+    return restored, skipped
+
+
+@timed('mark_reviewed')
+def mark_reviewed(segments, user, revisado=True):
+    """
+    Marca en bloque los segmentos del queryset como revisados (o no revisados).
+
+    Un INSERT de revisiones y un UPDATE para todos los segmentos que cambian (más
+    otro que libera sus arriendos propios o vencidos); luego se recalcula el avance
+    y se encola la versión de cada audio afectado. No suma al rendimiento diario
+    del revisor: es una operación de coordinación.
+    Devuelve cuántos segmentos cambiaron.
+    """
+    with transaction.atomic():
+        rows = list(
+            segments.filter(revisado=not revisado)
+            .select_for_update(of=('self',))
+            .values_list('pk', 'version', 'audio_id')
+        )
+        if not rows:
+            return 0
+        SegmentRevision.objects.bulk_create([
+            SegmentRevision(segment_id=pk, editor=user, version=version + 1,
+                            changes={'revisado': [not revisado, revisado]})
+            for pk, version, _ in rows
+        ])
+        changed = Segment.objects.filter(pk__in=[pk for pk, _, _ in rows])
+        changed.update(revisado=revisado, version=F('version') + 1)
+        # Sólo se liberan los arriendos propios o vencidos: el de otro revisor sigue siendo suyo
+        changed.filter(Q(locked_by=user) | Q(locked_at__lt=lease_cutoff())).update(locked_by=None, locked_at=None)
+        audio_ids = sorted({audio_id for _, _, audio_id in rows})
+        for audio_id in audio_ids:
+            recompute_audio(audio_id)
+            enqueue_version(audio_id)
+
+        # update() no emite post_save: invalidación explícita de la caché
+        def invalidate():
+            caching.invalidate_segments([(pk, version) for pk, version, _ in rows])
+            caching.bump_pending()
+        transaction.on_commit(invalidate)
+    return len(rows)
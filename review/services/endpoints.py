@@ -0,0 +1,139 @@
+"""
+Lógica compartida por las vistas síncronas (views.py) y asíncronas (async_views.py)
+de los endpoints de sólo lectura: lectura de parámetros y armado de respuestas.
+
+Las funciones que tocan disco o la base de datos son síncronas; las vistas
+asíncronas las llaman con asyncio.to_thread / sync_to_async.
+"""
+import math
+import os
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils._os import safe_join
+
+from review.models import AudioSeekIndex
+from review.services import peaks, seek_index
+from review.services.media import serve_file
+
+RANGE_ERROR = "start y end deben ser números válidos."
+PEAKS_ERROR = "Parámetros numéricos inválidos."
+
+
+def _finite(value):
+    # float() acepta 'nan' e 'inf', que rompen la búsqueda en el índice y en los picos
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(value)
+    return value
+
+
+def parse_range_params(params):
+    """
+    (start, end) en segundos de ?start=&end=. ValueError si no son números finitos.
+    """
+    start = _finite(params.get('start', 0))
+    end = _finite(params.get('end', start))
+    return start, end
+
+
+def parse_peaks_params(params):
+    """
+    (start, end, level, width) de ?start=&end=&level=&width=. ValueError si son inválidos.
+    """
+    start = _finite(params.get('start', 0))
+    end = _finite(params.get('end', start + 30))
+    level = int(params['level']) if 'level' in params else None
+    width = int(params.get('width', 2000))
+    return start, end, level, width
+
+
+def media_file(filename):
+    """
+    Ruta de un MP3 bajo MEDIA_ROOT/audios/, o Http404 si no existe o sale del directorio.
+    """
+    media_dir = os.path.join(settings.MEDIA_ROOT, 'audios')
+    try:
+        path = safe_join(media_dir, filename)
+    except SuspiciousFileOperation:
+        raise Http404("Audio no encontrado")
+    if not os.path.isfile(path):
+        raise Http404("Audio no encontrado")
+    return path
+
+
+def seek_data(audio):
+    """
+    (ruta del MP3, índice tiempo→byte). Sin índice o con el MP3 reemplazado lo reconstruye.
+    """
+    path = os.path.join(settings.MEDIA_ROOT, audio.file.name)
+    if not os.path.isfile(path):
+        raise Http404("Audio no encontrado")
+    index = AudioSeekIndex.objects.filter(audio=audio).first()
+    if index is None or index.file_size != os.path.getsize(path):
+        return path, seek_index.index_audio(audio)
+    return path, bytes(index.data)
+
+
+def range_response(request, audio, path, data, start, end, asynchronous=False):
+    """
+    Respuesta de audio_range: los bytes del MP3 que cubren [start, end], o sólo
+    el rango en JSON con ?format=json.
+    """
+    rng = seek_index.byte_range(data, start, end)
+    if rng is None:
+        raise Http404("Índice vacío")
+    first, last, time_offset = rng
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'url': reverse('review:stream_audio', args=[os.path.basename(audio.file.name)]),
+            'range': f'bytes={first}-{last}',
+            'time_offset': time_offset,
+        })
+    response = serve_file(request, path, content_type='audio/mpeg', byte_range=(first, last),
+                          asynchronous=asynchronous)
+    # Instante del audio original en que comienza el primer byte servido
+    response['X-Time-Offset'] = f'{time_offset:.3f}'
+    return response
+
+
+def peaks_tile(audio, start, end, level, width):
+    """
+    Tile de picos del audio, o Http404 si aún no tiene forma de onda calculada.
+    """
+    path = peaks.peaks_path(audio)
+    if not os.path.isfile(path):
+        raise Http404("Forma de onda no calculada")
+    return peaks.read_tile(path, start, end, level, width)
+
+
+def peaks_response(tile):
+    data, level, rate, tile_start = tile
+    response = HttpResponse(data, content_type='application/octet-stream')
+    response['X-Peaks-Level'] = str(level)
+    response['X-Peaks-Per-Second'] = f'{rate:g}'
+    response['X-Peaks-Start'] = f'{tile_start:.3f}'
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+
+def version_entry(audio, version):
+    """
+    Una fila de la lista de versiones de audio_versions.
+    """
+    return {
+        'id': version.pk,
+        'created_at': version.created_at.isoformat(),
+        'digest': version.digest,
+        'segments': version.segments,
+        'size': version.size,
+        'delta': version.base_id is not None,
+        'url': reverse('review:audio_version_detail', args=[audio.pk, version.pk]),
+    }
+
+
+def versions_response(audio, versions):
+    return JsonResponse({'audio': audio.title, 'versions': versions})
@@ -0,0 +1,183 @@
+import io
+import csv
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from review.models import Audio, ExportRun, Segment, SegmentRevision
+from review.services.versioning import final_text, with_words
+
+FORMATS = ('txt', 'json', 'csv')
+SEGMENT_FIELDS = ('id', 'start', 'end', 'text', 'words_packed', 'fills', 'free_text', 'revisado')
+
+
+class _Pipe(io.RawIOBase):
+    """
+    Destino no posicionable para ZipFile: acumula lo escrito para entregarlo por partes.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+    def drain(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def changed_audios(since):
+    """
+    Audios importados/modificados o con ediciones de segmentos desde 'since'.
+    """
+    edited = SegmentRevision.objects.filter(created_at__gt=since).values('segment__audio_id')
+    return Audio.objects.filter(Q(updated_at__gt=since) | Q(pk__in=edited))
+
+
+def last_completed():
+    return ExportRun.objects.filter(status=ExportRun.DONE).order_by('-started_at').first()
+
+
+def parse_formats(value):
+    """
+    'txt,csv' → ('txt', 'csv'). Lanza ValueError con formatos desconocidos.
+    """
+    formats = tuple(f.strip() for f in (value or '').split(',') if f.strip()) or FORMATS
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Formatos desconocidos: {', '.join(sorted(unknown))}")
+    return formats
+
+
+def start_run(incremental=False, formats=FORMATS, destination='', user=None):
+    """
+    Registra una ExportRun y devuelve (run, queryset de audios a exportar).
+    """
+    since = None
+    if incremental:
+        previous = last_completed()
+        since = previous.started_at if previous else None
+    run = ExportRun.objects.create(
+        incremental=incremental,
+        since=since,
+        formats=','.join(formats),
+        destination=destination,
+        created_by=user,
+    )
+    audios = changed_audios(since) if since else Audio.objects.all()
+    return run, audios.order_by('title', 'pk')
+
+
+def _render_audio(audio_id, title, formats):
+    """
+    Archivos exportados de un audio: {extensión: bytes}.
+    Recorre los segmentos con un cursor del servidor; sólo un audio vive en memoria.
+    """
+    txt = io.StringIO()
+    rows = io.StringIO()
+    writer = csv.writer(rows)
+    writer.writerow(['id', 'start', 'end', 'revisado', 'text'])
+    segments = []
+    count = 0
+    try:
+        queryset = (
+            Segment.objects.filter(audio_id=audio_id)
+            .order_by('start')
+            .values(*SEGMENT_FIELDS)
+        )
+        records = queryset.iterator(chunk_size=settings.REVIEW_EXPORT_CHUNK)
+        for seg in with_words(records, settings.REVIEW_EXPORT_CHUNK):
+            text = final_text(seg)
+            count += 1
+            txt.write(text + '\n')
+            writer.writerow([seg['id'], seg['start'], seg['end'], int(seg['revisado']), text])
+            if 'json' in formats:
+                segments.append({
+                    'id': seg['id'],
+                    'start': seg['start'],
+                    'end': seg['end'],
+                    'revisado': seg['revisado'],
+                    'text': text,
+                })
+    finally:
+        # Cada hilo usa su propia conexión: cerrarla al terminar
+        connection.close()
+
+    files = {}
+    if 'txt' in formats:
+        files['txt'] = txt.getvalue().encode('utf-8')
+    if 'csv' in formats:
+        files['csv'] = rows.getvalue().encode('utf-8')
+    if 'json' in formats:
+        files['json'] = json.dumps(
+            {'audio': title, 'segments': segments}, ensure_ascii=False, indent=1,
+        ).encode('utf-8')
+    return files, count
+
+
+def iter_export(run, audios, workers=None):
+    """
+    Genera el zip de la exportación por partes (bytes), con los audios procesados en
+    paralelo y una ventana acotada de resultados pendientes. Actualiza 'run' al terminar.
+    """
+    formats = run.formats.split(',')
+    workers = workers or settings.REVIEW_EXPORT_WORKERS
+    pipe = _Pipe()
+    names = set()
+    manifest = []
+    try:
+        with zipfile.ZipFile(pipe, 'w', compression=zipfile.ZIP_DEFLATED) as zf, \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            rows = audios.values_list('pk', 'title').iterator(chunk_size=settings.REVIEW_EXPORT_CHUNK)
+
+            def write(audio_id, title, future):
+                files, count = future.result()
+                name = get_valid_filename(title) or str(audio_id)
+                if name in names:
+                    name = f'{name}_{audio_id}'
+                names.add(name)
+                for ext, data in files.items():
+                    zf.writestr(f'{ext}/{name}.{ext}', data)
+                manifest.append({'id': audio_id, 'title': title, 'file': name, 'segments': count})
+                run.audios += 1
+                run.segments += count
+
+            for audio_id, title in rows:
+                pending.append((audio_id, title, pool.submit(_render_audio, audio_id, title, formats)))
+                # Ventana acotada: nunca más de 2×workers audios renderizados en memoria
+                if len(pending) >= workers * 2:
+                    write(*pending.pop(0))
+                    yield pipe.drain()
+            for item in pending:
+                write(*item)
+                yield pipe.drain()
+
+            zf.writestr('manifest.json', json.dumps({
+                'started_at': run.started_at.isoformat(),
+                'incremental': run.incremental,
+                'since': run.since.isoformat() if run.since else None,
+                'audios': manifest,
+            }, ensure_ascii=False, indent=1))
+        yield pipe.drain()
+    except BaseException as e:
+        run.status = ExportRun.FAILED
+        run.error = str(e) or type(e).__name__
+        raise
+    else:
+        run.status = ExportRun.DONE
+    finally:
+        run.finished_at = timezone.now()
+        run.save(update_fields=['status', 'error', 'audios', 'segments', 'finished_at'])
@@ -0,0 +1,119 @@
+import os
+import json
+import shutil
+
+from django.conf import settings
+from django.db import transaction
+
+from review.models import Audio, Segment
+from review.services import caching
+from review.services.metrics import timed
+from review.services.peaks import compute_peaks
+from review.services.progress import recompute_audio
+from review.services.search import refresh_vectors
+from review.services.seek_index import index_audio
+from review.services.wordpack import pack as pack_words
+
+WEB_READY_SUFFIX = '_new_web_ready.json'
+
+
+def title_for(fname):
+    """
+    Título del audio a partir de su MP3 o de su JSON *_new_web_ready.json.
+    """
+    if fname.endswith(WEB_READY_SUFFIX):
+        return fname[:-len(WEB_READY_SUFFIX)]
+    return os.path.splitext(fname)[0]
+
+
+def import_mp3(src_path, peaks=False):
+    """
+    Copia el MP3 a media/audios, crea o actualiza su Audio y construye el índice
+    tiempo→byte (y la forma de onda con 'peaks'). Devuelve (audio, creado, avisos).
+    """
+    fname = os.path.basename(src_path)
+    dest_dir = os.path.join(settings.MEDIA_ROOT, 'audios')
+    os.makedirs(dest_dir, exist_ok=True)
+    shutil.copy(src_path, os.path.join(dest_dir, fname))
+
+    audio, created = Audio.objects.get_or_create(
+        title=title_for(fname),
+        defaults={'file': os.path.join('audios', fname)},
+    )
+    if not created:
+        audio.file = os.path.join('audios', fname)
+        audio.save()
+
+    warnings = []
+    # Índice tiempo→byte para pedir sólo el rango de cada segmento
+    try:
+        index_audio(audio)
+    except (OSError, ValueError) as e:
+        warnings.append(f'Sin índice de búsqueda para {fname}: {e}')
+    if peaks:
+        try:
+            compute_peaks(audio)
+        except OSError as e:
+            warnings.append(f'Sin forma de onda para {fname}: {e}')
+    return audio, created, warnings
+
+
+def load_segments(json_path):
+    with open(json_path, 'r', encoding='utf-8') as f:
+        loaded = json.load(f)
+    return loaded if isinstance(loaded, list) else loaded.get('segments', [])
+
+
+@timed('import_segments')
+def import_segments(audio, json_path):
+    """
+    Carga (o actualiza) los segmentos del JSON en una transacción y refresca
+    el índice de texto completo y el resumen de avance. Devuelve los creados.
+
+    Un INSERT ... ON CONFLICT (audio, start, end) DO UPDATE por lote: la cantidad
+    de queries no depende del número de segmentos y no se emiten señales por fila
+    (el resumen se recalcula una vez al final y la caché se invalida aquí).
+    """
+    # Clave (start, end): si el JSON repite un segmento, gana el último (como antes)
+    rows = {}
+    for seg in load_segments(json_path):
+        rows[(seg.get('start', 0), seg.get('end', 0))] = seg
+
+    with transaction.atomic():
+        existing = {
+            (start, end): (pk, version)
+            for pk, start, end, version in Segment.objects.filter(audio=audio).values_list('pk', 'start', 'end', 'version')
+        }
+        segments = [
+            Segment(
+                audio=audio,
+                start=start,
+                end=end,
+                text=seg.get('text', ''),
+                words=seg.get('words', []),
+                words_packed=pack_words(seg.get('words', [])),
+            )
+            for (start, end), seg in rows.items()
+        ]
+        Segment.objects.bulk_create(
+            segments,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['audio', 'start', 'end'],
+            update_fields=['text', 'words', 'words_packed'],
+        )
+        # Índice de búsqueda de texto completo, en un solo UPDATE por audio
+        refresh_vectors(Segment.objects.filter(audio=audio))
+        updated = [existing[key] for key in rows if key in existing]
+        transaction.on_commit(lambda: (caching.invalidate_segments(updated), caching.bump_pending()))
+    # Resumen de avance del audio (tablero de progreso)
+    recompute_audio(audio.pk)
+    return [s for s in segments if (s.start, s.end) not in existing]
+
+
+def import_pair(mp3_path, json_path, peaks=False):
+    """
+    Importa un audio y sus segmentos. Devuelve (audio, segmentos creados, avisos).
+    """
+    audio, _, warnings = import_mp3(mp3_path, peaks=peaks)
+    return audio, import_segments(audio, json_path), warnings
@@ -0,0 +1,270 @@
+import os
+import subprocess
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from review.models import IngestJob
+from review.services.importer import WEB_READY_SUFFIX, import_pair, title_for
+from review.services.metrics import timed
+
+# Etapa siguiente de cada etapa
+NEXT_STAGE = {
+    IngestJob.TRANSCRIBE: IngestJob.PIPELINE,
+    IngestJob.PIPELINE: IngestJob.IMPORT,
+    IngestJob.IMPORT: IngestJob.COMPLETE,
+}
+STAGES = tuple(NEXT_STAGE)
+
+
+def is_candidate(name):
+    """
+    MP3 visibles; se ignoran temporales y ocultos (p. ej. '.grabacion.mp3.part' de rsync).
+    """
+    return name.lower().endswith('.mp3') and not name.startswith('.')
+
+
+def register(folder, name):
+    """
+    Registra (o reinicia, si cambió) el trabajo de ingesta de un MP3.
+    Espera REVIEW_INGEST_SETTLE segundos antes de procesarlo por si aún se está copiando.
+    Devuelve el trabajo, o None si el archivo ya no existe o no cambió.
+    """
+    try:
+        st = os.stat(os.path.join(folder, name))
+    except FileNotFoundError:
+        return None
+    run_after = timezone.now() + timedelta(seconds=settings.REVIEW_INGEST_SETTLE)
+    job, created = IngestJob.objects.get_or_create(
+        filename=name,
+        defaults={'size': st.st_size, 'mtime': st.st_mtime, 'run_after': run_after},
+    )
+    if created:
+        return job
+    if (job.size, job.mtime) == (st.st_size, st.st_mtime) or job.status == IngestJob.RUNNING:
+        return None
+    # Archivo reemplazado: vuelve a recorrer todas las etapas
+    job.size, job.mtime = st.st_size, st.st_mtime
+    job.stage, job.status = IngestJob.TRANSCRIBE, IngestJob.PENDING
+    job.attempts, job.error, job.run_after = 0, '', run_after
+    job.save(update_fields=['size', 'mtime', 'stage', 'status', 'attempts', 'error', 'run_after'])
+    return job
+
+
+def claim(stage, limit=1):
+    """
+    Toma hasta 'limit' trabajos vencidos de la etapa con SKIP LOCKED.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            IngestJob.objects.filter(stage=stage, status=IngestJob.PENDING, run_after__lte=now)
+            .order_by('run_after')
+            .select_for_update(skip_locked=True)[:limit]
+        )
+        for job in jobs:
+            job.status = IngestJob.RUNNING
+            job.started_at = now
+            job.attempts += 1
+        IngestJob.objects.bulk_update(jobs, ['status', 'started_at', 'attempts'])
+    return jobs
+
+
+def _settled(folder, job):
+    """
+    True si el MP3 no cambió desde que se registró; si cambió, reprograma la espera.
+    """
+    try:
+        st = os.stat(os.path.join(folder, job.filename))
+    except FileNotFoundError:
+        _requeue(job, 'Archivo no encontrado')
+        return False
+    if (st.st_size, st.st_mtime) == (job.size, job.mtime):
+        return True
+    job.size, job.mtime = st.st_size, st.st_mtime
+    job.status = IngestJob.PENDING
+    job.attempts -= 1
+    job.run_after = timezone.now() + timedelta(seconds=settings.REVIEW_INGEST_SETTLE)
+    job.save(update_fields=['size', 'mtime', 'status', 'attempts', 'run_after'])
+    return False
+
+
+def _advance(job, **fields):
+    """
+    Pasa el trabajo a la etapa siguiente (o lo cierra tras la última).
+    """
+    job.stage = NEXT_STAGE[job.stage]
+    job.status = IngestJob.DONE if job.stage == IngestJob.COMPLETE else IngestJob.PENDING
+    job.attempts = 0
+    job.error = ''
+    job.run_after = job.finished_at = timezone.now()
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=['stage', 'status', 'attempts', 'error', 'run_after', 'finished_at', *fields])
+
+
+def _requeue(job, error):
+    """
+    Reintenta la etapa con espera creciente o marca el trabajo como fallido.
+    """
+    job.error = error
+    job.finished_at = timezone.now()
+    if job.attempts < settings.REVIEW_INGEST_MAX_ATTEMPTS:
+        job.status = IngestJob.PENDING
+        job.run_after = job.finished_at + timedelta(seconds=settings.REVIEW_INGEST_RETRY * job.attempts)
+    else:
+        job.status = IngestJob.FAILED
+    job.save(update_fields=['status', 'run_after', 'error', 'finished_at'])
+
+
+def _run_script(script, names, timeout=None):
+    """
+    Ejecuta un script de codes/ sólo sobre los archivos indicados.
+    Devuelve el final de la salida para registrarlo como error si algo falla.
+    """
+    env = dict(os.environ, AUDIOS_PATH=settings.REVIEW_INGEST_PATH,
+               AUDIOS_OUTPUT_PATH=settings.REVIEW_INGEST_OUTPUT)
+    proc = subprocess.run(
+        [settings.REVIEW_INGEST_PYTHON, script, *names],
+        cwd=settings.REVIEW_INGEST_CODES, env=env, capture_output=True, text=True, timeout=timeout,
+    )
+    tail = (proc.stderr or proc.stdout or '').strip()[-2000:]
+    return proc.returncode, tail
+
+
+def _run_batch(jobs, script, done, timeout=None):
+    """
+    Corre 'script' una vez para todo el lote (el modelo se carga una sola vez)
+    y decide por trabajo según existan sus salidas (done(job) → bool).
+    """
+    folder = settings.REVIEW_INGEST_PATH
+    ready = [job for job in jobs if _settled(folder, job)]
+    if not ready:
+        return 0
+    try:
+        code, tail = _run_script(script, [job.filename for job in ready], timeout)
+    except (OSError, subprocess.SubprocessError) as e:
+        code, tail = -1, f"{type(e).__name__}: {e}"
+    ok = 0
+    for job in ready:
+        if done(job):
+            _advance(job)
+            ok += 1
+        else:
+            _requeue(job, tail or f'Sin salida (código {code})')
+    return ok
+
+
+@timed('ingest_transcribe')
+def run_transcribe(jobs):
+    """
+    Etapa 1: transcripción con codes/transcribir.py (JSON de Whisper junto al MP3).
+    """
+    def output(job):
+        return os.path.join(settings.REVIEW_INGEST_PATH, os.path.splitext(job.filename)[0] + '.json')
+
+    def done(job):
+        try:
+            return os.path.getmtime(output(job)) >= job.mtime
+        except FileNotFoundError:
+            return False
+
+    # MP3 reemplazado: transcribir.py omite archivos con salidas, así que se quita la anterior
+    for job in jobs:
+        if os.path.exists(output(job)) and not done(job):
+            os.remove(output(job))
+    timeout = settings.REVIEW_INGEST_TRANSCRIBE_TIMEOUT or None
+    return _run_batch(jobs, 'transcribir.py', done, timeout)
+
+
+@timed('ingest_pipeline')
+def run_pipeline(jobs):
+    """
+    Etapa 2: métricas y colecta con codes/pipeline_audio.py (*_new_web_ready.json en la salida).
+    """
+    def done(job):
+        try:
+            return os.path.getmtime(_web_ready_path(job)) >= job.mtime
+        except FileNotFoundError:
+            return False
+    return _run_batch(jobs, 'pipeline_audio.py', done)
+
+
+def _web_ready_path(job):
+    return os.path.join(settings.REVIEW_INGEST_OUTPUT, title_for(job.filename) + WEB_READY_SUFFIX)
+
+
+@timed('ingest_import')
+def run_import(jobs):
+    """
+    Etapa 3: importa el MP3 y sus segmentos a la base de datos.
+    """
+    ok = 0
+    for job in jobs:
+        mp3 = os.path.join(settings.REVIEW_INGEST_OUTPUT, job.filename)
+        if not os.path.exists(mp3):
+            mp3 = os.path.join(settings.REVIEW_INGEST_PATH, job.filename)
+        try:
+            audio, _, _ = import_pair(mp3, _web_ready_path(job), peaks=settings.REVIEW_INGEST_PEAKS)
+        except Exception as e:
+            _requeue(job, f"{type(e).__name__}: {e}")
+            continue
+        _advance(job, audio=audio)
+        ok += 1
+    return ok
+
+
+RUNNERS = {
+    IngestJob.TRANSCRIBE: run_transcribe,
+    IngestJob.PIPELINE: run_pipeline,
+    IngestJob.IMPORT: run_import,
+}
+
+
+def requeue_import(audios):
+    """
+    Vuelve a importar los audios ingresados por la carpeta vigilada: sus trabajos
+    pasan a la etapa de importación en un solo UPDATE (los toma ingest_watch).
+    Los trabajos en curso no se tocan. Devuelve (audios reencolados, audios con un trabajo
+    en curso, audios sin trabajo de ingesta, es decir importados a mano).
+    """
+    audios = audios.order_by()
+    jobs = IngestJob.objects.filter(audio__in=audios)
+    running = jobs.filter(status=IngestJob.RUNNING).values('audio_id').distinct().count()
+    missing = audios.filter(ingest_jobs__isnull=True).count()
+    idle = jobs.exclude(status=IngestJob.RUNNING)
+    requeued = idle.values('audio_id').distinct().count()
+    idle.update(
+        stage=IngestJob.IMPORT, status=IngestJob.PENDING, attempts=0, error='', run_after=timezone.now(),
+    )
+    return requeued, running, missing
+
+
+def reclaim_stuck(timeout):
+    """
+    Reencola trabajos 'running' cuyo proceso murió hace más de 'timeout' segundos.
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    count = 0
+    for job in IngestJob.objects.filter(status=IngestJob.RUNNING, started_at__lt=cutoff):
+        _requeue(job, 'Worker sin respuesta')
+        count += 1
+    return count
+
+
+def queue_stats():
+    """
+    Trabajos por etapa y estado: {(etapa, estado): n}.
+    """
+    rows = IngestJob.objects.order_by().values('stage', 'status').annotate(n=Count('pk'))
+    return {(row['stage'], row['status']): row['n'] for row in rows}
+
+
+def idle():
+    """
+    True si no queda trabajo pendiente ni en ejecución en ninguna etapa.
+    """
+    return not IngestJob.objects.filter(status__in=[IngestJob.PENDING, IngestJob.RUNNING]).exists()
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from review.models import Audio, VersionJob
+from review.services.metrics import timed
+from review.services.versioning import materialize_audio
+
+
+def enqueue_version(audio_id):
+    """
+    Encola la materialización del audio. Si ya hay un trabajo pendiente
+    para él, la edición se coalesce en ese trabajo y no se crea otro.
+    """
+    run_after = timezone.now() + timedelta(seconds=settings.REVIEW_VERSION_WINDOW)
+    # get_or_create ya envuelve el INSERT en un savepoint y, si choca con la
+    # restricción de un trabajo pendiente por audio, relee el que ganó la carrera
+    job, _ = VersionJob.objects.get_or_create(
+        audio_id=audio_id,
+        status=VersionJob.PENDING,
+        defaults={'run_after': run_after},
+    )
+    return job
+
+
+def claim_jobs(limit=1):
+    """
+    Toma hasta 'limit' trabajos vencidos con SKIP LOCKED y los marca en ejecución.
+    Varios workers pueden correr en paralelo sin tomar el mismo trabajo.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            VersionJob.objects.filter(status=VersionJob.PENDING, run_after__lte=now)
+            .order_by('run_after')
+            .select_for_update(skip_locked=True)[:limit]
+        )
+        for job in jobs:
+            job.status = VersionJob.RUNNING
+            job.started_at = now
+            job.attempts += 1
+        VersionJob.objects.bulk_update(jobs, ['status', 'started_at', 'attempts'])
+    return jobs
+
+
+def _requeue(job, error):
+    """
+    Devuelve un trabajo fallido a la cola con espera creciente, o lo marca
+    como fallido si agotó sus intentos o ya existe otro pendiente para el audio.
+    """
+    job.error = error
+    job.finished_at = timezone.now()
+    if job.attempts < settings.REVIEW_VERSION_MAX_ATTEMPTS:
+        job.status = VersionJob.PENDING
+        job.run_after = job.finished_at + timedelta(seconds=settings.REVIEW_VERSION_WINDOW * job.attempts)
+        try:
+            with transaction.atomic():
+                job.save(update_fields=['status', 'run_after', 'error', 'finished_at'])
+            return
+        except IntegrityError:
+            # Una edición posterior ya encoló otro trabajo que cubre este
+            pass
+    job.status = VersionJob.FAILED
+    job.save(update_fields=['status', 'error', 'finished_at'])
+
+
+@timed('run_job')
+def run_job(job):
+    """
+    Materializa la versión del audio del trabajo. Devuelve True si terminó bien.
+    """
+    try:
+        materialize_audio(Audio.objects.get(pk=job.audio_id))
+    except Exception as e:
+        _requeue(job, f"{type(e).__name__}: {e}")
+        return False
+    job.status = VersionJob.DONE
+    job.error = ''
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    return True
+
+
+def reclaim_stuck(timeout):
+    """
+    Reencola trabajos 'running' cuyo worker murió hace más de 'timeout' segundos.
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    count = 0
+    for job in VersionJob.objects.filter(status=VersionJob.RUNNING, started_at__lt=cutoff):
+        _requeue(job, 'Worker sin respuesta')
+        count += 1
+    return count
+
+
+def queue_stats():
+    """
+    Profundidad de la cola y retraso (segundos) del trabajo vencido más antiguo.
+    """
+    now = timezone.now()
+    pending = VersionJob.objects.filter(status=VersionJob.PENDING)
+    oldest_due = pending.filter(run_after__lte=now).aggregate(oldest=Min('run_after'))['oldest']
+    return {
+        'depth': pending.count(),
+        'running': VersionJob.objects.filter(status=VersionJob.RUNNING).count(),
+        'failed': VersionJob.objects.filter(status=VersionJob.FAILED).count(),
+        'lag': (now - oldest_due).total_seconds() if oldest_due else 0.0,
+    }
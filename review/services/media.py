@@ -0,0 +1,169 @@
+import os
+import re
+import asyncio
+import mimetypes
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFileWrapper:
+    """
+    Itera un rango de bytes de un archivo ya abierto, en bloques grandes.
+    Un único descriptor por respuesta; se cierra al terminar la respuesta.
+    """
+
+    def __init__(self, fp, start, length, chunk_size):
+        self.fp = fp
+        self.remaining = length
+        self.chunk_size = chunk_size
+        fp.seek(start)
+
+    def __iter__(self):
+        while self.remaining > 0:
+            data = self.fp.read(min(self.chunk_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.fp.close()
+
+
+class AsyncRangeFileWrapper(RangeFileWrapper):
+    """
+    Variante asíncrona para ASGI: cada lectura corre en un hilo, sin bloquear
+    el event loop, así un proceso atiende muchas descargas simultáneas.
+    """
+
+    def __aiter__(self):
+        return self._aiter()
+
+    async def _aiter(self):
+        while self.remaining > 0:
+            data = await asyncio.to_thread(self.fp.read, min(self.chunk_size, self.remaining))
+            if not data:
+                break
+            self.remaining -= len(data)
+            yield data
+
+
+def file_etag(st):
+    """
+    ETag barato a partir del tamaño y el mtime (ns) del archivo.
+    """
+    return quote_etag(f"{st.st_size:x}-{st.st_mtime_ns:x}")
+
+
+def parse_range(header, size):
+    """
+    Interpreta un header Range de un solo rango. Devuelve (inicio, fin) inclusivos,
+    None si no hay rango utilizable, o False si el rango es insatisfacible.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Sufijo: últimos N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _if_range_matches(request, etag, mtime):
+    """
+    If-Range: el rango sólo se respeta si el archivo no cambió.
+    """
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    date = parse_http_date_safe(value)
+    return date is not None and int(mtime) <= date
+
+
+def _offload_response(path, content_type):
+    """
+    Delega el envío al servidor web (sendfile sin copia en el proceso Django).
+    """
+    mode = settings.REVIEW_MEDIA_OFFLOAD
+    response = HttpResponse(content_type=content_type)
+    if mode == 'nginx':
+        rel = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        response['X-Accel-Redirect'] = settings.REVIEW_MEDIA_OFFLOAD_PREFIX.rstrip('/') + '/' + rel
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def serve_file(request, path, content_type=None, byte_range=None, asynchronous=False):
+    """
+    Sirve un archivo de medios con soporte de Range, If-Range y peticiones
+    condicionales (ETag / Last-Modified → 304).
+
+    'byte_range' fuerza un rango (inicio, fin) cuando lo calcula el servidor
+    (p. ej. a partir de un índice tiempo→byte) en lugar del header Range.
+    'asynchronous' entrega el cuerpo como iterador asíncrono (vistas ASGI).
+    """
+    st = os.stat(path)
+    size = st.st_size
+    etag = file_etag(st)
+    content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    # 304 Not Modified / 412 Precondition Failed
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if conditional is not None:
+        return conditional
+
+    if settings.REVIEW_MEDIA_OFFLOAD and byte_range is None:
+        # El servidor web resuelve Range/If-Range por su cuenta
+        response = _offload_response(path, content_type)
+    else:
+        if byte_range is None and _if_range_matches(request, etag, st.st_mtime):
+            byte_range = parse_range(request.META.get('HTTP_RANGE', ''), size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        fp = open(path, 'rb')
+        if byte_range is None and asynchronous:
+            response = StreamingHttpResponse(
+                AsyncRangeFileWrapper(fp, 0, size, settings.REVIEW_STREAM_CHUNK),
+                content_type=content_type,
+            )
+            response['Content-Length'] = str(size)
+        elif byte_range is None:
+            # Archivo completo: FileResponse usa wsgi.file_wrapper (sendfile) si existe
+            response = FileResponse(fp, content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            wrapper = AsyncRangeFileWrapper if asynchronous else RangeFileWrapper
+            response = StreamingHttpResponse(
+                wrapper(fp, start, length, settings.REVIEW_STREAM_CHUNK),
+                status=206,
+                content_type=content_type,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(length)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(st.st_mtime)
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
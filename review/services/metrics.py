@@ -0,0 +1,164 @@
+"""
+Registro de métricas en memoria del proceso, expuesto en formato de texto de Prometheus.
+
+Cada proceso (worker WSGI/ASGI o comando) lleva sus propios contadores;
+Prometheus los distingue por la instancia que raspa.
+"""
+import bisect
+import threading
+import time
+from functools import wraps
+
+# Cubetas por defecto (segundos), pensadas para vistas y servicios
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Cubetas para conteos de queries SQL por petición
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_lock = threading.Lock()
+_registry = {}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in key
+    )
+    return '{' + body + '}'
+
+
+class Counter:
+    """
+    Contador monótono con etiquetas.
+    """
+    kind = 'counter'
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, key, value
+
+
+class Gauge(Counter):
+    """
+    Valor instantáneo con etiquetas.
+    """
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with _lock:
+            self.values[_label_key(labels)] = value
+
+
+class Histogram:
+    """
+    Histograma acumulativo con cubetas fijas (_bucket, _sum y _count).
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, help, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if idx < len(self.buckets):
+                entry[0][idx] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        for key, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield self.name + '_bucket', key + (('le', f'{bound:g}'),), cumulative
+            yield self.name + '_bucket', key + (('le', '+Inf'),), count
+            yield self.name + '_sum', key, total
+            yield self.name + '_count', key, count
+
+
+def _register(metric):
+    with _lock:
+        return _registry.setdefault(metric.name, metric)
+
+
+def counter(name, help):
+    return _register(Counter(name, help))
+
+
+def gauge(name, help):
+    return _register(Gauge(name, help))
+
+
+def histogram(name, help, buckets=DEFAULT_BUCKETS):
+    return _register(Histogram(name, help, buckets))
+
+
+def render():
+    """
+    Todas las métricas registradas en formato de exposición de texto de Prometheus.
+    """
+    lines = []
+    with _lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, key, value in list(metric.samples()):
+                lines.append(f'{name}{_format_labels(key)} {value:g}')
+    return '\n'.join(lines) + '\n'
+
+
+# Métricas de la aplicación
+REQUEST_SECONDS = histogram('review_request_seconds', 'Latencia por vista (hasta el primer byte)')
+REQUEST_QUERIES = histogram('review_request_queries', 'Queries SQL por petición', QUERY_BUCKETS)
+RESPONSE_BYTES = counter('review_response_bytes_total', 'Bytes declarados (Content-Length) por vista')
+SERVICE_SECONDS = histogram('review_service_seconds', 'Duración de operaciones de servicio')
+SERVICE_ERRORS = counter('review_service_errors_total', 'Operaciones de servicio que lanzaron excepción')
+VERSION_QUEUE = gauge('review_version_queue', 'Trabajos de versionado por estado')
+VERSION_QUEUE_LAG = gauge('review_version_queue_lag_seconds', 'Retraso del trabajo vencido más antiguo')
+TRANSCRIPTION_QUEUE = gauge('review_transcription_queue', 'Trabajos de re-transcripción por estado')
+INGEST_QUEUE = gauge('review_ingest_queue', 'Trabajos de ingesta por etapa y estado')
+DB_CONNECTIONS = counter('review_db_connections_total',
+                         'Conexiones a la base de datos abiertas (o tomadas del pool) por este proceso')
+
+
+def timed(op):
+    """
+    Decorador: registra la duración de la función en review_service_seconds{op=...}.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                SERVICE_ERRORS.inc(op=op)
+                raise
+            finally:
+                SERVICE_SECONDS.observe(time.perf_counter() - start, op=op)
+        return wrapper
+    return decorator
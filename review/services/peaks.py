@@ -0,0 +1,138 @@
+import os
+import struct
+import tempfile
+import subprocess
+
+import numpy as np
+import imageio_ffmpeg
+from django.conf import settings
+
+from review.services.metrics import timed
+
+# Archivo de picos: cabecera, tabla de niveles (offset, bins) y datos int8 [min, max] por bin
+HEADER = struct.Struct('<4sHIIH')
+LEVEL = struct.Struct('<QQ')
+MAGIC = b'PEAK'
+VERSION = 1
+
+
+def peaks_path(audio):
+    return os.path.join(settings.MEDIA_ROOT, 'peaks', f"{audio.pk}.bin")
+
+
+def _decode_blocks(path, sample_rate, block_samples):
+    """
+    Decodifica el MP3 a PCM mono int16 con ffmpeg, entregándolo en bloques
+    (nunca se tiene el audio completo en memoria).
+    """
+    proc = subprocess.Popen([
+        imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-i', path,
+        '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-',
+    ], stdout=subprocess.PIPE)
+    try:
+        while True:
+            raw = proc.stdout.read(block_samples * 2)
+            if not raw:
+                break
+            yield np.frombuffer(raw, dtype='<i2')
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise OSError(f"ffmpeg no pudo decodificar {path}")
+
+
+def _base_level(path, sample_rate, samples_per_peak):
+    """
+    Picos [min, max] por bin de 'samples_per_peak' muestras, cuantizados a int8.
+    """
+    chunks = []
+    carry = np.empty(0, dtype='<i2')
+    # Bloques múltiplos del bin: sólo el último bin puede quedar incompleto
+    for block in _decode_blocks(path, sample_rate, samples_per_peak * 4096):
+        block = np.concatenate([carry, block]) if carry.size else block
+        usable = block.size - block.size % samples_per_peak
+        carry = block[usable:]
+        if usable:
+            frames = block[:usable].reshape(-1, samples_per_peak)
+            chunks.append(np.stack([frames.min(axis=1), frames.max(axis=1)], axis=1))
+    if carry.size:
+        chunks.append(np.array([[carry.min(), carry.max()]], dtype='<i2'))
+    if not chunks:
+        return np.zeros((0, 2), dtype=np.int8)
+    return (np.concatenate(chunks) >> 8).astype(np.int8)
+
+
+def _reduce(level):
+    """
+    Nivel siguiente: cada bin cubre el doble de tiempo (min de mínimos, max de máximos).
+    """
+    if level.shape[0] % 2:
+        level = np.concatenate([level, level[-1:]])
+    pairs = level.reshape(-1, 2, 2)
+    return np.stack([pairs[:, :, 0].min(axis=1), pairs[:, :, 1].max(axis=1)], axis=1)
+
+
+@timed('compute_peaks')
+def compute_peaks(audio):
+    """
+    Calcula los picos multirresolución del audio y los guarda en media/peaks/<pk>.bin.
+    Nivel 0: REVIEW_PEAKS_PER_SECOND bins/s; cada nivel siguiente la mitad.
+    """
+    sample_rate = settings.REVIEW_PEAKS_SAMPLE_RATE
+    samples_per_peak = sample_rate // settings.REVIEW_PEAKS_PER_SECOND
+    src = os.path.join(settings.MEDIA_ROOT, audio.file.name)
+
+    levels = [_base_level(src, sample_rate, samples_per_peak)]
+    while levels[-1].shape[0] > settings.REVIEW_PEAKS_MIN_BINS:
+        levels.append(_reduce(levels[-1]))
+
+    table, offset = [], HEADER.size + LEVEL.size * len(levels)
+    for lvl in levels:
+        table.append(LEVEL.pack(offset, lvl.shape[0]))
+        offset += lvl.nbytes
+
+    path = peaks_path(audio)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.part')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, sample_rate, samples_per_peak, len(levels)))
+        f.write(b''.join(table))
+        for lvl in levels:
+            f.write(lvl.tobytes())
+    # mkstemp crea 0600; el servidor web también debe poder leerlo
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+    return path
+
+
+@timed('read_tile')
+def read_tile(path, start, end, level=None, width=2000):
+    """
+    Picos de [start, end] segundos. Sin 'level' se elige el nivel más fino
+    que no supere 'width' bins. Devuelve (bytes int8 [min, max]..., nivel, bins/s, inicio real).
+    """
+    with open(path, 'rb') as f:
+        magic, version, sample_rate, samples_per_peak, nlevels = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Archivo de picos inválido")
+        table = [LEVEL.unpack(f.read(LEVEL.size)) for _ in range(nlevels)]
+
+        base_rate = sample_rate / samples_per_peak
+        span = max(end - start, 0.0)
+        if level is None:
+            level = 0
+            while level < nlevels - 1 and span * base_rate / (2 ** level) > width:
+                level += 1
+        level = min(max(level, 0), nlevels - 1)
+
+        rate = base_rate / (2 ** level)
+        offset, bins = table[level]
+        # Acotado a la duración antes de pasar a bins: int() de un start enorme desborda
+        duration = bins / rate
+        start = min(max(start, 0.0), duration)
+        end = min(max(end, start), duration)
+        first = min(int(start * rate), bins)
+        last = min(max(int(np.ceil(end * rate)), first), bins, first + settings.REVIEW_PEAKS_MAX_BINS)
+        f.seek(offset + first * 2)
+        data = f.read((last - first) * 2)
+    return data, level, rate, first / rate
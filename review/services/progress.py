@@ -0,0 +1,201 @@
+from datetime import timedelta
+from itertools import chain
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from review.models import Audio, AudioProgress, ReviewerDailyStats, Segment, SegmentRevision
+from review.services.metrics import timed
+from review.services.wordpack import WordArray
+
+# Contadores de AudioProgress
+PROGRESS_FIELDS = ('segments', 'flagged', 'reviewed', 'flagged_reviewed', 'flagged_words', 'flagged_words_remaining')
+
+
+def flagged_words(words):
+    """
+    Número de palabras marcadas para revisión en la lista 'words' de un segmento.
+    """
+    return sum(1 for w in words or [] if w.get('review'))
+
+
+def _segment_counts(n, revisado):
+    """
+    Aporte de un segmento con 'n' palabras marcadas a los contadores de AudioProgress.
+    """
+    return {
+        'segments': 1,
+        'reviewed': int(revisado),
+        'flagged_words': n,
+        'flagged': int(n > 0),
+        'flagged_reviewed': int(n > 0 and revisado),
+        'flagged_words_remaining': 0 if revisado else n,
+    }
+
+
+@timed('recompute_audio')
+def recompute_audio(audio_id):
+    """
+    Recalcula desde cero el resumen de un audio (importación o reparación).
+    Recorre sólo los segmentos de ese audio, sin cargar los modelos completos.
+    """
+    counts = dict.fromkeys(PROGRESS_FIELDS, 0)
+    segments = Segment.objects.filter(audio_id=audio_id)
+    # Palabras empaquetadas: se cuentan los flags sin decodificar palabras;
+    # los segmentos aún sin empaquetar (pack_words pendiente) se leen del JSON
+    packed = segments.filter(words_packed__isnull=False).values_list('words_packed', 'revisado')
+    legacy = segments.filter(words_packed__isnull=True).values_list('words', 'revisado')
+    rows = chain(
+        ((WordArray(data).flagged, revisado) for data, revisado in packed.iterator(chunk_size=2000)),
+        ((flagged_words(words), revisado) for words, revisado in legacy.iterator(chunk_size=2000)),
+    )
+    for n, revisado in rows:
+        for field, value in _segment_counts(n, bool(revisado)).items():
+            counts[field] += value
+    AudioProgress.objects.update_or_create(audio_id=audio_id, defaults=counts)
+    return counts
+
+
+def _apply_delta(audio_id, **delta):
+    """
+    Suma 'delta' al resumen del audio con expresiones F() (sin leer la fila).
+    Los contadores son PositiveIntegerField: un resumen desfasado no baja de cero.
+    Si el audio aún no tiene resumen, lo calcula completo.
+    """
+    values = {field: Greatest(F(field) + n, 0) for field, n in delta.items() if n}
+    if not values:
+        return
+    if not AudioProgress.objects.filter(audio_id=audio_id).update(**values):
+        recompute_audio(audio_id)
+
+
+def segment_added(segment):
+    """
+    Suma un segmento creado fuera de la importación (admin, shell) al resumen de su audio.
+    """
+    _apply_delta(segment.audio_id, **_segment_counts(segment.word_array.flagged, segment.revisado))
+
+
+def segment_removed(segment):
+    """
+    Descuenta un segmento borrado del resumen de su audio.
+    """
+    counts = _segment_counts(segment.word_array.flagged, segment.revisado)
+    _apply_delta(segment.audio_id, **{field: -n for field, n in counts.items()})
+
+
+def schedule_recompute(audio_id):
+    """
+    Recalcula el resumen del audio al confirmar la transacción en curso
+    (guardados completos que no pasan por record_correction, p. ej. el admin).
+    """
+    def run():
+        if Audio.objects.filter(pk=audio_id).exists():
+            recompute_audio(audio_id)
+    transaction.on_commit(run)
+
+
+def record_correction(segment, user, changes):
+    """
+    Actualiza los resúmenes tras una corrección ya guardada.
+    'changes' es el diff {campo: [anterior, nuevo]} de la SegmentRevision.
+    """
+    became = None
+    if 'revisado' in changes:
+        became = bool(changes['revisado'][1])
+        n = segment.word_array.flagged
+        sign = 1 if became else -1
+        _apply_delta(
+            segment.audio_id,
+            reviewed=sign,
+            flagged_reviewed=sign if n else 0,
+            flagged_words_remaining=-sign * n,
+        )
+
+    if user is None:
+        return
+    day = timezone.localdate()
+    seconds = max(segment.end - segment.start, 0.0)
+    values = {'corrections': F('corrections') + 1}
+    if became is True:
+        values['segments_reviewed'] = F('segments_reviewed') + 1
+        values['seconds_reviewed'] = F('seconds_reviewed') + seconds
+    stats = ReviewerDailyStats.objects.filter(user=user, day=day)
+    # Lo habitual es que la fila del día ya exista: un solo UPDATE
+    if stats.update(**values):
+        return
+    try:
+        with transaction.atomic():
+            ReviewerDailyStats.objects.create(
+                user=user,
+                day=day,
+                corrections=1,
+                segments_reviewed=1 if became is True else 0,
+                seconds_reviewed=seconds if became is True else 0.0,
+            )
+    except IntegrityError:
+        # Otra corrección del mismo revisor creó la fila entre el UPDATE y el INSERT
+        stats.update(**values)
+
+
+def rebuild_reviewer_stats():
+    """
+    Reconstruye ReviewerDailyStats a partir del historial de SegmentRevision.
+    """
+    stats = {}
+    rows = (
+        SegmentRevision.objects.filter(editor__isnull=False)
+        .values_list('editor_id', 'created_at', 'changes', 'segment__start', 'segment__end')
+    )
+    for editor_id, created_at, changes, start, end in rows.iterator(chunk_size=5000):
+        key = (editor_id, timezone.localdate(created_at))
+        entry = stats.setdefault(key, [0, 0, 0.0])
+        entry[0] += 1
+        if 'revisado' in changes and changes['revisado'][1]:
+            entry[1] += 1
+            entry[2] += max(end - start, 0.0)
+    with transaction.atomic():
+        ReviewerDailyStats.objects.all().delete()
+        ReviewerDailyStats.objects.bulk_create([
+            ReviewerDailyStats(user_id=user_id, day=day, corrections=c, segments_reviewed=n, seconds_reviewed=secs)
+            for (user_id, day), (c, n, secs) in stats.items()
+        ], batch_size=1000)
+    return len(stats)
+
+
+def totals():
+    """
+    Totales del corpus: una suma sobre AudioProgress (una fila por audio).
+    """
+    sums = AudioProgress.objects.aggregate(**{f: Sum(f) for f in PROGRESS_FIELDS})
+    return {f: sums[f] or 0 for f in PROGRESS_FIELDS}
+
+
+def audios_by_remaining():
+    """
+    Resúmenes por audio, primero los que tienen más palabras marcadas pendientes.
+    """
+    return (
+        AudioProgress.objects.select_related('audio')
+        .only('audio__title', *PROGRESS_FIELDS, 'updated_at')
+        .order_by('-flagged_words_remaining', 'audio_id')
+    )
+
+
+def reviewer_throughput(days=7):
+    """
+    Rendimiento por revisor en los últimos 'days' días.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return (
+        ReviewerDailyStats.objects.filter(day__gte=since)
+        .values('user__username')
+        .annotate(
+            total_corrections=Sum('corrections'),
+            total_segments=Sum('segments_reviewed'),
+            total_seconds=Sum('seconds_reviewed'),
+        )
+        .order_by('-total_segments')
+    )
@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from review.models import Segment
+from review.services.metrics import timed
+
+
+def pending_segments():
+    """
+    Segmentos no revisados que tienen al menos una palabra marcada para revisión.
+    """
+    return Segment.objects.filter(
+        revisado=False,
+        words__contains=[{'review': True}]
+    )
+
+
+def lease_cutoff(now=None):
+    """
+    Instante antes del cual un bloqueo (locked_at) se considera vencido.
+    """
+    now = now or timezone.now()
+    return now - timedelta(seconds=settings.REVIEW_LEASE_TTL)
+
+
+def _available(user, cutoff):
+    # Libre, ya arrendado por el mismo usuario, o con arriendo vencido
+    return Q(locked_by__isnull=True) | Q(locked_by=user) | Q(locked_at__lt=cutoff)
+
+
+def _after(pk):
+    """
+    Segmentos estrictamente posteriores a 'pk' en el orden de la cola (título, inicio, id).
+    None si el segmento no existe.
+    """
+    position = Segment.objects.filter(pk=pk).values_list('audio__title', 'start').first()
+    if position is None:
+        return None
+    title, start = position
+    return (Q(audio__title__gt=title)
+            | Q(audio__title=title, start__gt=start)
+            | Q(audio__title=title, start=start, pk__gt=pk))
+
+
+def _select_available(user, now, n, condition=Q()):
+    return list(
+        pending_segments()
+        .filter(_available(user, lease_cutoff(now)))
+        .filter(condition)
+        .order_by('audio__title', 'start', 'pk')
+        .select_for_update(skip_locked=True, of=('self',))
+        .values_list('pk', flat=True)[:n]
+    )
+
+
+@timed('claim_segments')
+def claim_segment_ids(user, n=None, after=None):
+    """
+    Asigna al usuario los siguientes n segmentos disponibles de la cola y devuelve sus ids
+    en orden (tres queries: selección, arriendo y liberación).
+
+    Cada revisor tiene un solo lote a la vez: los arriendos que tenía y que no
+    entran en el nuevo lote se liberan, para que recargar la lista no acapare
+    otros REVIEW_QUEUE_BATCH segmentos cada vez.
+
+    Con 'after' (pk del segmento actual) toma los posteriores a él en la cola y, al
+    llegar al final, vuelve al principio sin repetir el actual: un segmento saltado
+    sin guardar no vuelve a aparecer de inmediato.
+
+    Usa SELECT ... FOR UPDATE SKIP LOCKED: revisores concurrentes nunca
+    esperan ni colisionan por las mismas filas, cada uno recibe otras.
+    """
+    n = n or settings.REVIEW_QUEUE_BATCH
+    now = timezone.now()
+    with transaction.atomic():
+        condition = _after(after) if after is not None else None
+        if condition is None:
+            ids = _select_available(user, now, n)
+        else:
+            ids = _select_available(user, now, n, condition)
+            if len(ids) < n:
+                ids += _select_available(user, now, n - len(ids), ~condition & ~Q(pk=after))
+        if ids:
+            Segment.objects.filter(pk__in=ids).update(locked_by=user, locked_at=now)
+        Segment.objects.filter(locked_by=user).exclude(pk__in=ids).update(locked_by=None, locked_at=None)
+    return ids
+
+
+def claim_segments(user, n=None):
+    """
+    Igual que claim_segment_ids, pero devuelve los segmentos con su audio.
+    """
+    ids = claim_segment_ids(user, n)
+    if not ids:
+        return []
+    return list(
+        Segment.objects.filter(pk__in=ids)
+        .select_related('audio')
+        .defer('search_vector')
+        .order_by('audio__title', 'start')
+    )
+
+
+def acquire(pk, user):
+    """
+    Intenta tomar el arriendo de un segmento concreto. Devuelve True si lo obtuvo.
+    """
+    now = timezone.now()
+    return Segment.objects.filter(pk=pk).filter(
+        _available(user, lease_cutoff(now))
+    ).update(locked_by=user, locked_at=now) == 1
+
+
+def heartbeat(pk, user):
+    """
+    Renueva el arriendo del usuario. Devuelve False si ya no lo tiene.
+    """
+    return Segment.objects.filter(
+        pk=pk, locked_by=user, locked_at__gte=lease_cutoff()
+    ).update(locked_at=timezone.now()) == 1
+
+
+def release(pk, user):
+    """
+    Libera el arriendo del usuario sobre el segmento, si lo tiene.
+    """
+    return Segment.objects.filter(pk=pk, locked_by=user).update(
+        locked_by=None, locked_at=None
+    ) == 1
+
+
+def reclaim_expired(segments=None):
+    """
+    Libera en bloque los arriendos vencidos (de todos los segmentos o sólo
+    de los del queryset 'segments'). Devuelve cuántos liberó.
+    """
+    segments = Segment.objects.all() if segments is None else segments
+    return segments.filter(locked_at__lt=lease_cutoff()).update(
+        locked_by=None, locked_at=None
+    )
@@ -0,0 +1,189 @@
+import os
+import subprocess
+from datetime import timedelta
+
+import imageio_ffmpeg
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from review.models import TranscriptionJob
+from review.services.metrics import timed
+
+# Frecuencia de muestreo que espera Whisper
+SAMPLE_RATE = 16000
+
+
+def window(segment, padding=None):
+    """
+    Ventana (inicio, fin) a recortar: el segmento más el relleno.
+    """
+    pad = settings.REVIEW_RETRANSCRIBE_PADDING if padding is None else padding
+    return max(segment.start - pad, 0.0), segment.end + pad
+
+
+def enqueue(segment, user=None, model_name=None, temperature=0.0):
+    """
+    Encola la re-transcripción del segmento. Reutiliza un trabajo pendiente o en curso
+    con los mismos parámetros y la misma ventana en vez de crear otro. Uno terminado sólo
+    se reutiliza si es determinista (temperatura 0) y posterior a la última actualización
+    del audio (un MP3 reimportado invalida los resultados anteriores).
+    """
+    model_name = model_name or settings.REVIEW_RETRANSCRIBE_MODEL
+    t0, t1 = window(segment)
+    reusable = Q(status__in=[TranscriptionJob.PENDING, TranscriptionJob.RUNNING])
+    if not temperature:
+        reusable |= Q(status=TranscriptionJob.DONE, finished_at__gte=F('segment__audio__updated_at'))
+    existing = (
+        TranscriptionJob.objects.filter(
+            reusable,
+            segment=segment,
+            model_name=model_name,
+            temperature=temperature,
+            start=t0,
+            end=t1,
+        )
+        .order_by('-created_at')
+        .first()
+    )
+    if existing:
+        return existing
+    return TranscriptionJob.objects.create(
+        segment=segment,
+        requested_by=user,
+        model_name=model_name,
+        temperature=temperature,
+        start=t0,
+        end=t1,
+    )
+
+
+def claim(limit=1):
+    """
+    Toma hasta 'limit' trabajos pendientes (más antiguos primero) con SKIP LOCKED.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            TranscriptionJob.objects.filter(status=TranscriptionJob.PENDING)
+            .select_related('segment__audio')
+            .order_by('created_at')
+            .select_for_update(skip_locked=True, of=('self',))[:limit]
+        )
+        for job in jobs:
+            job.status = TranscriptionJob.RUNNING
+            job.started_at = now
+            job.attempts += 1
+        TranscriptionJob.objects.bulk_update(jobs, ['status', 'started_at', 'attempts'])
+    return jobs
+
+
+def cut_window(path, t0, t1):
+    """
+    Decodifica sólo [t0, t1] del archivo a PCM mono de 16 kHz (float32).
+    '-ss' antes de '-i' busca por el contenedor sin decodificar lo anterior.
+    """
+    out = subprocess.run([
+        imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-nostdin',
+        '-ss', f"{t0:.3f}", '-t', f"{t1 - t0:.3f}", '-i', path,
+        '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', '-',
+    ], check=True, capture_output=True).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+class Transcriber:
+    """
+    Modelos Whisper cargados una sola vez por proceso (worker en caliente).
+    """
+
+    def __init__(self):
+        self.models = {}
+
+    def model(self, name):
+        if name not in self.models:
+            # Importación diferida: sólo el worker necesita torch/whisper
+            import torch
+            import whisper
+
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            self.models[name] = whisper.load_model(name, device=device, download_root=settings.WHISPER_PATH)
+        return self.models[name]
+
+    def transcribe(self, audio, model_name, temperature):
+        return self.model(model_name).transcribe(
+            audio,
+            task='transcribe',
+            verbose=False,
+            word_timestamps=True,
+            temperature=temperature,
+            fp16=False,
+        )
+
+
+def suggestion(res, t0, segment):
+    """
+    Palabras de la re-transcripción en tiempos absolutos, recortadas al segmento:
+    se conservan las que tienen su punto medio dentro de [start, end].
+    """
+    words = []
+    for seg in res.get('segments') or []:
+        for w in seg.get('words') or []:
+            start = round(float(w['start']) + t0, 3)
+            end = round(float(w['end']) + t0, 3)
+            if not segment.start <= (start + end) / 2 <= segment.end:
+                continue
+            words.append({
+                'word': (w.get('word') or '').strip(),
+                'start': start,
+                'end': end,
+                'probability': round(float(w.get('probability', 0.0)), 3),
+            })
+    return {
+        'text': ' '.join(w['word'] for w in words if w['word']),
+        'words': words,
+    }
+
+
+@timed('retranscribe')
+def run(job, transcriber):
+    """
+    Recorta la ventana, la transcribe y guarda la sugerencia. Devuelve True si terminó bien.
+    """
+    segment = job.segment
+    try:
+        src = os.path.join(settings.MEDIA_ROOT, segment.audio.file.name)
+        audio = cut_window(src, job.start, job.end)
+        res = transcriber.transcribe(audio, job.model_name, job.temperature)
+        job.result = suggestion(res, job.start, segment)
+        job.status = TranscriptionJob.DONE
+        job.error = ''
+    except Exception as e:
+        job.status = TranscriptionJob.FAILED
+        job.error = f"{type(e).__name__}: {e}"
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job.status == TranscriptionJob.DONE
+
+
+def reclaim_stuck(timeout):
+    """
+    Devuelve a la cola trabajos 'running' cuyo worker murió hace más de 'timeout' segundos;
+    los que ya agotaron sus intentos quedan como fallidos.
+    """
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stuck = TranscriptionJob.objects.filter(status=TranscriptionJob.RUNNING, started_at__lt=cutoff)
+    failed = stuck.filter(attempts__gte=settings.REVIEW_RETRANSCRIBE_MAX_ATTEMPTS).update(
+        status=TranscriptionJob.FAILED, error='Worker sin respuesta', finished_at=timezone.now(),
+    )
+    return stuck.update(status=TranscriptionJob.PENDING) + failed
+
+
+def queue_stats():
+    """
+    Trabajos por estado.
+    """
+    rows = TranscriptionJob.objects.order_by().values('status').annotate(n=Count('pk'))
+    counts = {row['status']: row['n'] for row in rows}
+    return {status: counts.get(status, 0) for status, _ in TranscriptionJob.STATUS_CHOICES}
@@ -0,0 +1,87 @@
+import os
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from review.models import Segment
+from review.services.versioning import final_text
+
+# Marcadores de resaltado internos: el texto se escapa antes de convertirlos en <mark>
+START_SEL, STOP_SEL = '\x02', '\x03'
+
+
+def corrected_text(segment):
+    """
+    Texto con las correcciones del revisor (texto libre o fills), '' si no hay.
+    """
+    if segment.free_text:
+        return segment.free_text.strip()
+    if segment.fills:
+        return final_text({'revisado': True, 'words': segment.word_array, 'fills': segment.fills})
+    return ''
+
+
+def _vector():
+    # Las correcciones pesan más que la transcripción automática
+    config = settings.REVIEW_SEARCH_CONFIG
+    return (
+        SearchVector('corrected_text', weight='A', config=config)
+        + SearchVector('text', weight='B', config=config)
+    )
+
+
+def refresh_vectors(queryset):
+    """
+    Recalcula search_vector de los segmentos del queryset en un único UPDATE.
+    """
+    return queryset.update(search_vector=_vector())
+
+
+def search_segments(q, audio_id=None, limit=50):
+    """
+    Segmentos que coinciden con 'q' (sintaxis web: "frase", -excluir, OR),
+    ordenados por relevancia y con el fragmento resaltado en 'headline'.
+    """
+    config = settings.REVIEW_SEARCH_CONFIG
+    query = SearchQuery(q, config=config, search_type='websearch')
+    qs = Segment.objects.filter(search_vector=query)
+    if audio_id is not None:
+        qs = qs.filter(audio_id=audio_id)
+    # El GIN filtra; rank y headline sólo se calculan sobre las filas devueltas
+    return (
+        qs.select_related('audio')
+        .only('start', 'end', 'revisado', 'audio__title', 'audio__file')
+        .annotate(
+            rank=SearchRank(F('search_vector'), query),
+            headline=SearchHeadline(
+                Coalesce(NullIf('corrected_text', Value('')), 'text'),
+                query,
+                config=config,
+                start_sel=START_SEL,
+                stop_sel=STOP_SEL,
+                max_fragments=2,
+            ),
+        )
+        .order_by('-rank', 'audio_id', 'start')[:limit]
+    )
+
+
+def highlight(headline):
+    """
+    HTML seguro del fragmento: texto escapado con las coincidencias en <mark>.
+    """
+    html = escape(headline or '').replace(START_SEL, '<mark>').replace(STOP_SEL, '</mark>')
+    return mark_safe(html)
+
+
+def jump_url(segment):
+    """
+    URL del MP3 completo con fragmento de medios #t=inicio,fin del segmento.
+    """
+    filename = os.path.basename(segment.audio.file.name)
+    return reverse('review:stream_audio', args=[filename]) + f'#t={segment.start:.2f},{segment.end:.2f}'
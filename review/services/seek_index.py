@@ -0,0 +1,161 @@
+import os
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+from django.conf import settings
+
+from review.models import AudioSeekIndex
+from review.services.metrics import timed
+
+# Cabecera del índice: magia, versión, resolución (s), duración (s), tamaño del archivo
+HEADER = struct.Struct('<4sHffQ')
+MAGIC = b'SKIX'
+VERSION = 1
+
+# Bitrates (kbps) por [versión MPEG1?][capa]
+BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _id3v2_size(buf):
+    """
+    Bytes a saltar por una etiqueta ID3v2 al inicio del archivo.
+    """
+    if len(buf) >= 10 and buf[:3] == b'ID3':
+        size = (buf[6] << 21) | (buf[7] << 14) | (buf[8] << 7) | buf[9]
+        footer = 10 if buf[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def parse_frame_header(buf, pos):
+    """
+    Decodifica la cabecera MPEG audio en 'pos'. Devuelve (largo del frame, muestras, frecuencia)
+    o None si no hay una cabecera válida.
+    """
+    if pos + 4 > len(buf):
+        return None
+    b1, b2 = buf[pos + 1], buf[pos + 2]
+    if buf[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03    # 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+    layer = 4 - ((b1 >> 1) & 0x03)
+    br_idx = (b2 >> 4) & 0x0F
+    sr_idx = (b2 >> 2) & 0x03
+    if version == 1 or layer == 4 or br_idx in (0, 15) or sr_idx == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = BITRATES[(mpeg1, layer)][br_idx] * 1000
+    sample_rate = SAMPLE_RATES[version][sr_idx]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    if layer == 3 and not mpeg1:
+        return 72 * bitrate // sample_rate + padding, 576, sample_rate
+    return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+
+def _is_info_frame(buf, pos, length):
+    # Frame Xing/Info/VBRI: metadatos VBR sin audio
+    head = bytes(buf[pos:pos + min(length, 64)])
+    return b'Xing' in head or b'Info' in head or b'VBRI' in head
+
+
+def build_index(path, resolution=1.0):
+    """
+    Recorre los frames del MP3 y construye un índice compacto tiempo→byte:
+    el offset del frame que contiene cada instante k·resolution (uint32 LE),
+    terminado con el tamaño del archivo.
+    """
+    offsets = array('I')
+    t = 0.0
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            return HEADER.pack(MAGIC, VERSION, resolution, 0.0, 0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            pos = _id3v2_size(buf)
+            first = True
+            while pos < size:
+                frame = parse_frame_header(buf, pos)
+                if frame is None:
+                    # Resincronizar con el siguiente 0xFF
+                    nxt = buf.find(b'\xff', pos + 1)
+                    if nxt < 0:
+                        break
+                    pos = nxt
+                    continue
+                length, samples, sample_rate = frame
+                if first and _is_info_frame(buf, pos, length):
+                    first = False
+                    pos += length
+                    continue
+                first = False
+                t_next = t + samples / sample_rate
+                while len(offsets) * resolution < t_next:
+                    offsets.append(pos)
+                t = t_next
+                pos += length
+    offsets.append(size)
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    return HEADER.pack(MAGIC, VERSION, resolution, t, size) + offsets.tobytes()
+
+
+def read_index(data):
+    """
+    Devuelve (resolución, duración, tamaño del archivo, offsets) de un índice serializado.
+    """
+    magic, version, resolution, duration, size = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Índice de búsqueda inválido")
+    offsets = array('I')
+    offsets.frombytes(bytes(data[HEADER.size:]))
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    return resolution, duration, size, offsets
+
+
+def byte_range(data, start, end):
+    """
+    Rango de bytes (inicio, fin inclusivo) que cubre [start, end] segundos,
+    más el instante aproximado (múltiplo de la resolución) en que comienza el rango.
+    Devuelve None si el índice está vacío.
+    """
+    resolution, duration, size, offsets = read_index(data)
+    if len(offsets) < 2:
+        return None
+    start = min(max(start, 0.0), duration)
+    end = min(max(end, start), duration)
+    # offsets[-1] es el fin del archivo: el último índice de tiempo es len - 2
+    i0 = min(int(start // resolution), len(offsets) - 2)
+    # Un paso extra al final para incluir completo el frame que contiene 'end'
+    i1 = min(math.ceil(end / resolution) + 1, len(offsets) - 1)
+    first = offsets[i0]
+    last = max(offsets[i1] - 1, first)
+    return first, last, i0 * resolution
+
+
+@timed('index_audio')
+def index_audio(audio, resolution=1.0):
+    """
+    Construye (o reconstruye) el índice del MP3 de 'audio' y actualiza su duración.
+    """
+    path = os.path.join(settings.MEDIA_ROOT, audio.file.name)
+    data = build_index(path, resolution)
+    _, duration, size, _ = read_index(data)
+    AudioSeekIndex.objects.update_or_create(audio=audio, defaults={'data': data, 'file_size': size})
+    if audio.duration != duration:
+        audio.duration = duration
+        audio.save(update_fields=['duration'])
+    return data
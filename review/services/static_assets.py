@@ -0,0 +1,231 @@
+"""
+Archivos estáticos con hash en el nombre, precomprimidos (gzip y, si está instalado,
+brotli) y servidos antes de entrar a Django.
+
+    python manage.py collectstatic --noinput   # copia, agrega hash y comprime en STATIC_ROOT
+
+StaticFilesWSGI / StaticFilesASGI envuelven la aplicación (review_project/wsgi.py y asgi.py):
+las rutas bajo STATIC_URL se resuelven contra STATIC_ROOT sin middleware, sesión ni URLconf.
+Detrás de nginx conviene servirlas con gzip_static/brotli_static (ver README).
+"""
+import asyncio
+import gzip
+import mimetypes
+import os
+import re
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+from review.services.media import file_etag
+
+try:
+    import brotli
+except ImportError:  # opcional: pip install ".[static]"
+    brotli = None
+
+# Extensiones que vale la pena comprimir (las imágenes, fuentes woff y audio ya vienen comprimidos)
+COMPRESSIBLE = ('.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico',
+                '.ttf', '.otf', '.eot')
+# Sólo se guarda la variante si ahorra al menos un 5 %
+MIN_RATIO = 0.95
+# Nombres con hash de ManifestStaticFilesStorage: nombre.0123456789ab.ext
+HASHED_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Nombres sin hash (p. ej. referencias que no pasaron por el manifiesto): revalidar pronto
+REVALIDATE = 'public, max-age=300'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+CHUNK = 64 * 1024
+
+
+def compress_file(path):
+    """
+    Escribe path.gz y path.br junto al archivo si reducen su tamaño.
+    Se omite si la variante ya existe y es más nueva que el original.
+    """
+    mtime = os.path.getmtime(path)
+    data = None
+    written = []
+    for suffix, compress in (('.gz', _gzip), ('.br', brotli and _brotli)):
+        target = path + suffix
+        if not compress or (os.path.exists(target) and os.path.getmtime(target) >= mtime):
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        packed = compress(data)
+        if len(packed) < len(data) * MIN_RATIO:
+            with open(target, 'wb') as f:
+                f.write(packed)
+            written.append(target)
+        elif os.path.exists(target):
+            os.remove(target)
+    return written
+
+
+def _gzip(data):
+    # mtime=0: la misma entrada produce el mismo .gz (builds reproducibles)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage que además precomprime cada archivo copiado.
+
+    manifest_strict=False y la vuelta al nombre sin hash permiten que las plantillas
+    referencien archivos ausentes (css/styles.css) sin romper el render.
+    """
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            if name.lower().endswith(COMPRESSIBLE) and self.exists(name):
+                compress_file(self.path(name))
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # El archivo no existe en STATIC_ROOT: se sirve (o falla) sin hash
+            return name
+
+
+def accepts(header, coding):
+    """
+    True si el header Accept-Encoding admite 'coding' (respeta q=0).
+    """
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        if token.strip().lower() != coding:
+            continue
+        q = params.strip()
+        return not (q.startswith('q=') and q[2:].strip() in ('0', '0.0', '0.00', '0.000'))
+    return False
+
+
+class StaticResolver:
+    """
+    Resuelve una ruta bajo STATIC_URL a (status, headers, archivo) o None si no existe.
+    """
+
+    def __init__(self, root=None, url=None):
+        self.root = str(root or settings.STATIC_ROOT)
+        url = url if url is not None else settings.STATIC_URL
+        # STATIC_URL absoluta (CDN) u otro host: nada que servir aquí
+        self.prefix = url if url.startswith('/') else None
+
+    def matches(self, path):
+        return self.prefix is not None and path.startswith(self.prefix)
+
+    def resolve(self, path, accept_encoding='', if_none_match=None):
+        name = path[len(self.prefix):]
+        try:
+            full = safe_join(self.root, name)
+        except (SuspiciousFileOperation, ValueError):
+            return None
+        if not os.path.isfile(full):
+            return None
+
+        content_type, _ = mimetypes.guess_type(full)
+        content_type = content_type or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+        headers = {'Content-Type': content_type}
+
+        chosen = full
+        if name.lower().endswith(COMPRESSIBLE):
+            headers['Vary'] = 'Accept-Encoding'
+            for coding, suffix in ENCODINGS:
+                if accepts(accept_encoding, coding) and os.path.isfile(full + suffix):
+                    chosen = full + suffix
+                    headers['Content-Encoding'] = coding
+                    break
+
+        st = os.stat(chosen)
+        etag = file_etag(st)
+        headers['ETag'] = etag
+        headers['Last-Modified'] = http_date(st.st_mtime)
+        headers['Cache-Control'] = IMMUTABLE if HASHED_RE.search(name) else REVALIDATE
+        if if_none_match and etag in [t.strip() for t in if_none_match.split(',')]:
+            return 304, headers, None
+        headers['Content-Length'] = str(st.st_size)
+        return 200, headers, chosen
+
+
+class StaticFilesWSGI:
+    """
+    Envoltorio WSGI: sirve STATIC_ROOT (GET/HEAD) y pasa el resto a Django.
+    """
+
+    def __init__(self, application, root=None, url=None):
+        self.application = application
+        self.resolver = StaticResolver(root, url)
+
+    def __call__(self, environ, start_response):
+        # PATH_INFO llega como latin-1 (PEP 3333)
+        path = environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', '')
+        path = path.encode('latin-1').decode('utf-8', 'replace')
+        method = environ.get('REQUEST_METHOD')
+        if method in ('GET', 'HEAD') and self.resolver.matches(path):
+            found = self.resolver.resolve(path, environ.get('HTTP_ACCEPT_ENCODING', ''),
+                                          environ.get('HTTP_IF_NONE_MATCH'))
+            if found is not None:
+                status, headers, filename = found
+                start_response('200 OK' if status == 200 else '304 Not Modified', list(headers.items()))
+                if filename is None or method == 'HEAD':
+                    return []
+                wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+                return wrapper(open(filename, 'rb'), CHUNK)
+        return self.application(environ, start_response)
+
+
+class StaticFilesASGI:
+    """
+    Envoltorio ASGI equivalente; las lecturas de disco corren en un hilo.
+    """
+
+    def __init__(self, application, root=None, url=None):
+        self.application = application
+        self.resolver = StaticResolver(root, url)
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD')
+                and self.resolver.matches(scope['path'])):
+            request_headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+            found = await asyncio.to_thread(
+                self.resolver.resolve, scope['path'],
+                request_headers.get('accept-encoding', ''), request_headers.get('if-none-match'),
+            )
+            if found is not None:
+                await self._send(found, scope['method'], send)
+                return
+        await self.application(scope, receive, send)
+
+    async def _send(self, found, method, send):
+        status, headers, filename = found
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()],
+        })
+        if filename is None or method == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        with open(filename, 'rb') as f:
+            while True:
+                data = await asyncio.to_thread(f.read, CHUNK)
+                more = len(data) == CHUNK
+                await send({'type': 'http.response.body', 'body': data, 'more_body': more})
+                if not more:
+                    break
@@ -0,0 +1,196 @@
+import os
+import time
+import gzip
+import json
+import hashlib
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from review.models import AudioVersion
+from review.services.metrics import timed
+
+
+def _objects_dir():
+    return os.path.join(settings.MEDIA_ROOT, 'versiones', 'objects')
+
+
+def _object_path(key):
+    # Subcarpetas por prefijo para que ningún directorio crezca sin límite
+    return os.path.join(_objects_dir(), key[:2], f"{key}.json.gz")
+
+
+def _canonical(obj):
+    """
+    JSON canónico (compacto, claves ordenadas): mismo contenido, mismos bytes.
+    """
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def put_object(data):
+    """
+    Guarda bytes comprimidos bajo su hash. Si ya existen no se reescriben.
+    Devuelve (clave, bytes comprimidos).
+    """
+    key = hashlib.sha256(data).hexdigest()
+    path = _object_path(key)
+    if os.path.exists(path):
+        # Renovar mtime: el recolector respeta los objetos recién (re)usados
+        os.utime(path)
+        return key, os.path.getsize(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    blob = gzip.compress(data, compresslevel=9, mtime=0)
+    # Escritura atómica: otro proceso nunca ve un objeto a medias
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(blob)
+    os.replace(tmp, path)
+    return key, len(blob)
+
+
+def get_object(key):
+    with open(_object_path(key), 'rb') as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+@timed('load_snapshot')
+def load_snapshot(version):
+    """
+    Reconstruye el snapshot completo de una versión aplicando su cadena de deltas.
+    """
+    chain = []
+    while version.base_id is not None:
+        chain.append(version)
+        version = version.base
+    snapshot = get_object(version.object_key)
+    for v in reversed(chain):
+        delta = get_object(v.object_key)
+        segments = snapshot['segments'][:delta['n']]
+        segments += [None] * (delta['n'] - len(segments))
+        for idx, seg in delta['changed'].items():
+            segments[int(idx)] = seg
+        snapshot = {'segments': segments}
+    return snapshot
+
+
+def _delta(prev, curr):
+    """
+    Segmentos que cambiaron respecto del snapshot anterior, por índice.
+    """
+    prev_segs = prev['segments']
+    changed = {
+        str(i): seg for i, seg in enumerate(curr['segments'])
+        if i >= len(prev_segs) or prev_segs[i] != seg
+    }
+    return {'n': len(curr['segments']), 'changed': changed}
+
+
+@timed('save_snapshot')
+def save_snapshot(audio, snapshot):
+    """
+    Registra un snapshot del audio en el almacén.
+
+    - Si es idéntico a la última versión del audio, no crea nada.
+    - Si cabe como delta pequeño sobre la última versión, guarda sólo el delta.
+    - Si no, guarda el snapshot completo (compartido entre audios con igual contenido).
+    Devuelve la AudioVersion vigente.
+    """
+    data = _canonical(snapshot)
+    digest = hashlib.sha256(data).hexdigest()
+
+    last = AudioVersion.objects.filter(audio=audio).select_related('base').order_by('-created_at').first()
+    if last is not None and last.digest == digest:
+        return last
+
+    base, stored = None, data
+    if last is not None and last.chain < settings.REVIEW_VERSION_DELTA_CHAIN:
+        delta = _canonical(_delta(load_snapshot(last), snapshot))
+        # Sólo vale la pena si el delta es claramente menor que el snapshot
+        if len(delta) * 2 < len(data):
+            base, stored = last, delta
+
+    key, size = put_object(stored)
+    return AudioVersion.objects.create(
+        audio=audio,
+        digest=digest,
+        object_key=key,
+        base=base,
+        chain=base.chain + 1 if base else 0,
+        segments=len(snapshot['segments']),
+        size=size,
+    )
+
+
+def retained_versions(versions, now=None):
+    """
+    Aplica la política de retención a las versiones de un audio:
+    todas las de los últimos REVIEW_VERSION_KEEP_ALL_DAYS días y, antes de eso,
+    la última de cada día. La versión más reciente se conserva siempre.
+    """
+    now = now or timezone.now()
+    keep_all_since = now - timedelta(days=settings.REVIEW_VERSION_KEEP_ALL_DAYS)
+    keep, days = set(), set()
+    for i, v in enumerate(sorted(versions, key=lambda v: v.created_at, reverse=True)):
+        day = timezone.localdate(v.created_at)
+        if i == 0 or v.created_at >= keep_all_since or day not in days:
+            keep.add(v.pk)
+        days.add(day)
+    return keep
+
+
+def _rebase_full(version):
+    """
+    Convierte una versión delta en completa (antes de borrar su base).
+    """
+    key, size = put_object(_canonical(load_snapshot(version)))
+    version.object_key, version.size, version.base, version.chain = key, size, None, 0
+    version.save(update_fields=['object_key', 'size', 'base', 'chain'])
+
+
+def prune_audio(audio, dry_run=False):
+    """
+    Elimina las versiones del audio fuera de la política de retención.
+    Devuelve cuántas versiones se eliminaron (o se eliminarían).
+    """
+    versions = list(AudioVersion.objects.filter(audio=audio).order_by('created_at'))
+    keep = retained_versions(versions)
+    drop = [v for v in versions if v.pk not in keep]
+    if dry_run or not drop:
+        return len(drop)
+
+    with transaction.atomic():
+        by_pk = {v.pk: v for v in versions}
+        for v in versions:
+            if v.pk in keep and v.base_id is not None and v.base_id not in keep:
+                # Reconstruir con la cadena aún intacta, luego cortarla
+                v.base = by_pk[v.base_id]
+                _rebase_full(v)
+        # Borrar de la más nueva a la más antigua: ninguna queda referenciada como base
+        for v in reversed(drop):
+            v.delete()
+    return len(drop)
+
+
+def collect_garbage(grace=3600):
+    """
+    Borra del disco los objetos que ya no referencia ninguna versión.
+    Se respetan los tocados en los últimos 'grace' segundos, que pueden
+    pertenecer a una versión que se está creando en este momento.
+    Devuelve cuántos objetos eliminó.
+    """
+    root = _objects_dir()
+    if not os.path.isdir(root):
+        return 0
+    referenced = set(AudioVersion.objects.values_list('object_key', flat=True))
+    limit = time.time() - grace
+    removed = 0
+    for prefix in os.listdir(root):
+        for fname in os.listdir(os.path.join(root, prefix)):
+            path = os.path.join(root, prefix, fname)
+            if fname.split('.', 1)[0] not in referenced and os.path.getmtime(path) < limit:
+                os.remove(path)
+                removed += 1
+    return removed
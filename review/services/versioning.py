@@ -1,62 +1,116 @@
-import os
-import json
-from django.conf import settings
-from django.utils import timezone
-from review.models import Segment
+from itertools import islice
 
-def version_audio(audio):
+from django.db.models import Max
+from review.models import Audio, Segment, SegmentRevision
+from review.services.metrics import timed
+from review.services.version_store import save_snapshot
+from review.services.wordpack import WordArray
+
+def final_text(seg):
+    """
+    Texto final de un segmento serializado (dict con text, words, fills, free_text, revisado).
+    """
+    if seg.get('revisado'):
+        if seg.get('free_text'):
+            # Si hay texto libre, lo usamos directamente
+            return seg['free_text'].strip()
+        if seg.get('fills'):
+            # Normalizar claves de fills (strings) a enteros
+            fills_norm = {int(k): v for k, v in seg['fills'].items()}
+            words = []
+            for idx_w, w in enumerate(seg.get('words') or []):
+                if w.get('review'):
+                    # Usar la corrección correspondiente
+                    words.append(fills_norm.get(idx_w, "").strip())
+                else:
+                    words.append(w.get('word', "").strip())
+            return " ".join(words)
+    # No revisado o sin correcciones: usar el texto original
+    return (seg.get('text') or '').strip()
+
+
+def render_txt(snapshot):
+    """
+    TXT final (una línea por segmento) a partir de un snapshot.
+    """
+    return "".join(final_text(seg) + "\n" for seg in snapshot['segments'])
+
+
+def with_words(rows, chunk_size=2000):
+    """
+    Recorre filas de .values() con 'id' y 'words_packed', reemplazando 'words_packed'
+    por 'words' (WordArray). Los segmentos aún sin empaquetar leen su JSON con una
+    query por bloque de 'chunk_size' filas, no una por fila.
+    """
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        missing = [row['id'] for row in chunk if row['words_packed'] is None]
+        legacy = dict(Segment.objects.filter(pk__in=missing).values_list('pk', 'words')) if missing else {}
+        for row in chunk:
+            packed = row.pop('words_packed')
+            row['words'] = WordArray(packed) if packed is not None else WordArray.from_list(legacy[row['id']])
+            yield row
+
+
+def serialize_audio(audio):
     """
-    Genera un JSON y un TXT versionado para todos los segmentos de 'audio'.
-    """
-    # Directorio para guardar versiones
-    version_dir = os.path.join(settings.MEDIA_ROOT, 'versiones')
-    os.makedirs(version_dir, exist_ok=True)
-
-    # Recuperar y serializar segmentos
-    segs = Segment.objects.filter(audio=audio).order_by('start')
-    serial = []
-    for seg in segs:
-        serial.append({
-            'start': seg.start,
-            'end': seg.end,
-            'text': seg.text,
-            'words': seg.words,
-            'fills': seg.fills,
-            'free_text': seg.free_text,
-            'revisado': seg.revisado,
+    Snapshot completo {'segments': [...]} con el estado actual de 'audio'.
+    Lee las palabras empaquetadas, sin instanciar modelos ni decodificar el JSON.
+    """
+    rows = (
+        Segment.objects.filter(audio=audio)
+        .order_by('start')
+        .values('id', 'start', 'end', 'text', 'words_packed', 'fills', 'free_text', 'revisado')
+    )
+    segments = []
+    for row in with_words(rows):
+        segments.append({
+            'id': row['id'],
+            'start': row['start'],
+            'end': row['end'],
+            'text': row['text'],
+            'words': row['words'].to_list(),
+            'fills': row['fills'],
+            'free_text': row['free_text'],
+            'revisado': row['revisado'],
         })
+    return {'segments': segments}
 
-    # Timestamp para versiones
-    ts = timezone.now().strftime('%Y%m%d_%H%M%S')
-    base = audio.title.replace(' ', '_')
-
-    # Guardar JSON
-    json_path = os.path.join(version_dir, f"{base}_modificado_{ts}.json")
-    with open(json_path, 'w', encoding='utf-8') as jf:
-        json.dump({'segments': serial}, jf, ensure_ascii=False, indent=2)
-
-    # Guardar TXT
-    txt_path = os.path.join(version_dir, f"{base}_final_{ts}.txt")
-    with open(txt_path, 'w', encoding='utf-8') as tf:
-        for seg in segs:
-            if seg.revisado:
-                if seg.free_text:
-                    # Si hay texto libre, lo usamos directamente
-                    tf.write(seg.free_text.strip() + "\n")
-                elif seg.fills:
-                    # Normalizar claves de fills (strings) a enteros
-                    fills_norm = {int(k): v for k, v in seg.fills.items()}
-                    words = []
-                    for idx_w, w in enumerate(seg.words):
-                        if w.get('review'):
-                            # Usar la corrección correspondiente
-                            words.append(fills_norm.get(idx_w, "").strip())
-                        else:
-                            words.append(w.get('word', "").strip())
-                    tf.write(" ".join(words) + "\n")
-                else:
-                    # Sin correcciones, usar el texto original
-                    tf.write(seg.text.strip() + "\n")
-            else:
-                # No revisado, usar el texto original
-                tf.write(seg.text.strip() + "\n")
\ No newline at end of file
+
+@timed('version_audio')
+def version_audio(audio):
+    """
+    Registra una versión de todos los segmentos de 'audio' en el almacén de versiones
+    (comprimida, deduplicada y, si conviene, como delta de la anterior).
+    """
+    return save_snapshot(audio, serialize_audio(audio))
+
+
+@timed('materialize_audio')
+def materialize_audio(audio):
+    """
+    Genera la versión completa de 'audio' y marca como materializadas
+    las revisiones incluidas en ella.
+    """
+    pending = SegmentRevision.objects.filter(segment__audio=audio, materialized=False)
+    # Tope fijado antes de serializar: ediciones posteriores quedan para la próxima versión
+    last_id = pending.aggregate(last=Max('pk'))['last']
+    version_audio(audio)
+    if last_id is not None:
+        pending.filter(pk__lte=last_id).update(materialized=True)
+
+
+def materialize_pending():
+    """
+    Materializa todos los audios con revisiones pendientes. Devuelve cuántos procesó.
+    """
+    audio_ids = (
+        SegmentRevision.objects.filter(materialized=False)
+        .values_list('segment__audio', flat=True)
+        .distinct()
+    )
+    count = 0
+    for audio in Audio.objects.filter(pk__in=list(audio_ids)):
+        materialize_audio(audio)
+        count += 1
+    return count
@@ -0,0 +1,105 @@
+import os
+import ctypes
+import ctypes.util
+import select
+import struct
+import time
+
+# Eventos de inotify: archivo cerrado tras escribirse o movido a la carpeta
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+_EVENT = struct.Struct('iIII')
+
+
+class Inotify:
+    """
+    Vigilancia de una carpeta con inotify (Linux) vía ctypes, sin dependencias.
+    """
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 falló')
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f'inotify_add_watch falló para {path}')
+        self.overflow = False
+
+    def read(self, timeout):
+        """
+        Nombres de archivo con eventos en los próximos 'timeout' segundos (puede ser vacío).
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            if mask & IN_Q_OVERFLOW:
+                # Se perdieron eventos: el llamador debe reescanear la carpeta
+                self.overflow = True
+            if length:
+                names.append(os.fsdecode(data[offset:offset + length].rstrip(b'\0')))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+def scan(path):
+    """
+    {nombre: (tamaño, mtime)} de los archivos de la carpeta.
+    """
+    entries = {}
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_file():
+                st = entry.stat()
+                entries[entry.name] = (st.st_size, st.st_mtime)
+    return entries
+
+
+def watch(path, poll=False, interval=5.0):
+    """
+    Genera lotes de nombres de archivos nuevos o modificados en 'path': primero todo
+    lo existente y luego los cambios. Usa inotify si está disponible (no ve escrituras
+    hechas desde otros hosts en NFS: usar poll=True); si no, compara escaneos cada
+    'interval' segundos. Entrega lotes vacíos cuando no hay cambios.
+    """
+    notifier = None
+    if not poll:
+        try:
+            notifier = Inotify(path)
+        except (OSError, AttributeError):
+            # Sin Linux/inotify (o límite de watches agotado): sondeo
+            notifier = None
+
+    known = scan(path)
+    yield sorted(known)
+
+    if notifier is None:
+        while True:
+            time.sleep(interval)
+            current = scan(path)
+            yield sorted(name for name, stat in current.items() if known.get(name) != stat)
+            known = current
+
+    try:
+        while True:
+            names = notifier.read(interval)
+            if notifier.overflow:
+                notifier.overflow = False
+                names = sorted(scan(path))
+            yield names
+    finally:
+        notifier.close()
@@ -0,0 +1,154 @@
+"""
+Representación compacta de Segment.words: arreglos paralelos en un solo blob binario.
+
+Formato (little-endian):
+  cabecera  b'WPK1' + uint32 n
+  float64[n] start, float64[n] end, float64[n] probability (NaN = ausente)
+  uint8[n]   flags: bit 0 = review, bit 1 = 'probability' presente pero None
+  uint32[n]  largo en bytes de cada palabra
+  utf-8      palabras concatenadas
+
+Los tiempos y probabilidades se guardan en float64, así que la conversión
+desde y hacia la lista de dicts de Whisper es exacta (incluido 'probability': None,
+que se distingue de la clave ausente).
+"""
+import struct
+from typing import NamedTuple
+
+import numpy as np
+
+MAGIC = b'WPK1'
+_HEADER = struct.Struct('<4sI')
+
+
+class Word(NamedTuple):
+    """
+    Palabra de sólo lectura; admite w.word en plantillas y w.get('word') como un dict.
+    """
+    word: str
+    start: float
+    end: float
+    probability: float
+    review: bool
+
+    def get(self, key, default=None):
+        value = getattr(self, key, default)
+        if key == 'probability' and value != value:
+            return default
+        return value
+
+
+def pack(words):
+    """
+    Lista de dicts {'word', 'start', 'end', 'probability', 'review'} → bytes.
+    """
+    words = words or []
+    n = len(words)
+    starts = np.fromiter((float(w.get('start') or 0.0) for w in words), np.float64, n)
+    ends = np.fromiter((float(w.get('end') or 0.0) for w in words), np.float64, n)
+    probs = np.fromiter(
+        (np.nan if w.get('probability') is None else float(w['probability']) for w in words), np.float64, n,
+    )
+    flags = np.fromiter(
+        (bool(w.get('review')) | (2 if 'probability' in w and w['probability'] is None else 0) for w in words),
+        np.uint8, n,
+    )
+    encoded = [(w.get('word') or '').encode('utf-8') for w in words]
+    lengths = np.fromiter((len(b) for b in encoded), np.uint32, n)
+    return b''.join([
+        _HEADER.pack(MAGIC, n),
+        starts.astype('<f8').tobytes(),
+        ends.astype('<f8').tobytes(),
+        probs.astype('<f8').tobytes(),
+        flags.tobytes(),
+        lengths.astype('<u4').tobytes(),
+        *encoded,
+    ])
+
+
+class WordArray:
+    """
+    Acceso a las palabras empaquetadas sin construir un dict por palabra.
+    Los arreglos numéricos son vistas sobre el blob; los textos se decodifican al pedirlos.
+    """
+
+    def __init__(self, data=None):
+        data = bytes(data or b'')
+        if not data:
+            self.n = 0
+            self.starts = self.ends = self.probabilities = np.empty(0, np.float64)
+            self.review = self._null_probability = np.empty(0, np.bool_)
+            self._lengths = np.empty(0, np.uint32)
+            self._text = b''
+            self._words = []
+            return
+        magic, n = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('Formato de palabras empaquetadas desconocido')
+        offset = _HEADER.size
+        self.n = n
+        self.starts = np.frombuffer(data, '<f8', n, offset)
+        self.ends = np.frombuffer(data, '<f8', n, offset + 8 * n)
+        self.probabilities = np.frombuffer(data, '<f8', n, offset + 16 * n)
+        flags = np.frombuffer(data, np.uint8, n, offset + 24 * n)
+        self.review = (flags & 1).astype(bool)
+        self._null_probability = (flags & 2).astype(bool)
+        self._lengths = np.frombuffer(data, '<u4', n, offset + 25 * n)
+        self._text = memoryview(data)[offset + 29 * n:]
+        self._words = None
+
+    @classmethod
+    def from_list(cls, words):
+        return cls(pack(words))
+
+    @property
+    def words(self):
+        """
+        Textos de las palabras (decodificados una sola vez).
+        """
+        if self._words is None:
+            bounds = np.concatenate(([0], np.cumsum(self._lengths, dtype=np.int64)))
+            text = self._text
+            self._words = [str(text[a:b], 'utf-8') for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+        return self._words
+
+    @property
+    def flagged(self):
+        """
+        Número de palabras marcadas para revisión.
+        """
+        return int(np.count_nonzero(self.review))
+
+    def flagged_indices(self):
+        """
+        Índices de las palabras marcadas para revisión.
+        """
+        return set(np.flatnonzero(self.review).tolist())
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if not -self.n <= i < self.n:
+            raise IndexError(i)
+        return Word(self.words[i], float(self.starts[i]), float(self.ends[i]),
+                    float(self.probabilities[i]), bool(self.review[i]))
+
+    def __iter__(self):
+        return map(Word, self.words, self.starts.tolist(), self.ends.tolist(),
+                   self.probabilities.tolist(), self.review.tolist())
+
+    def to_list(self):
+        """
+        Forma JSON original (lista de dicts), para exportar o para la API.
+        """
+        out = []
+        for w, null_probability in zip(self, self._null_probability.tolist()):
+            item = {'word': w.word, 'start': w.start, 'end': w.end}
+            if w.probability == w.probability:
+                item['probability'] = w.probability
+            elif null_probability:
+                item['probability'] = None
+            item['review'] = w.review
+            out.append(item)
+        return out
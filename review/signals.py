@@ -0,0 +1,59 @@
+"""
+Invalidación de la caché de revisión cuando cambian segmentos o audios,
+resumen de avance ante escrituras que no pasan por las correcciones,
+y conteo de conexiones a la base de datos.
+"""
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from review.models import Audio, Segment
+from review.services import caching, progress
+from review.services.metrics import DB_CONNECTIONS
+
+# Campos de Segment que alteran la lista de pendientes o su orden
+PENDING_FIELDS = {'revisado', 'words', 'start', 'audio'}
+
+
+@receiver(post_save, sender=Segment)
+def segment_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Los cambios de arriendo (locked_by/locked_at) no afectan lo cacheado
+    if update_fields is not None and not set(update_fields) - {'locked_by', 'locked_at'}:
+        return
+    caching.invalidate_segments([(instance.pk, instance.version)])
+    if created or update_fields is None or PENDING_FIELDS & set(update_fields):
+        caching.bump_pending()
+    # apply_correction guarda con update_fields y actualiza el resumen él mismo, y la
+    # importación usa bulk_create (sin señales) y lo recalcula una vez al final; sólo
+    # llegan aquí los guardados fila a fila del admin o el shell
+    if kwargs.get('raw'):
+        return
+    if created:
+        progress.segment_added(instance)
+    elif update_fields is None:
+        progress.schedule_recompute(instance.audio_id)
+
+
+@receiver(post_delete, sender=Segment)
+def segment_deleted(sender, instance, origin=None, **kwargs):
+    caching.invalidate_segments([(instance.pk, instance.version)])
+    caching.bump_pending()
+    # Al borrar audios completos (instancia o queryset) su resumen se borra en cascada
+    if getattr(origin, 'model', type(origin)) is not Audio:
+        progress.segment_removed(instance)
+
+
+@receiver(post_save, sender=Audio)
+@receiver(post_delete, sender=Audio)
+def audio_changed(sender, instance, **kwargs):
+    # Los segmentos cacheados llevan su audio (select_related); el título define el orden
+    if kwargs.get('update_fields') == frozenset({'duration'}):
+        return
+    caching.invalidate_segments(instance.segments.values_list('pk', 'version'))
+    caching.bump_pending()
+
+
+@receiver(connection_created)
+def db_connection_created(sender, connection, **kwargs):
+    # Con conexiones persistentes o pool, este contador casi no debe crecer con las peticiones
+    DB_CONNECTIONS.inc(alias=connection.alias)
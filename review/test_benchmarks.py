@@ -0,0 +1,202 @@
+"""
+Suite de rendimiento y regresión (etiqueta 'benchmark').
+
+    python manage.py test review --tag benchmark
+    BENCH_AUDIOS=200 BENCH_SEGMENTS=500 python manage.py test review --tag benchmark
+
+Falla si el p95 supera su presupuesto, si una vista excede su límite de queries
+o si el número de queries crece al duplicar el corpus.
+"""
+import os
+import random
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase, override_settings, tag
+from django.urls import reverse
+from unittest import skipUnless
+
+from review import benchmarks as bench
+from review.models import Audio, Segment
+from review.services.metrics import DB_CONNECTIONS
+from review.services.versioning import version_audio
+from review.services.wordpack import pack
+
+MEDIA_DIR = tempfile.mkdtemp(prefix='bench-media-')
+requires_postgres = skipUnless(connection.vendor == 'postgresql', 'Requiere PostgreSQL (JSON contains y tsvector)')
+
+
+@tag('benchmark')
+@override_settings(MEDIA_ROOT=MEDIA_DIR, REVIEW_SLOW_REQUEST_MS=0)
+class ReviewBenchmarks(TestCase):
+    results = []
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.mp3 = bench.make_mp3(os.path.join(MEDIA_DIR, 'audios', 'bench.mp3'))
+        cls.audios = bench.build_corpus()
+        cls.user = User.objects.create_user('bench', password='bench', is_staff=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_DIR, ignore_errors=True)
+        print(f"\nCorpus: {bench.AUDIOS} audios × {bench.SEGMENTS} segmentos × {bench.WORDS} palabras")
+        for result in cls.results:
+            print('  ' + result.row())
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def check(self, result, budget=None):
+        """
+        Registra el resultado y verifica presupuesto de latencia (p95) y de queries.
+        """
+        self.results.append(result)
+        name = budget or result.name
+        self.assertLessEqual(result.p95, bench.budget_ms(name), f'{name}: p95 fuera de presupuesto')
+        if name in bench.QUERY_BUDGETS:
+            self.assertLessEqual(result.max_queries, bench.QUERY_BUDGETS[name], f'{name}: demasiadas queries')
+
+    def assertScales(self, name, func):
+        """
+        Las queries por llamada no deben crecer al duplicar el corpus.
+        Ambas pasadas parten de la caché vacía para comparar lo mismo.
+        """
+        cache.clear()
+        before = bench.measure(name, func, iterations=3).max_queries
+        bench.build_corpus(offset=bench.AUDIOS, seed=1)
+        cache.clear()
+        after = bench.measure(name, func, iterations=3).max_queries
+        self.assertLessEqual(after, before, f'{name}: queries {before} → {after} al duplicar el corpus')
+
+    def _pending_pks(self, n):
+        return list(Segment.objects.filter(revisado=False).order_by('pk').values_list('pk', flat=True)[:n])
+
+    @requires_postgres
+    def test_pending_list(self):
+        url = reverse('review:pending_list')
+
+        def call(i):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.check(bench.measure('pending_list', call))
+        self.assertScales('pending_list', call)
+
+    @requires_postgres
+    def test_segment_edit_get(self):
+        pks = self._pending_pks(bench.ITERATIONS)
+
+        def call(i):
+            self.assertEqual(self.client.get(reverse('review:segment_edit', args=[pks[i % len(pks)]])).status_code, 200)
+
+        self.check(bench.measure('segment_edit_get', call))
+        self.assertScales('segment_edit_get', call)
+
+    @requires_postgres
+    def test_segment_edit_post(self):
+        # Un segmento distinto por llamada (medición + dos rondas de escalado)
+        segments = iter(Segment.objects.filter(pk__in=self._pending_pks(bench.ITERATIONS + 6)).order_by('pk'))
+
+        def call(i):
+            s = next(segments)
+            data = {'start': s.start, 'end': s.end, 'revisado': '1'}
+            data.update({f'fill_{j}': 'corregido' for j, w in enumerate(s.words) if w.get('review')})
+            response = self.client.post(reverse('review:segment_edit', args=[s.pk]), data)
+            self.assertEqual(response.status_code, 302)
+
+        self.check(bench.measure('segment_edit_post', call))
+        self.assertScales('segment_edit_post', call)
+
+    def test_stream_audio_range(self):
+        url = reverse('review:stream_audio', args=['bench.mp3'])
+        size = os.path.getsize(self.mp3)
+        rng = random.Random(0)
+
+        def call(i):
+            start = rng.randrange(size - 65536)
+            response = self.client.get(url, HTTP_RANGE=f'bytes={start}-{start + 65535}')
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(len(b''.join(response.streaming_content)), 65536)
+
+        self.check(bench.measure('stream_audio_range', call))
+
+    @requires_postgres
+    def test_import_media(self):
+        folder = tempfile.mkdtemp(prefix='bench-import-')
+        self.addCleanup(shutil.rmtree, folder, ignore_errors=True)
+
+        def call(i):
+            bench.write_import_folder(folder, f'import_{i}', self.mp3, seed=i)
+            call_command('import_media', folder, stdout=StringIO())
+
+        result = bench.measure('import_media', call, iterations=3)
+        self.check(result)
+        # Cada ejecución reimporta las carpetas previas (hasta 3 audios); la cota es por
+        # audio, no por segmento
+        self.assertLessEqual(result.max_queries, 3 * bench.IMPORT_QUERIES_PER_AUDIO)
+
+    def test_version_audio(self):
+        audio = self.audios[0]
+
+        def call(i):
+            # Un cambio por iteración para que no se deduplique la versión
+            Segment.objects.filter(pk=audio.segments.values('pk')[:1]).update(free_text=f'v{i}')
+            version_audio(audio)
+
+        self.check(bench.measure('version_audio', call, iterations=10))
+
+        # Duplicar los segmentos del audio no debe aumentar las queries
+        before = bench.measure('version_audio', call, iterations=2).max_queries
+        big = Audio.objects.create(title='bench_big', file='audios/bench.mp3')
+        rows = bench.segment_rows(random.Random(2), bench.SEGMENTS * 2, bench.WORDS)
+        Segment.objects.bulk_create([Segment(audio=big, words_packed=pack(row['words']), **row) for row in rows])
+        audio = big
+        after = bench.measure('version_audio', call, iterations=2).max_queries
+        self.assertLessEqual(after, before)
+
+
+@tag('benchmark')
+@requires_postgres
+class ConnectionBenchmarks(TransactionTestCase):
+    """
+    Costo de abrir una conexión por petición frente a conexiones persistentes.
+    El cliente de pruebas desactiva close_old_connections durante cada petición;
+    aquí se llama antes y después, como hacen request_started/request_finished.
+    """
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('bench-conn', password='bench'))
+        max_age = connection.settings_dict['CONN_MAX_AGE']
+        self.addCleanup(connection.settings_dict.__setitem__, 'CONN_MAX_AGE', max_age)
+
+    def measure(self, name, max_age):
+        """
+        Resultado y conexiones abiertas para 'iterations' peticiones con CONN_MAX_AGE=max_age.
+        """
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        connection.close()
+        url = reverse('review:search')
+
+        def call(i):
+            close_old_connections()
+            self.assertEqual(self.client.get(url).status_code, 200)
+            close_old_connections()
+
+        before = sum(DB_CONNECTIONS.values.values())
+        result = bench.measure(name, call)
+        print('\n  ' + result.row())
+        return result, sum(DB_CONNECTIONS.values.values()) - before
+
+    def test_persistent_connections(self):
+        _, per_request = self.measure('conn_per_request', 0)
+        _, persistent = self.measure('conn_persistent', 60)
+        self.assertGreaterEqual(per_request, bench.ITERATIONS)
+        # Sólo la primera petición abre conexión
+        self.assertLessEqual(persistent, 1)
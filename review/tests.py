@@ -1,3 +1,613 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import zipfile
+from datetime import timedelta
+from unittest import skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from review.models import Audio, AudioVersion, ExportRun, IngestJob, Segment
+from review.services import ingest, peaks, queue, seek_index, version_store
+from review.services.corrections import mark_reviewed
+from review.services.export import FORMATS, iter_export, parse_formats, start_run
+from review.services.media import parse_range
+from review.services.wordpack import WordArray, pack
+
+requires_postgres = skipUnless(connection.vendor == 'postgresql', 'Requiere PostgreSQL (JSON contains y tsvector)')
+
+
+def word(text, start, end, probability=0.9, review=False):
+    return {'word': text, 'start': start, 'end': end, 'probability': probability, 'review': review}
+
+
+class WordPackTests(SimpleTestCase):
+    """
+    words_packed debe reproducir exactamente la lista de palabras de Whisper.
+    """
+
+    def test_round_trip(self):
+        words = [
+            {'word': ' hola', 'start': 0.0, 'end': 0.42, 'probability': 0.913, 'review': False},
+            {'word': ' señor', 'start': 0.42, 'end': 1.0000000001, 'probability': 0.1, 'review': True},
+            {'word': '', 'start': 1.0, 'end': 1.0, 'probability': None, 'review': True},
+            {'word': ' ¿qué?', 'start': 1.5, 'end': 2.25, 'review': False},
+        ]
+        self.assertEqual(WordArray(pack(words)).to_list(), words)
+
+    def test_flags(self):
+        words = [
+            {'word': 'a', 'start': 0.0, 'end': 1.0, 'probability': None, 'review': False},
+            {'word': 'b', 'start': 1.0, 'end': 2.0, 'probability': None, 'review': True},
+        ]
+        array = WordArray(pack(words))
+        self.assertEqual(array.review.tolist(), [False, True])
+        self.assertEqual(array.flagged, 1)
+        self.assertIsNone(array[0].get('probability'))
+
+    def test_empty(self):
+        self.assertEqual(WordArray(pack([])).to_list(), [])
+        self.assertEqual(WordArray(None).to_list(), [])
+
+
+class ExportTests(TransactionTestCase):
+    """
+    Zip de la exportación. TransactionTestCase: cada audio se renderiza en otro hilo
+    (con su propia conexión), que no vería los datos de una transacción sin confirmar.
+    """
+
+    def setUp(self):
+        self.audio = Audio.objects.create(title='Entrevista 1', file='audios/e1.mp3')
+        Segment.objects.create(
+            audio=self.audio, start=0.0, end=1.0, text=' hola mundo',
+            words=[word(' hola', 0.0, 0.5), word(' mundo', 0.5, 1.0, 0.2, review=True)],
+            fills={'1': 'mundial'}, revisado=True,
+        )
+        Segment.objects.create(audio=self.audio, start=1.0, end=2.0, text=' chau ', words=[word(' chau', 1.0, 2.0)])
+
+    def export(self, formats=FORMATS):
+        run, audios = start_run(formats=formats)
+        data = b''.join(iter_export(run, audios, workers=2))
+        run.refresh_from_db()
+        return run, zipfile.ZipFile(io.BytesIO(data))
+
+    def test_all_formats(self):
+        run, zf = self.export()
+        self.assertEqual(run.status, ExportRun.DONE, run.error)
+        self.assertEqual((run.audios, run.segments), (1, 2))
+        self.assertEqual(sorted(zf.namelist()), [
+            'csv/Entrevista_1.csv', 'json/Entrevista_1.json', 'manifest.json', 'txt/Entrevista_1.txt',
+        ])
+        self.assertEqual(zf.read('txt/Entrevista_1.txt').decode('utf-8'), 'hola mundial\nchau\n')
+
+        rows = list(csv.reader(io.StringIO(zf.read('csv/Entrevista_1.csv').decode('utf-8'))))
+        self.assertEqual(rows[0], ['id', 'start', 'end', 'revisado', 'text'])
+        self.assertEqual([r[3:] for r in rows[1:]], [['1', 'hola mundial'], ['0', 'chau']])
+
+        exported = json.loads(zf.read('json/Entrevista_1.json'))
+        self.assertEqual(exported['audio'], 'Entrevista 1')
+        self.assertEqual([s['text'] for s in exported['segments']], ['hola mundial', 'chau'])
+
+        manifest = json.loads(zf.read('manifest.json'))
+        self.assertEqual(manifest['audios'], [
+            {'id': self.audio.pk, 'title': 'Entrevista 1', 'file': 'Entrevista_1', 'segments': 2},
+        ])
+
+    def test_selected_formats(self):
+        run, zf = self.export(parse_formats('csv'))
+        self.assertEqual(run.status, ExportRun.DONE, run.error)
+        self.assertEqual(sorted(zf.namelist()), ['csv/Entrevista_1.csv', 'manifest.json'])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            parse_formats('txt,docx')
+
+
+@requires_postgres
+class SegmentsBatchTests(TestCase):
+    """
+    Validación por ítem de POST /api/segments/batch/: un ítem malo no tumba el lote.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('revisor', password='x')
+        self.client.force_login(self.user)
+        audio = Audio.objects.create(title='Entrevista 1', file='audios/e1.mp3')
+        self.seg = Segment.objects.create(
+            audio=audio, start=0.0, end=1.0, text=' hola mundo',
+            words=[word(' hola', 0.0, 0.5), word(' mundo', 0.5, 1.0, 0.2, review=True)],
+        )
+        self.other = Segment.objects.create(audio=audio, start=1.0, end=2.0, text=' chau',
+                                            words=[word(' chau', 1.0, 2.0)])
+
+    def batch(self, items):
+        response = self.client.post(reverse('review:api_segments_batch'), json.dumps(items),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return {r['id']: r for r in response.json()['results']}
+
+    def test_non_finite_times(self):
+        results = self.batch([{'id': self.seg.pk, 'start': 'NaN'}, {'id': self.other.pk, 'end': 'inf'}])
+        self.assertEqual(results[self.seg.pk]['status'], 'invalid')
+        self.assertIn('start', results[self.seg.pk]['errors'])
+        self.assertEqual(results[self.other.pk]['status'], 'invalid')
+        self.assertIn('end', results[self.other.pk]['errors'])
+
+    def test_fills(self):
+        results = self.batch([{'id': self.seg.pk, 'fills': {'x': 'a'}}])
+        self.assertEqual(results[self.seg.pk]['status'], 'invalid')
+        # 0 no es una palabra marcada; 1 sí
+        results = self.batch([{'id': self.seg.pk, 'fills': {'0': 'a'}}])
+        self.assertEqual(results[self.seg.pk]['status'], 'invalid')
+        results = self.batch([{'id': self.seg.pk, 'fills': {'1': 'mundial'}, 'revisado': True}])
+        self.assertEqual(results[self.seg.pk]['status'], 'ok')
+        self.seg.refresh_from_db()
+        self.assertEqual((self.seg.fills, self.seg.revisado), ({'1': 'mundial'}, True))
+
+    def test_version_conflict(self):
+        results = self.batch([{'id': self.seg.pk, 'version': self.seg.version + 1, 'revisado': True}])
+        self.assertEqual(results[self.seg.pk], {'id': self.seg.pk, 'status': 'conflict', 'version': self.seg.version})
+
+    def test_integrity_error_keeps_batch(self):
+        results = self.batch([
+            # Mismo (audio, start, end) que self.other: choca con unique_together
+            {'id': self.seg.pk, 'start': 1.0, 'end': 2.0},
+            {'id': self.other.pk, 'revisado': True},
+            {'id': 0, 'revisado': True},
+        ])
+        self.assertEqual(results[self.seg.pk]['status'], 'error')
+        self.assertEqual(results[self.other.pk]['status'], 'ok')
+        self.assertEqual(results[0]['status'], 'not_found')
+        self.seg.refresh_from_db()
+        self.assertEqual((self.seg.start, self.seg.end), (0.0, 1.0))
+
+
+@requires_postgres
+@override_settings(REVIEW_QUEUE_BATCH=2, REVIEW_LEASE_TTL=300)
+class QueueTests(TestCase):
+    """
+    Arriendos de la cola de revisión: asignación, vencimiento y salto con 'after'.
+    """
+
+    def setUp(self):
+        self.ana = User.objects.create_user('ana')
+        self.beto = User.objects.create_user('beto')
+        audio = Audio.objects.create(title='Entrevista 1', file='audios/e1.mp3')
+        self.segs = [
+            Segment.objects.create(audio=audio, start=float(i), end=i + 1.0, text=' a',
+                                   words=[word(' a', float(i), i + 1.0, 0.2, review=True)])
+            for i in range(5)
+        ]
+        # Revisado o sin palabras marcadas: nunca entra en la cola
+        Segment.objects.create(audio=audio, start=10.0, end=11.0, text=' b',
+                               words=[word(' b', 10.0, 11.0, 0.2, review=True)], revisado=True)
+        Segment.objects.create(audio=audio, start=11.0, end=12.0, text=' c', words=[word(' c', 11.0, 12.0)])
+
+    def ids(self, *indexes):
+        return [self.segs[i].pk for i in indexes]
+
+    def leased_by(self, user):
+        return sorted(Segment.objects.filter(locked_by=user).values_list('pk', flat=True))
+
+    def test_claim_in_order(self):
+        self.assertEqual(queue.claim_segment_ids(self.ana), self.ids(0, 1))
+        self.assertEqual(self.leased_by(self.ana), self.ids(0, 1))
+        # Otro revisor recibe los siguientes, no los arrendados
+        self.assertEqual(queue.claim_segment_ids(self.beto), self.ids(2, 3))
+
+    def test_reload_keeps_one_batch(self):
+        queue.claim_segment_ids(self.ana)
+        self.assertEqual(queue.claim_segment_ids(self.ana), self.ids(0, 1))
+        self.assertEqual(self.leased_by(self.ana), self.ids(0, 1))
+        # Un lote nuevo libera los arriendos que no entran en él
+        self.assertEqual(queue.claim_segment_ids(self.ana, 1, after=self.segs[1].pk), self.ids(2))
+        self.assertEqual(self.leased_by(self.ana), self.ids(2))
+
+    def test_expired_lease(self):
+        queue.claim_segment_ids(self.ana)
+        Segment.objects.filter(pk=self.segs[0].pk).update(locked_at=timezone.now() - timedelta(seconds=301))
+        self.assertEqual(queue.claim_segment_ids(self.beto), self.ids(0, 2))
+        self.assertFalse(queue.heartbeat(self.segs[0].pk, self.ana))
+        self.assertTrue(queue.heartbeat(self.segs[1].pk, self.ana))
+
+    def test_after_wraps_around(self):
+        self.assertEqual(queue.claim_segment_ids(self.ana, 3, after=self.segs[3].pk), self.ids(4, 0, 1))
+
+    def test_acquire_and_release(self):
+        queue.claim_segment_ids(self.ana)
+        self.assertFalse(queue.acquire(self.segs[0].pk, self.beto))
+        self.assertFalse(queue.release(self.segs[0].pk, self.beto))
+        self.assertTrue(queue.release(self.segs[0].pk, self.ana))
+        self.assertTrue(queue.acquire(self.segs[0].pk, self.beto))
+        self.assertEqual(self.leased_by(self.beto), self.ids(0))
+
+
+class MarkReviewedTests(TestCase):
+    """
+    Acción masiva de admin: no debe quitarle el arriendo vigente a otro revisor.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin')
+        self.ana = User.objects.create_user('ana')
+        audio = Audio.objects.create(title='Entrevista 1', file='audios/e1.mp3')
+        now = timezone.now()
+        self.own, self.other, self.expired = [
+            Segment.objects.create(audio=audio, start=float(i), end=i + 1.0, text=' a', words=[word(' a', i, i + 1.0)],
+                                   locked_by=user, locked_at=at)
+            for i, (user, at) in enumerate([
+                (self.admin, now), (self.ana, now), (self.ana, now - timedelta(hours=1)),
+            ])
+        ]
+
+    def test_leases(self):
+        self.assertEqual(mark_reviewed(Segment.objects.all(), self.admin), 3)
+        for seg in (self.own, self.other, self.expired):
+            seg.refresh_from_db()
+            self.assertTrue(seg.revisado)
+            self.assertEqual(seg.version, 2)
+        self.assertIsNone(self.own.locked_by)
+        self.assertIsNone(self.expired.locked_by)
+        self.assertEqual(self.other.locked_by, self.ana)
+        # Ya revisados: nada que cambiar
+        self.assertEqual(mark_reviewed(Segment.objects.all(), self.admin), 0)
+
+
+# Sustitutos de los scripts de codes/: escriben la salida de cada MP3 salvo los 'roto*'
+FAKE_TRANSCRIBE = """
+import os, sys
+for name in sys.argv[1:]:
+    if name.startswith('roto'):
+        sys.exit('sin GPU')
+    open(os.path.join(os.environ['AUDIOS_PATH'], os.path.splitext(name)[0] + '.json'), 'w').write('{}')
+"""
+FAKE_PIPELINE = """
+import os, sys
+for name in sys.argv[1:]:
+    open(os.path.join(os.environ['AUDIOS_OUTPUT_PATH'], os.path.splitext(name)[0] + '_new_web_ready.json'), 'w').write('[]')
+"""
+
+
+class IngestTests(TestCase):
+    """
+    Etapas de IngestJob con scripts falsos: avance, reintentos y archivos reemplazados.
+    """
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='ingest-')
+        self.addCleanup(shutil.rmtree, self.root)
+        paths = {name: os.path.join(self.root, name) for name in ('audios', 'salida', 'codes')}
+        for path in paths.values():
+            os.mkdir(path)
+        for script, source in (('transcribir.py', FAKE_TRANSCRIBE), ('pipeline_audio.py', FAKE_PIPELINE)):
+            with open(os.path.join(paths['codes'], script), 'w') as f:
+                f.write(source)
+        self.folder = paths['audios']
+        overrides = override_settings(
+            REVIEW_INGEST_PATH=paths['audios'], REVIEW_INGEST_OUTPUT=paths['salida'],
+            REVIEW_INGEST_CODES=paths['codes'], REVIEW_INGEST_PYTHON=sys.executable,
+            REVIEW_INGEST_SETTLE=0, REVIEW_INGEST_MAX_ATTEMPTS=2, REVIEW_INGEST_RETRY=0,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def add(self, name, data=b'mp3'):
+        with open(os.path.join(self.folder, name), 'wb') as f:
+            f.write(data)
+        return ingest.register(self.folder, name)
+
+    def run_stage(self, stage):
+        jobs = ingest.claim(stage, 10)
+        return ingest.RUNNERS[stage](jobs) if jobs else 0
+
+    def test_candidates(self):
+        self.assertTrue(ingest.is_candidate('Entrevista.MP3'))
+        self.assertFalse(ingest.is_candidate('.grabacion.mp3.part'))
+        self.assertFalse(ingest.is_candidate('notas.txt'))
+
+    def test_stages(self):
+        job = self.add('entrevista.mp3')
+        self.assertEqual((job.stage, job.status), (IngestJob.TRANSCRIBE, IngestJob.PENDING))
+        # Ya registrado y sin cambios
+        self.assertIsNone(ingest.register(self.folder, 'entrevista.mp3'))
+
+        self.assertEqual(self.run_stage(IngestJob.TRANSCRIBE), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.stage, job.status, job.attempts), (IngestJob.PIPELINE, IngestJob.PENDING, 0))
+        self.assertEqual(self.run_stage(IngestJob.PIPELINE), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.stage, job.status), (IngestJob.IMPORT, IngestJob.PENDING))
+        self.assertFalse(ingest.idle())
+
+    def test_retries_then_fails(self):
+        job = self.add('roto.mp3')
+        self.assertEqual(self.run_stage(IngestJob.TRANSCRIBE), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.stage, job.status, job.attempts), (IngestJob.TRANSCRIBE, IngestJob.PENDING, 1))
+        self.assertIn('sin GPU', job.error)
+        self.assertEqual(self.run_stage(IngestJob.TRANSCRIBE), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.FAILED)
+        self.assertEqual(ingest.queue_stats(), {(IngestJob.TRANSCRIBE, IngestJob.FAILED): 1})
+        self.assertTrue(ingest.idle())
+
+    def test_replaced_file_restarts(self):
+        job = self.add('entrevista.mp3')
+        self.run_stage(IngestJob.TRANSCRIBE)
+        self.run_stage(IngestJob.PIPELINE)
+        self.assertIsNotNone(self.add('entrevista.mp3', b'otro mp3 distinto'))
+        job.refresh_from_db()
+        self.assertEqual((job.stage, job.status, job.size), (IngestJob.TRANSCRIBE, IngestJob.PENDING, 17))
+
+    def test_changed_while_claimed(self):
+        job = self.add('entrevista.mp3')
+        with open(os.path.join(self.folder, 'entrevista.mp3'), 'ab') as f:
+            f.write(b' copiando')
+        # Aún se está copiando: vuelve a esperar sin gastar un intento
+        self.assertEqual(self.run_stage(IngestJob.TRANSCRIBE), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.stage, job.status, job.attempts), (IngestJob.TRANSCRIBE, IngestJob.PENDING, 0))
+
+    def test_reclaim_stuck(self):
+        job = self.add('entrevista.mp3')
+        ingest.claim(IngestJob.TRANSCRIBE)
+        IngestJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=7))
+        self.assertEqual(ingest.reclaim_stuck(6 * 3600), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (IngestJob.PENDING, 'Worker sin respuesta'))
+
+
+class PeaksTests(TestCase):
+    """
+    Tiles de picos: nivel según el ancho pedido y rangos fuera del audio acotados a su duración.
+    """
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix='peaks-')
+        self.addCleanup(shutil.rmtree, media)
+        overrides = override_settings(MEDIA_ROOT=media)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user('revisor')
+        self.client.force_login(self.user)
+        self.audio = Audio.objects.create(title='Entrevista 1', file='audios/e1.mp3')
+
+        # 4 s a 100 bins/s (8000 Hz, 80 muestras por bin) y dos niveles reducidos
+        levels = [np.stack([-np.arange(400) % 128, np.arange(400) % 128], axis=1).astype(np.int8)]
+        for _ in range(2):
+            levels.append(peaks._reduce(levels[-1]))
+        self.path = peaks.peaks_path(self.audio)
+        os.makedirs(os.path.dirname(self.path))
+        offset = peaks.HEADER.size + peaks.LEVEL.size * len(levels)
+        with open(self.path, 'wb') as f:
+            f.write(peaks.HEADER.pack(peaks.MAGIC, peaks.VERSION, 8000, 80, len(levels)))
+            for lvl in levels:
+                f.write(peaks.LEVEL.pack(offset, lvl.shape[0]))
+                offset += lvl.nbytes
+            for lvl in levels:
+                f.write(lvl.tobytes())
+        self.levels = levels
+
+    def test_level_for_width(self):
+        data, level, rate, start = peaks.read_tile(self.path, 1.0, 2.0, width=1000)
+        self.assertEqual((level, rate, start), (0, 100.0, 1.0))
+        self.assertEqual(data, self.levels[0][100:200].tobytes())
+        data, level, rate, start = peaks.read_tile(self.path, 0.0, 4.0, width=100)
+        self.assertEqual((level, rate, len(data)), (2, 25.0, 200))
+
+    def test_out_of_range(self):
+        self.assertEqual(peaks.read_tile(self.path, 1e308, 1e308)[0], b'')
+        self.assertEqual(peaks.read_tile(self.path, -5.0, 0.5, level=0)[0], self.levels[0][:50].tobytes())
+        response = self.client.get(reverse('review:audio_peaks', args=[self.audio.pk]),
+                                   {'start': '1e308', 'end': '1e309'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('review:audio_peaks', args=[self.audio.pk]),
+                                   {'start': '1e308', 'end': '1e308', 'level': '0'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.content, response['X-Peaks-Start']), (b'', '4.000'))
+
+
+def snapshot(n, edited=()):
+    return {'segments': [
+        {'id': i, 'start': float(i), 'end': i + 1.0, 'text': f'segmento {i}' + (' corregido' if i in edited else '')}
+        for i in range(n)
+    ]}
+
+
+class VersionStoreTests(TestCase):
+    """
+    Almacén de versiones: deduplicación, deltas y retención con recolección de objetos.
+    """
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix='versiones-')
+        self.addCleanup(shutil.rmtree, media)
+        overrides = override_settings(MEDIA_ROOT=media, REVIEW_VERSION_DELTA_CHAIN=20, REVIEW_VERSION_KEEP_ALL_DAYS=7)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.audio = Audio.objects.create(title='Entrevista 1', file='audios/e1.mp3')
+
+    def objects(self):
+        root = version_store._objects_dir()
+        return sorted(name for _, _, files in os.walk(root) for name in files)
+
+    def test_identical_snapshot(self):
+        first = version_store.save_snapshot(self.audio, snapshot(20))
+        self.assertEqual(version_store.save_snapshot(self.audio, snapshot(20)), first)
+        self.assertEqual(AudioVersion.objects.count(), 1)
+
+    def test_deltas(self):
+        full = version_store.save_snapshot(self.audio, snapshot(20))
+        edited = version_store.save_snapshot(self.audio, snapshot(20, edited={3}))
+        shorter = version_store.save_snapshot(self.audio, snapshot(18, edited={3, 5}))
+        self.assertIsNone(full.base)
+        self.assertEqual((edited.base, edited.chain), (full, 1))
+        self.assertEqual((shorter.base, shorter.chain, shorter.segments), (edited, 2, 18))
+        self.assertLess(edited.size, full.size)
+        self.assertEqual(version_store.load_snapshot(edited), snapshot(20, edited={3}))
+        self.assertEqual(version_store.load_snapshot(shorter), snapshot(18, edited={3, 5}))
+
+    @override_settings(REVIEW_VERSION_DELTA_CHAIN=1)
+    def test_chain_limit(self):
+        version_store.save_snapshot(self.audio, snapshot(20))
+        version_store.save_snapshot(self.audio, snapshot(20, edited={1}))
+        third = version_store.save_snapshot(self.audio, snapshot(20, edited={1, 2}))
+        self.assertEqual((third.base, third.chain), (None, 0))
+
+    def test_shared_objects(self):
+        other = Audio.objects.create(title='Entrevista 2', file='audios/e2.mp3')
+        a = version_store.save_snapshot(self.audio, snapshot(20))
+        b = version_store.save_snapshot(other, snapshot(20))
+        self.assertEqual(a.object_key, b.object_key)
+        self.assertEqual(len(self.objects()), 1)
+
+    def test_prune(self):
+        now = timezone.now()
+        versions = [version_store.save_snapshot(self.audio, snapshot(20, edited=set(range(i)))) for i in range(4)]
+        # Tres versiones de hace diez días (se conserva la última de ese día) y una de hoy
+        for v, hours in zip(versions, (3, 2, 1)):
+            AudioVersion.objects.filter(pk=v.pk).update(created_at=now - timedelta(days=10, hours=hours))
+        self.assertEqual(version_store.prune_audio(self.audio, dry_run=True), 2)
+        self.assertEqual(version_store.prune_audio(self.audio), 2)
+
+        kept = list(AudioVersion.objects.filter(audio=self.audio).order_by('created_at'))
+        self.assertEqual([v.pk for v in kept], [versions[2].pk, versions[3].pk])
+        # Su base se borró: quedó como versión completa
+        self.assertEqual((kept[0].base, kept[0].chain), (None, 0))
+        self.assertEqual(version_store.load_snapshot(kept[0]), snapshot(20, edited={0, 1}))
+        self.assertEqual(version_store.load_snapshot(kept[1]), snapshot(20, edited={0, 1, 2}))
+
+        self.assertEqual(version_store.collect_garbage(grace=0), 3)
+        self.assertEqual(len(self.objects()), 2)
+
+
+class MediaTests(TestCase):
+    """
+    stream_audio: Range, If-Range y peticiones condicionales sobre MEDIA_ROOT/audios/.
+    """
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix='media-')
+        self.addCleanup(shutil.rmtree, media)
+        overrides = override_settings(MEDIA_ROOT=media, REVIEW_MEDIA_OFFLOAD='')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        os.mkdir(os.path.join(media, 'audios'))
+        self.data = bytes(range(256)) * 4
+        with open(os.path.join(media, 'audios', 'e1.mp3'), 'wb') as f:
+            f.write(self.data)
+        self.url = reverse('review:stream_audio', args=['e1.mp3'])
+
+    def get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-99', 1024), (0, 99))
+        self.assertEqual(parse_range('bytes=1000-', 1024), (1000, 1023))
+        self.assertEqual(parse_range('bytes=-24', 1024), (1000, 1023))
+        self.assertEqual(parse_range('bytes=10-5000', 1024), (10, 1023))
+        self.assertIsNone(parse_range('bytes=0-1,5-9', 1024))
+        self.assertIsNone(parse_range('', 1024))
+        self.assertFalse(parse_range('bytes=2000-', 1024))
+        self.assertFalse(parse_range('bytes=-0', 1024))
+
+    def test_full_file(self):
+        response, body = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.data)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range(self):
+        response, body = self.get(Range='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1024')
+        self.assertEqual(body, self.data[100:200])
+        response, _ = self.get(Range='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_conditional(self):
+        response, _ = self.get()
+        etag, modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.get(If_None_Match=etag)[0].status_code, 304)
+        self.assertEqual(self.get(If_Modified_Since=modified)[0].status_code, 304)
+        # If-Range con otra versión del archivo: se ignora el rango y va completo
+        response, body = self.get(Range='bytes=0-9', If_Range='"otro"')
+        self.assertEqual((response.status_code, body), (200, self.data))
+        response, body = self.get(Range='bytes=0-9', If_Range=etag)
+        self.assertEqual((response.status_code, body), (206, self.data[:10]))
+
+    def test_outside_media(self):
+        response = self.client.get(reverse('review:stream_audio', args=['../secreto.mp3']))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('review:stream_audio', args=['falta.mp3']))
+        self.assertEqual(response.status_code, 404)
+
+
+# Frame MPEG-1 capa III, 128 kbps, 44.1 kHz: 417 bytes y 1152 muestras
+MP3_FRAME = b'\xff\xfb\x90\x00' + bytes(413)
+ID3_TAG = b'ID3\x03\x00\x00\x00\x00\x00\x0a' + bytes(10)
+
+
+def frame_at(seconds):
+    # Offset del frame que contiene el instante, tras la etiqueta ID3
+    return len(ID3_TAG) + len(MP3_FRAME) * int(seconds * 44100 / 1152)
+
+
+class SeekIndexTests(TestCase):
+    """
+    Índice tiempo→byte de los MP3 y endpoint audio_range.
+    """
+
+    def setUp(self):
+        media = tempfile.mkdtemp(prefix='seek-')
+        self.addCleanup(shutil.rmtree, media)
+        overrides = override_settings(MEDIA_ROOT=media)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        os.mkdir(os.path.join(media, 'audios'))
+        self.path = os.path.join(media, 'audios', 'e1.mp3')
+        # Etiqueta ID3 de 20 bytes y 200 frames (≈5,22 s)
+        with open(self.path, 'wb') as f:
+            f.write(ID3_TAG + MP3_FRAME * 200)
+        self.user = User.objects.create_user('revisor')
+        self.client.force_login(self.user)
+        self.audio = Audio.objects.create(title='Entrevista 1', file='audios/e1.mp3')
+
+    def test_build_index(self):
+        resolution, duration, size, offsets = seek_index.read_index(seek_index.build_index(self.path))
+        self.assertEqual((resolution, size), (1.0, 20 + 417 * 200))
+        self.assertAlmostEqual(duration, 200 * 1152 / 44100, places=4)
+        # Un offset por segundo (frame que contiene k s) más el fin del archivo
+        self.assertEqual(list(offsets), [frame_at(k) for k in range(6)] + [size])
+
+    def test_byte_range(self):
+        data = seek_index.build_index(self.path)
+        # Un segundo extra al final para incluir completo el frame de 'end'
+        self.assertEqual(seek_index.byte_range(data, 1.5, 2.5), (frame_at(1), frame_at(4) - 1, 1.0))
+        # Fuera del audio: acotado a la duración
+        first, last, offset = seek_index.byte_range(data, 1e308, 1e308)
+        self.assertEqual((last, offset), (20 + 417 * 200 - 1, 5.0))
+
+    def test_audio_range(self):
+        url = reverse('review:audio_range', args=[self.audio.pk])
+        response = self.client.get(url, {'start': '1.5', 'end': '2.5', 'format': 'json'})
+        self.assertEqual(response.json()['range'], f'bytes={frame_at(1)}-{frame_at(4) - 1}')
+        self.audio.refresh_from_db()
+        self.assertAlmostEqual(self.audio.duration, 200 * 1152 / 44100, places=4)
+
+        response = self.client.get(url, {'start': '1.5', 'end': '2.5'})
+        self.assertEqual((response.status_code, response['X-Time-Offset']), (206, '1.000'))
+        self.assertEqual(len(b''.join(response.streaming_content)), frame_at(4) - frame_at(1))
+        self.assertEqual(self.client.get(url, {'start': 'nan'}).status_code, 400)
@@ -1,5 +1,17 @@
+from django.conf import settings
 from django.urls import path
-from .views import pending_list, segment_edit, stream_audio
+from . import api
+from .views import (
+    audio_peaks, audio_range, audio_version_detail, audio_version_restore, audio_versions, export_corpus,
+    metrics_export, pending_list, progress_dashboard, search, segment_clip, segment_edit, segment_lease,
+    segment_next, segment_retranscribe, segment_retranscribe_status, stream_audio,
+)
+
+# Modo ASGI: la entrega de audio y las consultas de sólo lectura usan vistas asíncronas
+if settings.REVIEW_ASYNC_VIEWS:
+    from .async_views import (  # noqa: F811
+        audio_peaks, audio_range, audio_versions, segment_clip, stream_audio,
+    )
 
 app_name = 'review'
 
@@ -8,6 +20,36 @@ urlpatterns = [
     path('media/audios/<path:filename>',  stream_audio),
     # Vista principal: carrusel de segmentos pendientes
     path('', pending_list, name='pending_list'),
+    # Métricas de Prometheus (texto)
+    path('metrics', metrics_export, name='metrics'),
+    # Tablero de avance (tablas de resumen)
+    path('progress/', progress_dashboard, name='progress_dashboard'),
+    # Búsqueda de texto completo en transcripciones y correcciones
+    path('search/', search, name='search'),
     # Edición in-place de un segmento por HTMX
     path('segment/<int:pk>/edit/', segment_edit, name='segment_edit'),
+    # Cola de revisión: siguiente segmento disponible y heartbeat del arriendo
+    path('segment/next/', segment_next, name='segment_next'),
+    path('segment/<int:pk>/lease/', segment_lease, name='segment_lease'),
+    # Clip de audio del segmento (caché LRU en disco)
+    path('segment/<int:pk>/clip/', segment_clip, name='segment_clip'),
+    # Re-transcripción de la ventana del segmento (worker en caliente) y consulta de su estado
+    path('segment/<int:pk>/retranscribe/', segment_retranscribe, name='segment_retranscribe'),
+    path('segment/<int:pk>/retranscribe/<int:job_pk>/', segment_retranscribe_status,
+         name='segment_retranscribe_status'),
+    # Rango de bytes del MP3 para una ventana de tiempo (índice tiempo→byte)
+    path('audio/<int:pk>/range/', audio_range, name='audio_range'),
+    # Forma de onda precalculada (tiles binarios por nivel de zoom)
+    path('audio/<int:pk>/peaks/', audio_peaks, name='audio_peaks'),
+    # Almacén de versiones: listar, descargar y restaurar
+    path('audio/<int:pk>/versions/', audio_versions, name='audio_versions'),
+    path('audio/<int:pk>/versions/<int:version_pk>/', audio_version_detail, name='audio_version_detail'),
+    path('audio/<int:pk>/versions/<int:version_pk>/restore/', audio_version_restore, name='audio_version_restore'),
+    # Exportación del corpus completo (zip en streaming)
+    path('export/', export_corpus, name='export_corpus'),
+    # API REST: lote de segmentos asignados y correcciones en bloque
+    path('api/segments/next/', api.segments_next, name='api_segments_next'),
+    path('api/segments/batch/', api.segments_batch, name='api_segments_batch'),
+    path('api/segments/search/', api.segments_search, name='api_segments_search'),
+    path('api/progress/', api.progress_summary, name='api_progress'),
 ]
\ No newline at end of file
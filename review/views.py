@@ -1,18 +1,27 @@
 import os
-import re
-import mimetypes
-from wsgiref.util import FileWrapper
+import subprocess
 
 from django.conf import settings
-from django.http import StreamingHttpResponse, FileResponse, Http404
+from django.http import Http404
+from django.core.paginator import Paginator
+from django.utils.crypto import constant_time_compare
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponseBadRequest
-from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.urls import reverse
 
-from review.services.versioning import version_audio
-from .models import Segment
+from review.services import (
+    caching, clips, endpoints, ingest, jobs, metrics, progress, queue, retranscribe,
+)
+from review.services.export import iter_export, parse_formats, start_run
+from review.services.media import serve_file
+from review.services.search import highlight, jump_url, search_segments
+from review.services.corrections import apply_correction, restore_version
+from review.services.version_store import load_snapshot
+from review.services.versioning import render_txt
+from .models import Audio, AudioVersion, Segment, TranscriptionJob
 
 
 @login_required(login_url='/accounts/login/')
@@ -20,48 +29,137 @@ def pending_list(request):
     """
     Muestra el carrusel de segmentos pendientes de revisión.
     """
-    pendientes_qs = Segment.objects.filter(
-        revisado=False,
-        words__contains=[{'review': True}]
-    ).order_by('audio__title', 'start')
-    pendientes = list(pendientes_qs)
+    # Asignar al revisor su lote de segmentos (arriendos con SKIP LOCKED); la
+    # plantilla sólo necesita los ids, el primero se carga por htmx
+    pendientes = queue.claim_segment_ids(request.user)
     return render(request, 'review/pending_list.html', {
         'pendientes': pendientes
     })
 
 
+@login_required(login_url='/accounts/login/')
+def search(request):
+    """
+    Búsqueda de texto completo en transcripciones y correcciones.
+    """
+    q = request.GET.get('q', '').strip()
+    audio = request.GET.get('audio', '')
+    hits = []
+    if q:
+        audio_id = int(audio) if audio.isdigit() else None
+        for seg in search_segments(q, audio_id=audio_id, limit=settings.REVIEW_SEARCH_LIMIT):
+            seg.snippet = highlight(seg.headline)
+            seg.jump_url = jump_url(seg)
+            hits.append(seg)
+    return render(request, 'review/search.html', {'q': q, 'hits': hits})
+
+
+@login_required(login_url='/accounts/login/')
+def progress_dashboard(request):
+    """
+    Tablero de avance: totales, audios con más trabajo pendiente y rendimiento de revisores.
+    Lee sólo las tablas de resumen, nunca Segment.
+    """
+    page = Paginator(progress.audios_by_remaining(), 50).get_page(request.GET.get('page'))
+    return render(request, 'review/progress.html', {
+        'totals': progress.totals(),
+        'page': page,
+        'reviewers': progress.reviewer_throughput(),
+    })
+
+
+def _render_locked(request, pk):
+    """
+    Fragmento para un segmento arrendado por otro revisor.
+    """
+    # HTMX sólo intercambia respuestas 2xx
+    status = 200 if request.META.get('HTTP_HX_REQUEST') == 'true' else 409
+    return render(request, 'review/segment_locked.html', {'pk': pk}, status=status)
+
+
+@login_required(login_url='/accounts/login/')
+def segment_next(request):
+    """
+    Libera el segmento actual (?from=pk) y asigna el siguiente disponible después de él.
+    """
+    current = request.GET.get('from')
+    current = int(current) if current and current.isdigit() else None
+    if current is not None:
+        queue.release(current, request.user)
+    # Siguiente en la cola después del actual (no el mismo, recién liberado)
+    asignados = queue.claim_segment_ids(request.user, 1, after=current)
+    if not asignados:
+        return render(request, 'review/segment_locked.html', {'pk': None})
+    return segment_edit(request, asignados[0])
+
+
+@login_required(login_url='/accounts/login/')
+def segment_lease(request, pk):
+    """
+    Heartbeat del arriendo: POST lo renueva, DELETE lo libera.
+    """
+    if request.method == 'DELETE':
+        queue.release(pk, request.user)
+        return HttpResponse(status=204)
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST', 'DELETE'])
+    if not queue.heartbeat(pk, request.user):
+        return JsonResponse({'error': 'Arriendo vencido o tomado por otro usuario.'}, status=409)
+    return HttpResponse(status=204)
+
+
+def _segment_context(segment, prev_pk, next_pk):
+    """
+    Contexto del fragmento de edición: navegación, audio y arriendo.
+    """
+    # El reproductor usa el clip del segmento; los tiempos son relativos al clip
+    clip_start, clip_end = clips.clip_window(segment)
+    filename = os.path.basename(segment.audio.file.name)
+    return {
+        's': segment,
+        'words': segment.word_array,
+        'prev_pk': prev_pk,
+        'next_pk': next_pk,
+        'stream_url': reverse('review:stream_audio', args=[filename]),
+        'clip_url': reverse('review:segment_clip', args=[segment.pk]),
+        'clip_start': round(segment.start - clip_start, 3),
+        'clip_end': round(segment.end - clip_start, 3),
+        # Forma de onda de la ventana del clip (tiempos absolutos del audio)
+        'peaks_url': reverse('review:audio_peaks', args=[segment.audio_id]),
+        'window_start': round(clip_start, 3),
+        'window_end': round(clip_end, 3),
+        'heartbeat_secs': max(settings.REVIEW_LEASE_TTL // 3, 5),
+        'cache_ttl': settings.REVIEW_CACHE_TTL,
+        'retranscribe_models': settings.REVIEW_RETRANSCRIBE_MODELS,
+        'retranscribe_model': settings.REVIEW_RETRANSCRIBE_MODEL,
+    }
+
+
 @login_required(login_url='/accounts/login/')
 def segment_edit(request, pk):
     """
     GET: Renderiza el fragmento HTML para editar el segmento identificado por pk.
     POST: Procesa y guarda los cambios, versionado y desbloqueo.
     """
-    segment = get_object_or_404(Segment, pk=pk)
-
-    # Calcular navegación previa y siguiente
-    pendientes_ids = list(
-        Segment.objects.filter(
-            revisado=False,
-            words__contains=[{'review': True}]
+    if request.method == 'GET':
+        # Segmento y navegación desde caché (invalidada por señales al cambiar)
+        try:
+            segment = caching.get_segment(pk)
+        except Segment.DoesNotExist:
+            raise Http404("Segmento no encontrado")
+    else:
+        # Las palabras se leen de words_packed; el JSON y el vector de búsqueda no hacen falta
+        segment = get_object_or_404(
+            Segment.objects.select_related('audio').defer('words', 'search_vector'), pk=pk,
         )
-        .order_by('audio__title', 'start')
-        .values_list('pk', flat=True)
-    )
-    idx = pendientes_ids.index(segment.pk) if segment.pk in pendientes_ids else None
-    prev_pk = pendientes_ids[idx-1] if idx is not None and idx > 0 else None
-    next_pk = pendientes_ids[idx+1] if idx is not None and idx < len(pendientes_ids)-1 else None
-
-    # Construir URL de streaming
-    filename = os.path.basename(segment.audio.file.name)
-    stream_url = reverse('review:stream_audio', args=[filename])
+    prev_pk, next_pk = caching.neighbours(segment.pk)
 
     if request.method == 'GET':
-        return render(request, 'review/segment_edit.html', {
-            's': segment,
-            'prev_pk': prev_pk,
-            'next_pk': next_pk,
-            'stream_url': stream_url,
-        })
+        # Tomar (o renovar) el arriendo del segmento para este revisor
+        if not queue.acquire(segment.pk, request.user):
+            return _render_locked(request, segment.pk)
+        return render(request, 'review/segment_edit.html',
+                      _segment_context(segment, prev_pk, next_pk))
 
     # POST
     try:
@@ -70,43 +168,33 @@ def segment_edit(request, pk):
     except (TypeError, ValueError):
         return HttpResponseBadRequest("Start y end deben ser números válidos.")
 
-    # Evitar edición concurrente
-    if segment.locked_by and segment.locked_by != request.user:
+    # Evitar edición concurrente: el revisor debe conservar (o recuperar) el arriendo
+    if not queue.acquire(segment.pk, request.user):
         return JsonResponse({'error': 'Segmento bloqueado por otro usuario.'}, status=409)
 
-    # Bloquear para el usuario actual
-    segment.lock(request.user)
-
-    # Actualizar campos
-    segment.start = start
-    segment.end = end
-    segment.revisado = bool(request.POST.get('revisado'))
-
+    # Recoger campos editados
+    values = {
+        'start': start,
+        'end': end,
+        'revisado': bool(request.POST.get('revisado')),
+    }
     if request.POST.get('use_free'):
-        segment.free_text = request.POST.get('free_text', '').strip()
-        segment.fills = None
+        values['free_text'] = request.POST.get('free_text', '').strip()
+        values['fills'] = None
     else:
         fills = {}
         for key, val in request.POST.items():
             if key.startswith('fill_'):
                 idx_w = key.split('_')[1]
                 fills[int(idx_w)] = val.strip()
-        segment.fills = fills
-        segment.free_text = ''
+        values['fills'] = fills
+        values['free_text'] = ''
 
-    # Versionado y desbloqueo atómico
-    with transaction.atomic():
-        segment.version += 1
-        segment.save()
-        version_audio(segment.audio)
-        segment.unlock()
+    # Registrar la revisión (sólo campos cambiados) y liberar el arriendo;
+    # las versiones completas del audio se materializan aparte
+    apply_correction(segment, request.user, **values)
 
-    context = {
-        's': segment,
-        'prev_pk': prev_pk,
-        'next_pk': next_pk,
-        'stream_url': stream_url,
-    }
+    context = _segment_context(segment, prev_pk, next_pk)
 
     # Para peticiones HTMX, enviamos el fragmento y forzamos reload del cliente
     if request.META.get('HTTP_HX_REQUEST') == 'true':
@@ -118,43 +206,162 @@ def segment_edit(request, pk):
     return redirect('review:pending_list')
 
 
-def stream_audio(request, filename):
+@login_required(login_url='/accounts/login/')
+def segment_clip(request, pk):
     """
-    Responde peticiones HTTP Range para archivos en MEDIA_ROOT/audios/
+    Clip corto del segmento (con relleno), generado y cacheado bajo demanda.
     """
-    media_dir = os.path.join(settings.MEDIA_ROOT, 'audios')
-    path = os.path.join(media_dir, filename)
-    if not os.path.exists(path):
-        raise Http404("Audio no encontrado")
+    segment = get_object_or_404(Segment.objects.select_related('audio'), pk=pk)
+    try:
+        path = clips.ensure_clip(segment)
+    except (OSError, subprocess.CalledProcessError):
+        raise Http404("No se pudo generar el clip")
+    return serve_file(request, path, content_type='audio/mpeg')
+
+
+@login_required(login_url='/accounts/login/')
+@require_POST
+def segment_retranscribe(request, pk):
+    """
+    Encola la re-transcripción de la ventana del segmento (modelo y temperatura opcionales)
+    y devuelve el fragmento que consulta su estado.
+    """
+    segment = get_object_or_404(Segment, pk=pk)
+    model_name = request.POST.get('model') or settings.REVIEW_RETRANSCRIBE_MODEL
+    if model_name not in settings.REVIEW_RETRANSCRIBE_MODELS:
+        return HttpResponseBadRequest("Modelo no permitido.")
+    try:
+        temperature = float(request.POST.get('temperature') or 0.0)
+    except ValueError:
+        return HttpResponseBadRequest("La temperatura debe ser un número.")
+    if not 0.0 <= temperature <= 1.0:
+        return HttpResponseBadRequest("La temperatura debe estar entre 0 y 1.")
+    job = retranscribe.enqueue(segment, request.user, model_name, temperature)
+    return render(request, 'review/retranscribe.html', {'job': job})
 
-    file_size = os.path.getsize(path)
-    content_type, _ = mimetypes.guess_type(path)
-    content_type = content_type or 'application/octet-stream'
 
-    range_header = request.META.get('HTTP_RANGE', '')
-    range_match = re.match(r'bytes=(\d+)-(\d*)', range_header)
+@login_required(login_url='/accounts/login/')
+def segment_retranscribe_status(request, pk, job_pk):
+    """
+    Estado de una re-transcripción; al terminar muestra la sugerencia.
+    """
+    job = get_object_or_404(TranscriptionJob, pk=job_pk, segment_id=pk)
+    return render(request, 'review/retranscribe.html', {'job': job})
 
-    if range_match:
-        start = int(range_match.group(1))
-        end = int(range_match.group(2)) if range_match.group(2) else file_size - 1
-        if end >= file_size:
-            end = file_size - 1
-        length = end - start + 1
 
-        response = StreamingHttpResponse(
-            FileWrapper(open(path, 'rb')),
-            status=206,
-            content_type=content_type
-        )
-        response['Content-Range'] = f'bytes {start}-{end}/{file_size}'
-        response['Accept-Ranges'] = 'bytes'
-        response['Content-Length'] = str(length)
+@login_required(login_url='/accounts/login/')
+def audio_range(request, pk):
+    """
+    Bytes del MP3 que cubren ?start=&end= (segundos), según el índice tiempo→byte.
+    Con ?format=json sólo devuelve el rango, para pedirlo a stream_audio con Range.
+    """
+    audio = get_object_or_404(Audio, pk=pk)
+    try:
+        start, end = endpoints.parse_range_params(request.GET)
+    except ValueError:
+        return HttpResponseBadRequest(endpoints.RANGE_ERROR)
+    path, data = endpoints.seek_data(audio)
+    return endpoints.range_response(request, audio, path, data, start, end)
+
+
+@login_required(login_url='/accounts/login/')
+def audio_peaks(request, pk):
+    """
+    Tile binario de la forma de onda: int8 [min, max] por bin para ?start=&end= (segundos).
+    ?level= fija el nivel de zoom; si no, se elige según ?width= (bins deseados).
+    """
+    audio = get_object_or_404(Audio, pk=pk)
+    try:
+        params = endpoints.parse_peaks_params(request.GET)
+    except ValueError:
+        return HttpResponseBadRequest(endpoints.PEAKS_ERROR)
+    return endpoints.peaks_response(endpoints.peaks_tile(audio, *params))
+
+
+@login_required(login_url='/accounts/login/')
+def audio_versions(request, pk):
+    """
+    Lista las versiones almacenadas de un audio (JSON).
+    """
+    audio = get_object_or_404(Audio, pk=pk)
+    versions = [endpoints.version_entry(audio, v) for v in audio.versions.order_by('-created_at')]
+    return endpoints.versions_response(audio, versions)
 
-        fp = open(path, 'rb')
-        fp.seek(start)
-        response.streaming_content = iter(lambda: fp.read(8192), b'')
 
+@login_required(login_url='/accounts/login/')
+def audio_version_detail(request, pk, version_pk):
+    """
+    Descarga una versión reconstruida: JSON por defecto, ?format=txt para el texto final.
+    """
+    version = get_object_or_404(AudioVersion.objects.select_related('audio'), pk=version_pk, audio_id=pk)
+    snapshot = load_snapshot(version)
+    base = version.audio.title.replace(' ', '_')
+    ts = version.created_at.strftime('%Y%m%d_%H%M%S')
+    if request.GET.get('format') == 'txt':
+        response = HttpResponse(render_txt(snapshot), content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{base}_final_{ts}.txt"'
         return response
+    response = JsonResponse(snapshot, json_dumps_params={'ensure_ascii': False})
+    response['Content-Disposition'] = f'attachment; filename="{base}_modificado_{ts}.json"'
+    return response
+
+
+@require_POST
+@staff_member_required
+def audio_version_restore(request, pk, version_pk):
+    """
+    Restaura los segmentos del audio a una versión almacenada (sólo staff).
+    """
+    version = get_object_or_404(AudioVersion, pk=version_pk, audio_id=pk)
+    restored, skipped = restore_version(version, request.user)
+    # skipped: segmentos con arriendo vigente de otro revisor (no se tocaron)
+    return JsonResponse({'restored': restored, 'skipped': skipped})
+
+
+@staff_member_required
+def export_corpus(request):
+    """
+    Descarga en streaming el zip con las transcripciones finales (sólo staff).
+    ?incremental=1 exporta sólo lo modificado desde la última exportación; ?formats=txt,csv.
+    """
+    try:
+        formats = parse_formats(request.GET.get('formats'))
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    run, audios = start_run(request.GET.get('incremental') == '1', formats, user=request.user)
+    response = StreamingHttpResponse(iter_export(run, audios), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="corpus_{run.started_at:%Y%m%d_%H%M%S}.zip"'
+    return response
+
+
+def stream_audio(request, filename):
+    """
+    Sirve archivos de MEDIA_ROOT/audios/ con soporte de Range, If-Range y
+    peticiones condicionales (ETag / Last-Modified → 304).
+    """
+    return serve_file(request, endpoints.media_file(filename))
+
+
+def metrics_export(request):
+    """
+    Métricas del proceso en formato de texto de Prometheus.
+    Con REVIEW_METRICS_TOKEN exige 'Authorization: Bearer <token>'; sin él, sólo en DEBUG
+    y desde localhost (detrás de un proxy local todas las peticiones llegan desde 127.0.0.1).
+    """
+    token = settings.REVIEW_METRICS_TOKEN
+    if token:
+        auth = request.META.get('HTTP_AUTHORIZATION', '')
+        if not constant_time_compare(auth, f'Bearer {token}'):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG or request.META.get('REMOTE_ADDR') not in ('127.0.0.1', '::1'):
+        return HttpResponse(status=403)
 
-    # Si no hay header Range, devolvemos todo el fichero
-    return FileResponse(open(path, 'rb'), content_type=content_type)
\ No newline at end of file
+    stats = jobs.queue_stats()
+    for state in ('depth', 'running', 'failed'):
+        metrics.VERSION_QUEUE.set(stats[state], state=state)
+    metrics.VERSION_QUEUE_LAG.set(stats['lag'])
+    for state, n in retranscribe.queue_stats().items():
+        metrics.TRANSCRIPTION_QUEUE.set(n, state=state)
+    for (stage, state), n in ingest.queue_stats().items():
+        metrics.INGEST_QUEUE.set(n, stage=stage, state=state)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -3,14 +3,25 @@ ASGI config for review_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Con REVIEW_ASYNC_VIEWS=True la entrega de audio y las consultas de sólo lectura
+usan vistas asíncronas (review/async_views.py). Ejemplo de despliegue:
+
+    REVIEW_ASYNC_VIEWS=True uvicorn review_project.asgi:application --workers 2 --port 8088
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'review_project.settings')
 
 application = get_asgi_application()
+
+# Estáticos precomprimidos con caché inmutable, sin pasar por middleware ni vistas
+if settings.REVIEW_STATIC_SERVE:
+    from review.services.static_assets import StaticFilesASGI
+    application = StaticFilesASGI(application)
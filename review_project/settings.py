@@ -35,6 +35,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Autenticación (django-allauth)
     'django.contrib.sites',
@@ -43,6 +44,9 @@ INSTALLED_APPS = [
     'allauth.socialaccount',
     'allauth.socialaccount.providers.google',
 
+    # API REST
+    'rest_framework',
+
     # App local
     'review',
 ]
@@ -53,6 +57,8 @@ INSTALLED_APPS = [
 # ==============================================================
 
 MIDDLEWARE = [
+    # Métricas de latencia y queries (primero, para medir toda la cadena)
+    'review.middleware.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +98,12 @@ WSGI_APPLICATION = 'review_project.wsgi.application'
 # 🗄️ DATABASE (PostgreSQL)
 # ==============================================================
 
+# Conexiones: persistentes por worker (DB_CONN_MAX_AGE segundos, verificadas antes de reutilizarse)
+# o, con DB_POOL=True, un pool de psycopg 3 por proceso (requiere "psycopg[pool]"; es lo indicado
+# con ASGI, donde las conexiones persistentes no se reutilizan entre peticiones)
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+_ASGI = os.getenv("REVIEW_ASYNC_VIEWS", "False").lower() == "true"
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -100,8 +112,20 @@ DATABASES = {
         'PASSWORD': os.getenv("DB_PASSWORD", "audios_2025"),
         'HOST': os.getenv("DB_HOST", "localhost"),
         'PORT': os.getenv("DB_PORT", "5432"),
+        # El pool es incompatible con conexiones persistentes
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", 0 if _ASGI else 60)),
+        'CONN_HEALTH_CHECKS': os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() == "true",
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv("DB_CONNECT_TIMEOUT", 5)),
+        },
     }
 }
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+        'max_size': int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+        'timeout': int(os.getenv("DB_POOL_TIMEOUT", 10)),
+    }
 
 
 # ==============================================================
@@ -134,6 +158,14 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic agrega el hash del contenido a cada nombre y escribe variantes .gz/.br
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'review.services.static_assets.CompressedManifestStaticFilesStorage'},
+}
+# Servir STATIC_ROOT desde wsgi.py/asgi.py, antes de Django (desactivar si lo sirve nginx)
+REVIEW_STATIC_SERVE = os.getenv("REVIEW_STATIC_SERVE", "True").lower() == "true"
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.getenv("MEDIA_ROOT", str(BASE_DIR / 'media'))
 
@@ -145,6 +177,135 @@ MEDIA_ROOT = os.getenv("MEDIA_ROOT", str(BASE_DIR / 'media'))
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# ==============================================================
+# 🗃️ CACHE
+# ==============================================================
+
+# Memoria local por defecto; en producción con varios procesos usar un backend
+# compartido, p. ej. CACHE_BACKEND="django.core.cache.backends.redis.RedisCache"
+# y CACHE_LOCATION="redis://127.0.0.1:6379/1"
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.getenv("CACHE_LOCATION", "audio-app"),
+    }
+}
+
+
+# ==============================================================
+# 🎧 REVISIÓN (cola, versionado y medios)
+# ==============================================================
+
+# Duración del arriendo de un segmento (segundos) y tamaño del lote asignado
+REVIEW_LEASE_TTL = int(os.getenv("REVIEW_LEASE_TTL", 300))
+REVIEW_QUEUE_BATCH = int(os.getenv("REVIEW_QUEUE_BATCH", 5))
+
+# Vigencia (segundos) de segmentos, fragmentos y navegación cacheados
+REVIEW_CACHE_TTL = int(os.getenv("REVIEW_CACHE_TTL", 3600))
+
+# Exportación del corpus: hilos en paralelo y filas por lote del cursor del servidor
+REVIEW_EXPORT_WORKERS = int(os.getenv("REVIEW_EXPORT_WORKERS", 4))
+REVIEW_EXPORT_CHUNK = int(os.getenv("REVIEW_EXPORT_CHUNK", 2000))
+
+# Instrumentación: token para /metrics (vacío = sólo localhost con DEBUG) y umbral (ms) del log de
+# peticiones lentas con su SQL (0 = desactivado)
+REVIEW_METRICS_TOKEN = os.getenv("REVIEW_METRICS_TOKEN", "")
+REVIEW_SLOW_REQUEST_MS = int(os.getenv("REVIEW_SLOW_REQUEST_MS", 0))
+
+# Búsqueda de texto completo: configuración de PostgreSQL y máximo de resultados
+REVIEW_SEARCH_CONFIG = os.getenv("REVIEW_SEARCH_CONFIG", "spanish")
+REVIEW_SEARCH_LIMIT = int(os.getenv("REVIEW_SEARCH_LIMIT", 50))
+
+# Re-transcripción de segmentos: relleno (segundos), modelo por defecto, modelos permitidos,
+# intentos ante workers caídos y carpeta de los pesos de Whisper
+REVIEW_RETRANSCRIBE_PADDING = float(os.getenv("REVIEW_RETRANSCRIBE_PADDING", 0.5))
+REVIEW_RETRANSCRIBE_MODEL = os.getenv("REVIEW_RETRANSCRIBE_MODEL", os.getenv("WHISPER_MODEL_NAME", "large-v3"))
+REVIEW_RETRANSCRIBE_MODELS = [
+    m.strip() for m in os.getenv("REVIEW_RETRANSCRIBE_MODELS", REVIEW_RETRANSCRIBE_MODEL).split(",") if m.strip()
+]
+REVIEW_RETRANSCRIBE_MAX_ATTEMPTS = int(os.getenv("REVIEW_RETRANSCRIBE_MAX_ATTEMPTS", 2))
+WHISPER_PATH = os.getenv("WHISPER_PATH", os.path.join(BASE_DIR, "large-v3"))
+
+# Ingesta desde carpeta vigilada (ingest_watch): carpetas de entrada y salida de codes/,
+# intérprete para los scripts, espera hasta que un MP3 deje de cambiar (s), reintentos,
+# espera base entre reintentos (s), tiempo máximo de transcripción (s, 0 = sin límite)
+# y cálculo de forma de onda al importar
+REVIEW_INGEST_PATH = os.getenv("AUDIOS_PATH", os.path.join(BASE_DIR, "AUDIOS", "pruebas"))
+REVIEW_INGEST_OUTPUT = os.getenv("AUDIOS_OUTPUT_PATH", os.path.join(BASE_DIR, "AUDIOS", "_new_web_ready"))
+REVIEW_INGEST_CODES = os.path.join(BASE_DIR, "codes")
+REVIEW_INGEST_PYTHON = os.getenv("REVIEW_INGEST_PYTHON", "python3")
+REVIEW_INGEST_SETTLE = int(os.getenv("REVIEW_INGEST_SETTLE", 10))
+REVIEW_INGEST_MAX_ATTEMPTS = int(os.getenv("REVIEW_INGEST_MAX_ATTEMPTS", 3))
+REVIEW_INGEST_RETRY = int(os.getenv("REVIEW_INGEST_RETRY", 60))
+REVIEW_INGEST_TRANSCRIBE_TIMEOUT = int(os.getenv("REVIEW_INGEST_TRANSCRIBE_TIMEOUT", 0))
+REVIEW_INGEST_PEAKS = os.getenv("REVIEW_INGEST_PEAKS", "False").lower() == "true"
+
+# Versionado en segundo plano: ventana de coalescencia (segundos) y reintentos
+REVIEW_VERSION_WINDOW = int(os.getenv("REVIEW_VERSION_WINDOW", 60))
+REVIEW_VERSION_MAX_ATTEMPTS = int(os.getenv("REVIEW_VERSION_MAX_ATTEMPTS", 3))
+
+# Almacén de versiones: largo máximo de cadenas delta y retención (días con todas las versiones)
+REVIEW_VERSION_DELTA_CHAIN = int(os.getenv("REVIEW_VERSION_DELTA_CHAIN", 20))
+REVIEW_VERSION_KEEP_ALL_DAYS = int(os.getenv("REVIEW_VERSION_KEEP_ALL_DAYS", 7))
+
+# Entrega de audio: tamaño de bloque y delegación opcional al servidor web
+# REVIEW_MEDIA_OFFLOAD: "" (Django sirve los bytes), "nginx" (X-Accel-Redirect) o "sendfile" (X-Sendfile)
+REVIEW_STREAM_CHUNK = int(os.getenv("REVIEW_STREAM_CHUNK", 256 * 1024))
+REVIEW_MEDIA_OFFLOAD = os.getenv("REVIEW_MEDIA_OFFLOAD", "")
+REVIEW_MEDIA_OFFLOAD_PREFIX = os.getenv("REVIEW_MEDIA_OFFLOAD_PREFIX", "/protected-media/")
+
+# Servir audio y consultas de sólo lectura con vistas asíncronas (desplegar con ASGI)
+REVIEW_ASYNC_VIEWS = os.getenv("REVIEW_ASYNC_VIEWS", "False").lower() == "true"
+
+# Clips por segmento: relleno (segundos), bitrate y tamaño máximo de la caché LRU (MB)
+REVIEW_CLIP_PADDING = float(os.getenv("REVIEW_CLIP_PADDING", 1.0))
+REVIEW_CLIP_BITRATE = os.getenv("REVIEW_CLIP_BITRATE", "48k")
+REVIEW_CLIP_CACHE_MB = int(os.getenv("REVIEW_CLIP_CACHE_MB", 512))
+
+# Forma de onda: frecuencia de decodificación, bins/s del nivel más fino y límites por nivel/tile
+REVIEW_PEAKS_SAMPLE_RATE = int(os.getenv("REVIEW_PEAKS_SAMPLE_RATE", 8000))
+REVIEW_PEAKS_PER_SECOND = int(os.getenv("REVIEW_PEAKS_PER_SECOND", 100))
+REVIEW_PEAKS_MIN_BINS = int(os.getenv("REVIEW_PEAKS_MIN_BINS", 1024))
+REVIEW_PEAKS_MAX_BINS = int(os.getenv("REVIEW_PEAKS_MAX_BINS", 16384))
+
+
+# ==============================================================
+# 📝 LOGGING
+# ==============================================================
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        # Peticiones lentas (REVIEW_SLOW_REQUEST_MS) con el SQL emitido
+        'review.slow': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+
+# ==============================================================
+# 🔌 API REST (Django REST Framework)
+# ==============================================================
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+}
+
+# Máximo de segmentos por asignación o por lote de correcciones
+REVIEW_API_MAX_BATCH = int(os.getenv("REVIEW_API_MAX_BATCH", 100))
+
+
 # ==============================================================
 # 👥 AUTHENTICATION (AllAuth)
 # ==============================================================
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'review_project.settings')
 
 application = get_wsgi_application()
+
+# Estáticos precomprimidos con caché inmutable, sin pasar por middleware ni vistas
+if settings.REVIEW_STATIC_SERVE:
+    from review.services.static_assets import StaticFilesWSGI
+    application = StaticFilesWSGI(application)